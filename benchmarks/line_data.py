@@ -0,0 +1,87 @@
+"""
+Benchmark plotting long lines.
+
+Adds 1,000,000 points to a line on a `PlotItem`, one frame's worth of points at a time, and redraws
+the line after every frame (as the sequence's display does). Only updating the line is measured,
+not painting it. The previous list-based line storage, which converted the whole line to arrays on
+every redraw, is reproduced in `ListLineData` so both implementations can be compared.
+
+Run from the repository root with `python -m benchmarks.line_data`.
+"""
+
+import statistics
+import time
+from collections.abc import Sequence
+
+from PyQt6.QtWidgets import QApplication
+from pyqtgraph import PlotDataItem
+
+from fabrial.custom_widgets import PlotWidget
+from fabrial.plotting import LineData, LineParams
+
+POINTS = 1_000_000
+POINTS_PER_FRAME = 2_000
+REDRAW_REPEATS = 20
+
+
+class ListLineData:
+    """A `LineData` as it was before its data was stored in NumPy arrays."""
+
+    def __init__(self, line: PlotDataItem):
+        self.line = line
+        self.x_data: list[float] = []
+        self.y_data: list[float] = []
+
+    def add_points(self, x_values: Sequence[float], y_values: Sequence[float], redraw: bool = True):
+        self.x_data.extend(x_values)
+        self.y_data.extend(y_values)
+        if redraw:
+            self.redraw()
+
+    def redraw(self):
+        self.line.setData(self.x_data, self.y_data)
+
+
+def measure(line_type: type[LineData] | type[ListLineData]) -> tuple[float, float]:
+    """
+    Fill a line of **line_type** with `POINTS` points.
+
+    Returns
+    -------
+    A tuple of (the total time in seconds, the median time in milliseconds of a redraw at the end).
+    """
+    plot_widget = PlotWidget()
+    line: LineData | ListLineData = plot_widget.view.plot_item.plot(
+        [], [], None, LineParams("red", 1), None
+    )
+    if line_type is ListLineData:
+        line = ListLineData(line.line)
+    frame = list(range(POINTS_PER_FRAME))
+    start_time = time.perf_counter()
+    for start in range(0, POINTS, POINTS_PER_FRAME):
+        x_values = [float(start + i) for i in frame]
+        line.add_points(x_values, x_values)
+    total_time = time.perf_counter() - start_time
+
+    redraw_times: list[float] = []
+    for _ in range(REDRAW_REPEATS):
+        redraw_start_time = time.perf_counter()
+        line.redraw()
+        redraw_times.append((time.perf_counter() - redraw_start_time) * 1000)
+    return (total_time, statistics.median(redraw_times))
+
+
+def main():
+    application = QApplication([])  # noqa: F841
+    for label, line_type in (
+        ("before (lists)", ListLineData),
+        ("after (NumPy arrays)", LineData),
+    ):
+        total_time, redraw_time = measure(line_type)
+        print(f"{label}")
+        print(f"    time to plot {POINTS:,} points:  {total_time:.2f} s")
+        print(f"    redraw at {POINTS:,} points:     {redraw_time:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
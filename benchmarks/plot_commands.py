@@ -0,0 +1,165 @@
+"""
+Benchmark the plot command pipeline.
+
+Measures how many plot commands per second go from `LineHandle.add_point()` through the
+`StepRunner`'s batcher to a `HeadlessDisplay`. The previous closure-based commands (which copied
+their indexes every time) are reproduced in `ClosureLineHandle` so both implementations can be
+compared.
+
+Run from the repository root with `python -m benchmarks.plot_commands`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from fabrial.classes import Reply, StepRunner
+from fabrial.classes.plot_batcher import PlotBatch
+from fabrial.headless.plots import HeadlessDisplay
+from fabrial.plotting import (
+    AddLine,
+    AddPlot,
+    LineHandle,
+    LineIndex,
+    PlotHandle,
+    PlotIndex,
+    PlotSettings,
+    run_plot_command,
+)
+
+POINTS = 200_000
+CHUNK_SIZE = 100  # points per `add_points()` call
+REPEATS = 5
+
+
+@dataclass
+class MutablePlotIndex:
+    """A `PlotIndex` as it was before indexes were immutable."""
+
+    step_address: int
+    plot_number: int
+
+    def __copy__(self) -> MutablePlotIndex:
+        return MutablePlotIndex(self.step_address, self.plot_number)
+
+
+@dataclass
+class MutableLineIndex:
+    """A `LineIndex` as it was before indexes were immutable."""
+
+    plot_index: MutablePlotIndex
+    line_number: int
+
+    def __copy__(self) -> MutableLineIndex:
+        return MutableLineIndex(copy.copy(self.plot_index), self.line_number)
+
+
+class ClosureLineHandle:
+    """A `LineHandle` as it was before plot commands were records."""
+
+    def __init__(self, runner: StepRunner, line_index: MutableLineIndex):
+        self.runner = runner
+        self.line_index = line_index
+
+    def add_point(self, x: float, y: float):
+        line_index = copy.copy(self.line_index)
+        self.runner.submit_plot_command(
+            lambda plot_tab: plot_tab.add_point(line_index, x, y)  # type: ignore[arg-type]
+        )
+
+
+async def create_line(display: HeadlessDisplay) -> LineIndex:
+    """Create a plot with one line on **display** and return the line's index."""
+    plot_receiver: Reply[PlotIndex] = Reply()
+    run_plot_command(
+        display, AddPlot(0, "Benchmark", "Plot", PlotSettings("Benchmark", "X", "Y"), plot_receiver)
+    )
+    line_receiver: Reply[LineIndex] = Reply()
+    run_plot_command(display, AddLine(await plot_receiver.wait(), None, None, None, line_receiver))
+    return await line_receiver.wait()
+
+
+def measure(
+    display_runner: Callable[[HeadlessDisplay, PlotBatch], None],
+    submit_points: Callable[[StepRunner, LineIndex], None],
+) -> float:
+    """
+    Measure how many points per second **submit_points** sends through a `StepRunner` to a
+    `HeadlessDisplay` that runs batches with **display_runner**.
+    """
+
+    async def run() -> float:
+        with tempfile.TemporaryDirectory() as directory:
+            runner = StepRunner()
+            display = HeadlessDisplay(Path(directory))  # keep the data, like a real display
+            runner.plotCommandsRequested.connect(lambda batch: display_runner(display, batch))
+            line_index = await create_line(display)
+            start_time = time.perf_counter()
+            submit_points(runner, line_index)
+            runner.plot_batcher.flush()
+            elapsed = time.perf_counter() - start_time
+            assert len(display.plots[1].lines[0].x_data) == POINTS
+            return POINTS / elapsed
+
+    return max(asyncio.run(run()) for _ in range(REPEATS))
+
+
+def run_closures(display: HeadlessDisplay, batch: PlotBatch):
+    for command in batch.commands:
+        command(display)  # type: ignore[operator]
+
+
+def run_records(display: HeadlessDisplay, batch: PlotBatch):
+    for command in batch.commands:
+        run_plot_command(display, command)
+
+
+def submit_closures(runner: StepRunner, line_index: LineIndex):
+    plot_index = line_index.plot_index
+    handle = ClosureLineHandle(
+        runner,
+        MutableLineIndex(
+            MutablePlotIndex(plot_index.step_address, plot_index.plot_number),
+            line_index.line_number,
+        ),
+    )
+    for i in range(POINTS):
+        handle.add_point(i, i)
+
+
+def line_handle(runner: StepRunner, line_index: LineIndex) -> LineHandle:
+    return LineHandle(PlotHandle(runner, line_index.plot_index), line_index)
+
+
+def submit_records(runner: StepRunner, line_index: LineIndex):
+    handle = line_handle(runner, line_index)
+    for i in range(POINTS):
+        handle.add_point(i, i)
+
+
+def submit_chunks(runner: StepRunner, line_index: LineIndex):
+    handle = line_handle(runner, line_index)
+    for start in range(0, POINTS, CHUNK_SIZE):
+        values = range(start, start + CHUNK_SIZE)
+        handle.add_points(values, values)
+
+
+def main():
+    for label, display_runner, submit_points in (
+        ("before (closures, add_point)", run_closures, submit_closures),
+        ("after (records, add_point)", run_records, submit_records),
+        (f"after (records, add_points x{CHUNK_SIZE})", run_records, submit_chunks),
+    ):
+        points_per_second = measure(display_runner, submit_points)
+        print(f"{label}")
+        print(f"    points per second: {points_per_second:,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Benchmark the sequence's command channel.
+
+Measures the CPU used by an idle (and a paused) sequence and the latency between sending a command
+from the main thread and the sequence reacting to it. The previous busy-polling monitor and pause
+are reproduced in `PollingSequenceThread` so both implementations can be compared.
+
+Run from the repository root with `python -m benchmarks.sequence_commands`.
+"""
+
+import asyncio
+import statistics
+import tempfile
+import time
+from asyncio import CancelledError
+from pathlib import Path
+from queue import Empty
+
+from PyQt6.QtCore import QObject
+
+from fabrial.classes import SequenceStep, SequenceThread, StepRunner
+from fabrial.enums import SequenceCommand, SequenceStatus
+
+IDLE_SECONDS = 2
+LATENCY_REPEATS = 20
+
+
+class IdleStep(SequenceStep):
+    """A step that does nothing for a long time and records when it gets cancelled."""
+
+    def __init__(self):
+        self.cancelled_at: float | None = None
+
+    async def run(self, runner: StepRunner, data_directory: Path):
+        try:
+            await self.sleep(3600)
+        except CancelledError:
+            self.cancelled_at = time.perf_counter()
+            raise
+
+    def reset(self):
+        self.cancelled_at = None
+
+    def name(self) -> str:
+        return "Idle"
+
+
+class PollingSequenceThread(SequenceThread):
+    """
+    The sequence thread as it was before commands woke up the event loop and pausing stopped at the
+    next `sleep()` instead of blocking the event loop.
+    """
+
+    async def monitor(self) -> None:  # overridden
+        while True:
+            self.check_commands()
+            await asyncio.sleep(0)
+
+    def pause(self):  # overridden
+        self.statusChanged.emit(SequenceStatus.Paused)
+        while True:
+            try:
+                command = self.command_queue.get_nowait()
+                match command:
+                    case SequenceCommand.Cancel:
+                        raise CancelledError
+                    case SequenceCommand.Unpause:
+                        self.statusChanged.emit(SequenceStatus.Active)
+                        return
+                    case SequenceCommand.Pause:  # ignore additional pauses
+                        pass
+            except Empty:
+                pass
+            time.sleep(0)  # this is not `asyncio.sleep()`
+
+
+class PauseRecorder(QObject):
+    """
+    Records when a sequence reports that it paused. It is moved to the sequence thread so it is
+    notified immediately, without waiting for the main thread's (not running) event loop.
+    """
+
+    def __init__(self, thread: SequenceThread):
+        QObject.__init__(self)
+        self.paused_times: list[float] = []
+        self.moveToThread(thread)
+        thread.statusChanged.connect(self.record_status)
+
+    def record_status(self, status: SequenceStatus):
+        if status == SequenceStatus.Paused:
+            self.paused_times.append(time.perf_counter())
+
+
+def start_thread(
+    thread_type: type[SequenceThread], data_directory: Path
+) -> tuple[SequenceThread, IdleStep, PauseRecorder]:
+    """Start a sequence containing a single `IdleStep`."""
+    step = IdleStep()
+    thread = thread_type([step], data_directory)
+    recorder = PauseRecorder(thread)
+    thread.start()
+    time.sleep(0.2)  # let the sequence start
+    return (thread, step, recorder)  # the recorder must stay alive to stay connected
+
+
+def measure_idle_cpu(
+    thread_type: type[SequenceThread], data_directory: Path, paused: bool = False
+) -> float:
+    """Measure the CPU usage (in percent of one core) of an idle sequence, or a paused one."""
+    thread, _, recorder = start_thread(thread_type, data_directory)
+    if paused:
+        thread.send_command(SequenceCommand.Pause)
+        while len(recorder.paused_times) == 0:
+            time.sleep(0.001)
+    start_cpu = time.process_time()
+    time.sleep(IDLE_SECONDS)
+    cpu_percent = (time.process_time() - start_cpu) / IDLE_SECONDS * 100
+    thread.send_command(SequenceCommand.Cancel)
+    thread.wait()
+    return cpu_percent
+
+
+def measure_latency(
+    thread_type: type[SequenceThread], data_directory: Path
+) -> tuple[list[float], list[float]]:
+    """Measure pause and cancel latencies in milliseconds."""
+    pause_latencies: list[float] = []
+    cancel_latencies: list[float] = []
+    for _ in range(LATENCY_REPEATS):
+        thread, step, recorder = start_thread(thread_type, data_directory)
+        sent_at = time.perf_counter()
+        thread.send_command(SequenceCommand.Pause)
+        while len(recorder.paused_times) == 0:
+            time.sleep(0.0001)
+        pause_latencies.append((recorder.paused_times[0] - sent_at) * 1000)
+        thread.send_command(SequenceCommand.Unpause)
+        time.sleep(0.05)
+        sent_at = time.perf_counter()
+        thread.send_command(SequenceCommand.Cancel)
+        thread.wait()
+        if step.cancelled_at is not None:
+            cancel_latencies.append((step.cancelled_at - sent_at) * 1000)
+    return (pause_latencies, cancel_latencies)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        data_directory = Path(directory)
+        for label, thread_type in (
+            ("before (polling)", PollingSequenceThread),
+            ("after (event-driven)", SequenceThread),
+        ):
+            cpu_percent = measure_idle_cpu(thread_type, data_directory)
+            paused_cpu_percent = measure_idle_cpu(thread_type, data_directory, paused=True)
+            pause_latencies, cancel_latencies = measure_latency(thread_type, data_directory)
+            print(f"{label}")
+            print(f"    idle CPU usage:         {cpu_percent:.1f}% of one core")
+            print(f"    paused CPU usage:       {paused_cpu_percent:.1f}% of one core")
+            print(f"    median pause latency:   {statistics.median(pause_latencies):.3f} ms")
+            print(f"    median cancel latency:  {statistics.median(cancel_latencies):.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
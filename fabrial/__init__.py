@@ -1,7 +1,8 @@
 from .__main__ import main
-from .classes import SequenceStep, StepCancellation, StepRunner
+from .classes import DataKey, RetryPolicy, SequenceStep, StepCancellation, StepRunner
 from .constants.paths import SAVED_DATA_FOLDER
 from .custom_widgets.settings import PluginSettingsWidget
+from .enums import MissedTickPolicy, PlotOverflowPolicy
 from .main_window import MainWindow
 from .sequence_builder import DataItem, ItemWidget, WidgetDataItem
 from .utility.application_shortcut import create_application_shortcut
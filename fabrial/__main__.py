@@ -41,6 +41,13 @@ def fix_windows_sucking():
 
 
 def main():
+    # `fabrial run sequence.json --data-dir DIR` runs a sequence without the graphical interface.
+    # Headless runs don't share any state with the application, so they skip the singleton
+    if len(sys.argv) > 1 and sys.argv[1] == "run":
+        from fabrial import headless  # only needed for headless runs
+
+        sys.exit(headless.main(sys.argv[2:]))
+
     me = check_for_other_instances()  # noqa
     make_application_folders()
     errors.set_up_logging()
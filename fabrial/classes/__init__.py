@@ -1,9 +1,20 @@
 from .actions import Action, Shortcut
-from .exceptions import FatalSequenceError, PluginError, StepCancellation
+from .data_store import DataChannel, DataKey, SequenceData
+from .exceptions import (
+    FatalSequenceError,
+    PluginError,
+    ResourceDeadlockError,
+    StepCancellation,
+)
 from .lock import DataLock
 from .metaclasses import QABC, QABCMeta
+from .prompt_policy import PromptPolicy, PromptRule
+from .reply import Reply
+from .retry import RetryPolicy
 from .sequence_runner import SequenceRunner
 from .sequence_step import SequenceStep
 from .sequence_thread import SequenceThread
 from .step_runner import StepRunner
+from .sweep import ParameterRange
+from .ticker import Tick, Ticker
 from .timer import Timer
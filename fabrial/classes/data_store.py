@@ -0,0 +1,261 @@
+"""Values and channels that sequence steps share in memory."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import re
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Self
+
+import numpy as np
+
+STEP_OUTPUTS: ContextVar[list[tuple[DataKey[Any], Any]] | None] = ContextVar(
+    "STEP_OUTPUTS", default=None
+)
+"""The values the running step published with `persist=True`."""
+
+
+@dataclass(frozen=True)
+class DataKey[Value]:
+    """
+    The typed name of a value or channel in a `SequenceData` store. Define keys once (i.e. as
+    module constants) and share them between the steps that publish and read the value.
+
+    ```python
+    SPECTRUM = DataKey("spectrum", np.ndarray)
+    ```
+
+    Parameters
+    ----------
+    name
+        The value's name. This is also the filename used when the value is persisted (characters
+        other than letters, digits, `-`, `_` and `.` are replaced with `_`).
+    value_type
+        The type values must have.
+    """
+
+    name: str
+    value_type: type[Value]
+
+    def check(self, value: Any) -> Value:
+        """
+        Make sure **value** has this key's type. NumPy arrays are returned as read-only views, so
+        readers share the publisher's memory without being able to modify it.
+
+        Raises
+        ------
+        TypeError
+            **value** has the wrong type.
+        """
+        if not isinstance(value, self.value_type):
+            raise TypeError(
+                f"{self.name!r} holds {self.value_type.__name__}, not {type(value).__name__}"
+            )
+        if isinstance(value, np.ndarray):
+            view = value.view()
+            view.flags.writeable = False
+            return view  # type: ignore[return-value]
+        return value
+
+
+class DataChannel[Value]:
+    """
+    A stream of values from one or more steps to a consumer. Every value is received once, in the
+    order it was sent. Iterate with `async for` to receive until the channel is closed.
+    """
+
+    def __init__(self, key: DataKey[Value]):
+        self.key = key
+        self.queue: asyncio.Queue[Value] = asyncio.Queue()
+
+    def send(self, value: Value):
+        """
+        Send **value** to the channel. This never waits.
+
+        Raises
+        ------
+        TypeError
+            **value** has the wrong type.
+        asyncio.QueueShutDown
+            The channel is closed.
+        """
+        self.queue.put_nowait(self.key.check(value))
+
+    def close(self):
+        """Close the channel. Values that were already sent can still be received."""
+        self.queue.shutdown()
+
+    async def receive(self) -> Value:
+        """
+        Wait for the next value.
+
+        Raises
+        ------
+        asyncio.QueueShutDown
+            The channel is closed and has no more values.
+        """
+        return await self.queue.get()
+
+    def __aiter__(self) -> Self:
+        return self
+
+    async def __anext__(self) -> Value:
+        try:
+            return await self.receive()
+        except asyncio.QueueShutDown:
+            raise StopAsyncIteration from None
+
+
+class SequenceData:
+    """
+    Values and channels that a sequence's steps share in memory (i.e. a measurement step publishes
+    a spectrum and a later analysis step reads it without going through the disk). The store lasts
+    as long as the sequence. Access it through `StepRunner.data`.
+    """
+
+    def __init__(self):
+        self.values: dict[str, Any] = {}
+        self.key_types: dict[str, type] = {}
+        self.published_events: defaultdict[str, asyncio.Event] = defaultdict(asyncio.Event)
+        self.channels: dict[str, DataChannel[Any]] = {}
+
+    def publish[Value](self, key: DataKey[Value], value: Value, persist: bool = False):
+        """
+        Publish **value** under **key**, replacing any previous value, and wake up steps waiting for
+        it. Values are shared, not copied, so don't modify a value after publishing it.
+
+        Parameters
+        ----------
+        key
+            The value's key.
+        value
+            The value.
+        persist
+            Whether to also save the value to the publishing step's data directory when the step
+            completes. NumPy arrays are saved as `.npy` files and everything else as JSON.
+
+        Raises
+        ------
+        TypeError
+            **value** has the wrong type, or **key**'s name is used with a different type.
+        """
+        self.check_key(key)
+        self.values[key.name] = value = key.check(value)
+        self.published_events[key.name].set()
+        if persist:
+            if (outputs := STEP_OUTPUTS.get()) is not None:
+                outputs.append((key, value))
+            else:
+                logging.getLogger(__name__).warning(
+                    f"{key.name!r} was published outside of a step and won't be persisted"
+                )
+
+    async def get[Value](self, key: DataKey[Value]) -> Value:
+        """
+        Get the value of **key**, waiting until it is published if necessary.
+
+        Raises
+        ------
+        TypeError
+            **key**'s name is used with a different type.
+        """
+        self.check_key(key)
+        await self.published_events[key.name].wait()
+        return self.values[key.name]
+
+    def get_nowait[Value](self, key: DataKey[Value]) -> Value | None:
+        """
+        Get the value of **key**, or `None` if it hasn't been published.
+
+        Raises
+        ------
+        TypeError
+            **key**'s name is used with a different type.
+        """
+        self.check_key(key)
+        return self.values.get(key.name)
+
+    def channel[Value](self, key: DataKey[Value]) -> DataChannel[Value]:
+        """
+        Get the channel for **key**, creating it if necessary.
+
+        Raises
+        ------
+        TypeError
+            **key**'s name is used with a different type.
+        """
+        self.check_key(key)
+        if (channel := self.channels.get(key.name)) is None:
+            channel = self.channels[key.name] = DataChannel(key)
+        return channel
+
+    def check_key(self, key: DataKey[Any]):  # private
+        """
+        Make sure every use of **key**'s name has the same type.
+
+        Raises
+        ------
+        TypeError
+            **key**'s name was used with a different type.
+        """
+        value_type = self.key_types.setdefault(key.name, key.value_type)
+        if value_type is not key.value_type:
+            raise TypeError(
+                f"{key.name!r} holds {value_type.__name__}, not {key.value_type.__name__}"
+            )
+
+
+def save_outputs(outputs: list[tuple[DataKey[Any], Any]], data_directory: Path):
+    """
+    Save persisted values to **data_directory**. If a value was published more than once, only the
+    latest value is saved.
+
+    Raises
+    ------
+    OSError
+        A value couldn't be saved.
+    TypeError
+        A value can't be converted to JSON.
+    """
+    latest_outputs = {key.name: value for key, value in outputs}
+    for name, value in latest_outputs.items():
+        extension = "npy" if isinstance(value, np.ndarray) else "json"
+        save_value(value, data_directory.joinpath(f"{output_filename(name)}.{extension}"))
+
+
+def output_filename(name: str) -> str:
+    """Turn a value's **name** into a filename that stays inside the data directory."""
+    filename = re.sub(r"[^\w.-]", "_", name, flags=re.ASCII).lstrip(".")
+    return filename if filename != "" else "_"
+
+
+def save_value(value: Any, file: Path):
+    """
+    Save **value** to **file**. The value is written to a temporary file that then replaces
+    **file**, so **file** is never left half-written.
+
+    Raises
+    ------
+    OSError
+        The value couldn't be saved.
+    TypeError
+        The value can't be converted to JSON.
+    """
+    temporary_file = file.with_name(f"{file.name}.tmp")
+    try:
+        if isinstance(value, np.ndarray):
+            with open(temporary_file, "wb") as f:
+                np.save(f, value)
+        else:
+            with open(temporary_file, "w") as f:
+                json.dump(value, f, indent=4)
+        os.replace(temporary_file, file)
+    except BaseException:
+        temporary_file.unlink(missing_ok=True)
+        raise
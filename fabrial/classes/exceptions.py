@@ -15,3 +15,10 @@ class StepCancellation(BaseException):
 
 class PluginError(Exception):
     """An error caused by a faulty plugin."""
+
+
+class ResourceDeadlockError(Exception):
+    """
+    Raised instead of waiting for a resource (see `StepRunner.resource()`) when waiting would never
+    finish.
+    """
@@ -0,0 +1,211 @@
+"""A durable record of a sequence's progress, used to resume interrupted sequences."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Self, TextIO
+
+from ..constants.sequence import AUTOSAVE_FILENAME, JOURNAL_FILENAME
+
+EVENT = "Event"
+STEP = "Step"
+DATETIME = "Datetime"
+OUTCOME = "Outcome"
+# events
+SEQUENCE_STARTED = "Sequence Started"
+SEQUENCE_RESUMED = "Sequence Resumed"
+SEQUENCE_FINISHED = "Sequence Finished"
+STEP_STARTED = "Step Started"
+STEP_COMPLETED = "Step Completed"
+# step outcomes. Only steps that succeeded are skipped when resuming
+SUCCEEDED = "Succeeded"
+CANCELLED = "Cancelled"
+FAILED = "Failed"
+
+
+class ProgressJournal:
+    """
+    An append-only journal of which steps have started and completed, and how they completed. Steps
+    are identified by the path of their data directory relative to the sequence's data directory
+    (i.e. `"1 Parallel/2 Hold"`), which is the same every time a sequence runs and includes loop
+    iterations. Completion entries are synced to disk before the step counts as completed, so the
+    journal survives crashes and power loss.
+
+    Use `create()` or `resume()` to create a journal.
+
+    Parameters
+    ----------
+    data_directory
+        The sequence's data directory.
+    file
+        The open journal file.
+    completed_steps
+        The steps that a previous run of the sequence completed successfully. These are skipped.
+    """
+
+    def __init__(self, data_directory: Path, file: TextIO, completed_steps: set[str]):
+        self.data_directory = data_directory
+        self.file = file
+        self.completed_steps = completed_steps
+
+    @classmethod
+    def create(cls, data_directory: Path) -> Self:
+        """
+        Start a new journal in **data_directory**, replacing any existing journal.
+
+        Raises
+        ------
+        OSError
+            The journal couldn't be created.
+        """
+        journal = cls(data_directory, open(data_directory.joinpath(JOURNAL_FILENAME), "w"), set())
+        journal.write(SEQUENCE_STARTED)
+        journal.sync()
+        return journal
+
+    @classmethod
+    def resume(cls, data_directory: Path) -> Self:
+        """
+        Continue the journal in **data_directory**. Steps the journal lists as completed
+        successfully are skipped.
+
+        Raises
+        ------
+        OSError
+            The journal couldn't be read or opened.
+        """
+        file = data_directory.joinpath(JOURNAL_FILENAME)
+        completed_steps, unfinished_steps = read_journal(file)
+        for step_path in sorted(unfinished_steps):
+            logging.getLogger(__name__).info(
+                f"Step {step_path} didn't complete successfully and will re-run"
+            )
+        journal = cls(data_directory, open(file, "a"), completed_steps)
+        # end an entry that was only partially written (blank lines are ignored)
+        journal.file.write("\n")
+        journal.write(SEQUENCE_RESUMED)
+        journal.sync()
+        return journal
+
+    def step_path(self, step_data_directory: Path) -> str:
+        """Get the path that identifies the step whose data directory is **step_data_directory**."""
+        return step_data_directory.relative_to(self.data_directory).as_posix()
+
+    def is_completed(self, step_path: str) -> bool:
+        """
+        Whether the step at **step_path** was completed successfully by a previous run of the
+        sequence.
+        """
+        return step_path in self.completed_steps
+
+    def step_started(self, step_path: str):
+        """
+        Record that the step at **step_path** started. This entry isn't synced to disk (only
+        completion entries decide which steps are skipped).
+
+        Raises
+        ------
+        OSError
+            The entry couldn't be written.
+        """
+        self.write(STEP_STARTED, step_path)
+
+    async def step_completed(self, step_path: str, outcome: str):
+        """
+        Record that the step at **step_path** completed with **outcome** (i.e. `SUCCEEDED`) and
+        wait until the entry reaches the disk. The disk is synced on another thread, so the rest of
+        the sequence keeps running.
+
+        Raises
+        ------
+        OSError
+            The entry couldn't be written.
+        """
+        self.write(STEP_COMPLETED, step_path, outcome)
+        await asyncio.to_thread(self.sync)
+
+    def close(self):
+        """Record that the sequence finished, then close the journal. Logs errors."""
+        try:
+            self.write(SEQUENCE_FINISHED)
+            self.sync()
+            self.file.close()
+        except OSError:
+            logging.getLogger(__name__).exception("Failed to close the progress journal")
+
+    def write(
+        self, event: str, step_path: str | None = None, outcome: str | None = None
+    ):  # private
+        """
+        Append an entry and hand it to the operating system. Use `sync()` to make sure it reaches
+        the disk.
+
+        Raises
+        ------
+        OSError
+            The entry couldn't be written.
+        """
+        entry = {EVENT: event, DATETIME: str(datetime.now())}
+        if step_path is not None:
+            entry[STEP] = step_path
+        if outcome is not None:
+            entry[OUTCOME] = outcome
+        self.file.write(json.dumps(entry) + "\n")
+        self.file.flush()
+
+    def sync(self):  # private
+        """
+        Make sure the written entries reach the disk. This can be called from any thread.
+
+        Raises
+        ------
+        OSError
+            The entries couldn't be synced.
+        """
+        os.fsync(self.file.fileno())
+
+
+def read_journal(file: Path) -> tuple[set[str], set[str]]:
+    """
+    Read a journal **file**. Invalid entries (i.e. an entry that was only partially written when
+    the computer lost power) are ignored. If a step completed more than once, its last outcome
+    counts.
+
+    Returns
+    -------
+    A tuple of (the paths of steps that completed successfully, the paths of steps that started but
+    didn't complete successfully).
+
+    Raises
+    ------
+    OSError
+        The file couldn't be read.
+    """
+    outcomes: dict[str, str] = {}  # {step path: the outcome of its last run}
+    started_steps: set[str] = set()
+    with open(file, "r") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+                event = entry[EVENT]
+                if event == STEP_STARTED:
+                    started_steps.add(entry[STEP])
+                elif event == STEP_COMPLETED:
+                    outcomes[entry[STEP]] = entry[OUTCOME]
+            except (ValueError, KeyError, TypeError):
+                continue
+    completed_steps = {step_path for step_path, outcome in outcomes.items() if outcome == SUCCEEDED}
+    return (completed_steps, (started_steps | outcomes.keys()) - completed_steps)
+
+
+def can_resume(data_directory: Path) -> bool:
+    """Whether **data_directory** contains a sequence that can be resumed."""
+    return (
+        data_directory.joinpath(JOURNAL_FILENAME).is_file()
+        and data_directory.joinpath(AUTOSAVE_FILENAME).is_file()
+    )
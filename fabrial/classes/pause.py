@@ -0,0 +1,45 @@
+"""Cooperative pausing for the sequence."""
+
+import asyncio
+from contextvars import ContextVar
+
+
+class PauseGate:
+    """
+    A gate that sequence tasks wait at while the sequence is paused. Tasks only stop at their next
+    `SequenceStep.sleep()` (or anything else that calls `wait()`), and the event loop stays idle
+    while every task is waiting.
+    """
+
+    def __init__(self):
+        self.open_event = asyncio.Event()
+        self.open_event.set()  # start open
+
+    def open(self):
+        """Open the gate (i.e. unpause)."""
+        self.open_event.set()
+
+    def close(self):
+        """Close the gate (i.e. pause)."""
+        self.open_event.clear()
+
+    def is_open(self) -> bool:
+        """Whether the gate is open."""
+        return self.open_event.is_set()
+
+    async def wait(self):
+        """Wait until the gate is open. This returns immediately for unpausable tasks."""
+        if PAUSABLE.get():
+            await self.open_event.wait()
+
+
+CURRENT_GATE: ContextVar[PauseGate | None] = ContextVar("CURRENT_GATE", default=None)
+"""The `PauseGate` of the sequence the current task belongs to."""
+PAUSABLE: ContextVar[bool] = ContextVar("PAUSABLE", default=True)
+"""Whether the current task stops when the sequence is paused."""
+
+
+async def wait_if_paused():
+    """Wait until the current sequence is unpaused. Does nothing outside of a sequence."""
+    if (gate := CURRENT_GATE.get()) is not None:
+        await gate.wait()
@@ -0,0 +1,421 @@
+"""Delivers plot commands to the display in batches, one batch per display frame."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+from collections.abc import Callable, Iterable
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from ..enums import PlotOverflowPolicy
+from ..plotting import (
+    DEFAULT_MAX_PENDING_POINTS,
+    AddPoint,
+    AddPoints,
+    LineIndex,
+    PlotCommand,
+    PlotIndex,
+    RemovePlot,
+)
+from . import profiling
+
+DEFAULT_FRAME_RATE = 30
+"""How many batches of plot commands are delivered per second by default."""
+MAX_BATCHES_IN_FLIGHT = 2
+"""How many delivered batches the display can be behind before new batches are held back."""
+
+CURRENT_BATCHER: ContextVar[PlotCommandBatcher | None] = ContextVar("CURRENT_BATCHER", default=None)
+"""The `PlotCommandBatcher` of the sequence the current task belongs to."""
+
+
+class PlotBatch:
+    """
+    Plot commands that are delivered to the display together. Run the commands in order, then call
+    `mark_applied()`.
+    """
+
+    def __init__(self, commands: list[PlotCommand], batcher: PlotCommandBatcher):
+        self.commands = commands
+        self.batcher = batcher
+
+    def mark_applied(self):
+        """Record that the display ran the commands. This can be called from any thread."""
+        batcher = self.batcher
+        # only the display's thread writes these counters, so no lock is needed
+        batcher.applied_commands += len(self.commands)
+        batcher.applied_batches += 1
+        # `holding` is set before the batcher checks these counters, so either it sees our update
+        # or we see that it is holding a batch back
+        if batcher.holding and batcher.loop is not None:
+            with contextlib.suppress(RuntimeError):  # the sequence already ended
+                batcher.loop.call_soon_threadsafe(batcher.flush)
+
+
+class PendingPoints:
+    """
+    The points of one line that are waiting to be delivered. Points are kept losslessly unless the
+    display is behind (see `PlotCommandBatcher.is_behind()`) when **capacity** points are pending;
+    from then on, new points are handled according to **policy**.
+    """
+
+    def __init__(
+        self,
+        batcher: PlotCommandBatcher,
+        line_index: LineIndex,
+        policy: PlotOverflowPolicy,
+        capacity: int,
+    ):
+        self.batcher = batcher
+        self.line_index = line_index
+        self.policy = policy
+        self.capacity = capacity
+        self.limit = capacity  # the number of points at which the display is checked again
+        self.x_values: list[float] = []
+        self.y_values: list[float] = []
+        self.overflowing = False  # whether the capacity was reached while the display was behind
+        self.received = 0  # only counted once overflowing
+        # the number of received points that each kept point (or min-max pair) stands for
+        self.stride = 1
+        # the points received since the last min-max pair (for `KeepMinMax`)
+        self.group_x: list[float] = []
+        self.group_y: list[float] = []
+
+    def add(self, x: float, y: float):
+        """Add a point."""
+        if not self.overflowing:
+            self.x_values.append(x)
+            self.y_values.append(y)
+            if len(self.x_values) >= self.limit:
+                self.check_limit()
+            return
+
+        position = self.received
+        self.received += 1
+        match self.policy:
+            case PlotOverflowPolicy.Block:
+                self.x_values.append(x)
+                self.y_values.append(y)
+                return
+            case PlotOverflowPolicy.DropOldest:
+                self.x_values.append(x)
+                self.y_values.append(y)
+            case PlotOverflowPolicy.KeepEveryNth:
+                if position % self.stride != 0:
+                    return
+                self.x_values.append(x)
+                self.y_values.append(y)
+            case PlotOverflowPolicy.KeepMinMax:
+                self.group_x.append(x)
+                self.group_y.append(y)
+                if len(self.group_x) < self.stride:
+                    return
+                self.add_group_extremes()
+        if len(self.x_values) >= self.capacity:
+            self.thin_out()
+
+    def add_many(self, x_values: Iterable[float], y_values: Iterable[float]):
+        """Add several points."""
+        if self.overflowing:
+            for x, y in zip(x_values, y_values):
+                self.add(x, y)
+            return
+        self.x_values.extend(x_values)
+        self.y_values.extend(y_values)
+        if len(self.x_values) >= self.limit:
+            self.check_limit()
+
+    def check_limit(self):  # private
+        """
+        Start applying the policy if the display is behind. Otherwise keep every point and check
+        again once another **capacity** points were added.
+        """
+        if not self.batcher.is_behind():
+            self.limit = len(self.x_values) + self.capacity
+            return
+        self.overflowing = True
+        self.received = len(self.x_values)
+        if self.policy is PlotOverflowPolicy.KeepMinMax:
+            self.stride = 2  # the points so far are (trivial) pairs
+        self.thin_out()
+
+    def take(self) -> tuple[list[float], list[float], int]:
+        """Get the pending `(x values, y values, number of dropped points)`."""
+        if len(self.group_x) > 0:
+            self.add_group_extremes()
+        if self.overflowing and self.policy is PlotOverflowPolicy.DropOldest:
+            del self.x_values[: -self.capacity]
+            del self.y_values[: -self.capacity]
+        received = self.received if self.overflowing else len(self.x_values)
+        return (self.x_values, self.y_values, received - len(self.x_values))
+
+    def thin_out(self):  # private
+        """Make room once the capacity is reached."""
+        match self.policy:
+            case PlotOverflowPolicy.Block:
+                pass  # the producer is stopped instead
+            case PlotOverflowPolicy.DropOldest:
+                # dropping in chunks keeps appending cheap; `take()` trims to the capacity
+                if len(self.x_values) >= 2 * self.capacity:
+                    del self.x_values[: -self.capacity]
+                    del self.y_values[: -self.capacity]
+            case PlotOverflowPolicy.KeepEveryNth:
+                # more than the capacity can be pending if the display fell behind late
+                while len(self.x_values) >= self.capacity:
+                    del self.x_values[1::2]
+                    del self.y_values[1::2]
+                    self.stride *= 2
+            case PlotOverflowPolicy.KeepMinMax:
+                while len(self.x_values) >= self.capacity:
+                    self.merge_pairs()
+
+    def merge_pairs(self):  # private
+        """Merge neighboring min-max pairs into one pair. A leftover partial group stays as is."""
+        x_values: list[float] = []
+        y_values: list[float] = []
+        end = len(self.x_values) - len(self.x_values) % 4
+        for start in range(0, end, 4):
+            add_extremes(
+                self.x_values[start : start + 4],
+                self.y_values[start : start + 4],
+                x_values,
+                y_values,
+            )
+        x_values.extend(self.x_values[end:])
+        y_values.extend(self.y_values[end:])
+        self.x_values = x_values
+        self.y_values = y_values
+        self.stride *= 2
+
+    def add_group_extremes(self):  # private
+        """Keep the lowest and highest point of the current group, then start a new group."""
+        add_extremes(self.group_x, self.group_y, self.x_values, self.y_values)
+        self.group_x = []
+        self.group_y = []
+
+
+def add_extremes(
+    x_values: list[float], y_values: list[float], kept_x: list[float], kept_y: list[float]
+):
+    """
+    Add the lowest and highest point (by y value) to **kept_x** and **kept_y**, in order. If they
+    are the same point, it is only added once.
+    """
+    positions = range(len(y_values))
+    lowest = min(positions, key=y_values.__getitem__)
+    highest = max(positions, key=y_values.__getitem__)
+    for position in sorted({lowest, highest}):
+        kept_x.append(x_values[position])
+        kept_y.append(y_values[position])
+
+
+@dataclass
+class PlotBatchStatistics:
+    """
+    The batches a `PlotCommandBatcher` delivered. The queue depth is the number of commands that
+    were delivered but not yet run by the display when a batch was delivered, which shows how far
+    the display is behind. Batches are held back while the display is too far behind, and points
+    are dropped from the plot according to each line's `PlotOverflowPolicy`.
+    """
+
+    batches: int = 0
+    commands: int = 0
+    max_batch_size: int = 0
+    total_queue_depth: int = 0
+    max_queue_depth: int = 0
+    held_back: int = 0
+    dropped_points: int = 0
+
+    def add(self, batch_size: int, queue_depth: int):
+        """Record a batch of **batch_size** commands delivered with **queue_depth**."""
+        self.batches += 1
+        self.commands += batch_size
+        self.max_batch_size = max(self.max_batch_size, batch_size)
+        self.total_queue_depth += queue_depth
+        self.max_queue_depth = max(self.max_queue_depth, queue_depth)
+
+    def as_dict(self) -> dict[str, float]:
+        """Convert the statistics to a JSON-friendly dictionary."""
+        return {
+            "Batches": self.batches,
+            "Commands": self.commands,
+            "Mean Batch Size": self.commands / self.batches if self.batches > 0 else 0,
+            "Max Batch Size": self.max_batch_size,
+            "Mean Queue Depth": self.total_queue_depth / self.batches if self.batches > 0 else 0,
+            "Max Queue Depth": self.max_queue_depth,
+            "Times Held Back": self.held_back,
+            "Dropped Points": self.dropped_points,
+        }
+
+
+class PlotCommandBatcher:
+    """
+    Collects plot commands on the sequence's thread and delivers them as one `PlotBatch` per
+    display frame, so the display handles a few large batches instead of a flood of single commands.
+    Commands are always delivered in the order they were submitted, and a line's points are merged
+    into one `AddPoints` command.
+
+    If the display falls behind, batches are held back until it catches up, and each line holds a
+    limited number of points in the meantime (see `set_line_policy()`). Points are only dropped
+    while the display is behind, so a display that keeps up (like the headless display, which runs
+    batches as they are delivered) gets every point. Other commands are never dropped.
+
+    Parameters
+    ----------
+    deliver
+        Sends a batch to the display (i.e. emits a signal).
+    frame_rate
+        How many batches to deliver per second. If this is `None`, every command is delivered
+        immediately (unless the display is behind).
+    """
+
+    def __init__(self, deliver: Callable[[PlotBatch], None], frame_rate: float | None):
+        self.deliver = deliver
+        self.frame_rate = frame_rate
+        self.frame_interval = 1 / frame_rate if frame_rate is not None else 0
+        self.pending: list[PlotCommand | PendingPoints] = []
+        # the `PendingPoints` that new points of a line are added to. Cleared when another command
+        # is submitted so that points stay in order with it
+        self.open_points: dict[LineIndex, PendingPoints] = {}
+        self.line_policies: dict[LineIndex, tuple[PlotOverflowPolicy, int]] = {}
+        self.flush_handle: asyncio.TimerHandle | None = None
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.last_flush_time = 0.0
+        self.holding = False  # whether a batch is held back until the display catches up
+        self.delivered_commands = 0
+        self.delivered_batches = 0
+        # updated by the display's thread
+        self.applied_commands = 0
+        self.applied_batches = 0
+        # tasks that filled a line with the `Block` policy and wait until the next delivery
+        self.blocked_tasks: set[asyncio.Task[object]] = set()
+        self.delivered_event = asyncio.Event()
+        self.statistics = PlotBatchStatistics()
+
+    def set_line_policy(self, line_index: LineIndex, policy: PlotOverflowPolicy, capacity: int):
+        """
+        Set what happens to the points of the line at **line_index** once **capacity** (at least 4)
+        of them are pending while the display is behind. Lines use `PlotOverflowPolicy.KeepMinMax`
+        with `DEFAULT_MAX_PENDING_POINTS` by default.
+        """
+        self.line_policies[line_index] = (policy, capacity)
+
+    def submit(self, command: PlotCommand, immediate: bool = False):
+        """
+        Add **command** to the current batch. The batch is delivered at the next frame, or now if
+        **immediate** is `True` (i.e. the caller is waiting for the command's reply). This must be
+        called from the sequence's event loop.
+        """
+        points: PendingPoints | None = None
+        if type(command) is AddPoint:  # by far the most common command
+            if (points := self.open_points.get(command.line_index)) is None:
+                points = self.open_line(command.line_index)
+            points.add(command.x, command.y)
+        elif type(command) is AddPoints:
+            if (points := self.open_points.get(command.line_index)) is None:
+                points = self.open_line(command.line_index)
+            points.add_many(command.x_values, command.y_values)
+        else:
+            self.open_points.clear()
+            if type(command) is RemovePlot:
+                self.forget_lines(command.plot_index)
+            self.pending.append(command)
+        if (
+            points is not None
+            and points.overflowing
+            and points.policy is PlotOverflowPolicy.Block
+            and (task := asyncio.current_task()) is not None
+        ):
+            self.blocked_tasks.add(task)
+
+        if immediate or self.frame_interval == 0:
+            self.loop = asyncio.get_running_loop()
+            self.flush()
+        elif self.flush_handle is None:
+            self.loop = loop = asyncio.get_running_loop()
+            next_frame_time = self.last_flush_time + self.frame_interval
+            self.flush_handle = loop.call_later(
+                max(next_frame_time - time.monotonic(), 0), self.flush
+            )
+
+    def flush(self, force: bool = False):
+        """
+        Deliver the current batch now (if there is one). Unless **force** is `True`, the batch is
+        held back while the display is too far behind; it is delivered once the display catches up.
+        """
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        if len(self.pending) == 0:
+            return
+        was_holding = self.holding
+        self.holding = True  # set before checking, see `PlotBatch.mark_applied()`
+        if not force and self.is_behind():
+            if not was_holding:
+                self.statistics.held_back += 1
+            return
+        self.holding = False
+
+        commands: list[PlotCommand] = []
+        for entry in self.pending:
+            if isinstance(entry, PendingPoints):
+                x_values, y_values, dropped_points = entry.take()
+                commands.append(AddPoints(entry.line_index, x_values, y_values))
+                self.statistics.dropped_points += dropped_points
+            else:
+                commands.append(entry)
+        self.pending = []
+        self.open_points.clear()
+        batch = PlotBatch(commands, self)
+        self.statistics.add(len(commands), self.delivered_commands - self.applied_commands)
+        self.delivered_commands += len(commands)
+        self.delivered_batches += 1
+        self.last_flush_time = time.monotonic()
+        if len(self.blocked_tasks) > 0:
+            self.blocked_tasks.clear()
+            self.delivered_event.set()
+            self.delivered_event = asyncio.Event()
+        self.deliver(batch)
+
+    def is_behind(self) -> bool:
+        """Whether the display is too far behind to deliver another batch."""
+        return self.delivered_batches - self.applied_batches >= MAX_BATCHES_IN_FLIGHT
+
+    async def wait_for_room(self):
+        """
+        If the current task filled a line that uses `PlotOverflowPolicy.Block`, wait until the
+        line's points are delivered. The wait is recorded as time spent waiting for the GUI.
+        """
+        if len(self.blocked_tasks) == 0 or asyncio.current_task() not in self.blocked_tasks:
+            return
+        start_time = time.perf_counter()
+        await self.delivered_event.wait()
+        if (profile := profiling.current_profile()) is not None:
+            profile.add_gui_wait(time.perf_counter() - start_time)
+
+    def open_line(self, line_index: LineIndex) -> PendingPoints:  # private
+        """Start collecting points for the line at **line_index**."""
+        policy, capacity = self.line_policies.get(
+            line_index, (PlotOverflowPolicy.KeepMinMax, DEFAULT_MAX_PENDING_POINTS)
+        )
+        points = self.open_points[line_index] = PendingPoints(self, line_index, policy, capacity)
+        self.pending.append(points)
+        return points
+
+    def forget_lines(self, plot_index: PlotIndex):  # private
+        """Forget the policies of the lines on the plot at **plot_index**."""
+        self.line_policies = {
+            line_index: policy
+            for line_index, policy in self.line_policies.items()
+            if line_index.plot_index != plot_index
+        }
+
+
+async def wait_for_display():
+    """
+    Wait if the current task filled a plot line that uses `PlotOverflowPolicy.Block` (see
+    `PlotCommandBatcher.wait_for_room()`). Does nothing outside of a sequence.
+    """
+    if (batcher := CURRENT_BATCHER.get()) is not None:
+        await batcher.wait_for_room()
@@ -0,0 +1,312 @@
+"""Performance profiles for sequence steps (recorded in each step's metadata)."""
+
+from __future__ import annotations
+
+import contextvars
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .timing import CallStatistics, TimingStatistics
+
+if TYPE_CHECKING:
+    from .plot_batcher import PlotBatchStatistics
+    from .ticker import Ticker
+
+CURRENT_PROFILE: contextvars.ContextVar[StepProfile | None] = contextvars.ContextVar(
+    "CURRENT_PROFILE", default=None
+)
+"""
+The profile of the step that is currently running. Tasks inherit this, so work done by a step's
+tasks is counted toward that step.
+"""
+
+
+class StepProfile:
+    """
+    Measures a step (or the whole sequence) while it runs. Measurements include the step's substeps
+    and, since the sequence runs on one thread, CPU time also includes any steps running at the same
+    time.
+
+    Parameters
+    ----------
+    parent
+        The profile of the step that ran this step (if any). When this profile stops, its counters
+        are added to the parent's.
+    name
+        The name of what is being measured (i.e. the step's name).
+    """
+
+    def __init__(self, parent: StepProfile | None, name: str):
+        self.parent = parent
+        self.name = name
+        self.start_time = time.perf_counter()
+        self.start_cpu_time = time.thread_time()
+        self.start_peak_memory = peak_memory()
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.gui_wait_time = 0.0
+        self.resource_wait_time = 0.0
+        self.plot_commands = 0
+        self.preparation_time = 0.0  # time spent in `SequenceStep.prepare()`
+        # seconds between the previous step's `run()` returning and this step's `run()` starting.
+        # Only measured for steps run one after another by `StepRunner.run_steps()`
+        self.gap_time: float | None = None
+        self.run_start_time: float | None = None  # when the step's `run()` was first called
+        self.data_size: int | None = None
+        self.peak_memory_increase: int | None = None
+        self.stalls: StallStatistics | None = None  # created when the first stall is detected
+        self.tickers: list[Ticker] = []
+        # (start time, stack) of a stall that is in progress. Set by the stall watchdog's thread
+        self.pending_stall: tuple[float, str] | None = None
+
+    def add_gui_wait(self, duration: float):
+        """Record waiting **duration** seconds for the GUI (i.e. for a prompt)."""
+        self.gui_wait_time += duration
+
+    def add_resource_wait(self, duration: float):
+        """Record waiting **duration** seconds for a resource (see `StepRunner.resource()`)."""
+        self.resource_wait_time += duration
+
+    def add_plot_command(self):
+        """Record a submitted plot command."""
+        self.plot_commands += 1
+
+    def add_ticker(self, ticker: Ticker):
+        """Record the statistics of a periodic timer created by the step."""
+        self.tickers.append(ticker)
+
+    def begin_stall(self, start_time: float, stack: str):
+        """
+        Record that the event loop has been stalled since **start_time** (from
+        `time.perf_counter()`) with the given **stack**. This is called from the stall watchdog's
+        thread; the stall is recorded by `end_stall()`.
+        """
+        self.pending_stall = (start_time, stack)
+
+    def end_stall(self):
+        """Record the stall started by `begin_stall()` (if any), which ends now."""
+        if (pending_stall := self.pending_stall) is not None:
+            self.pending_stall = None
+            start_time, stack = pending_stall
+            if self.stalls is None:
+                self.stalls = StallStatistics()
+            self.stalls.add(time.perf_counter() - start_time, stack)
+
+    def stop(self, data_directory: Path | None = None):
+        """
+        Stop measuring and add this profile's counters to the parent's. If **data_directory** is
+        provided, the size of its contents is recorded.
+        """
+        self.end_stall()  # a stall that is still pending ended when this step got to run again
+        self.wall_time = time.perf_counter() - self.start_time
+        self.cpu_time = time.thread_time() - self.start_cpu_time
+        if (end_peak_memory := peak_memory()) is not None and self.start_peak_memory is not None:
+            self.peak_memory_increase = end_peak_memory - self.start_peak_memory
+        if data_directory is not None:
+            self.data_size = directory_size(data_directory)
+        if self.parent is not None:
+            self.parent.gui_wait_time += self.gui_wait_time
+            self.parent.resource_wait_time += self.resource_wait_time
+            self.parent.plot_commands += self.plot_commands
+
+    def plot_command_rate(self) -> float:
+        """Plot commands per second of wall time."""
+        return self.plot_commands / self.wall_time if self.wall_time > 0 else 0
+
+    def as_dict(self) -> dict[str, object]:
+        """Convert the profile to a JSON-friendly dictionary."""
+        profile_as_dict: dict[str, object] = {
+            "Wall Time (s)": self.wall_time,
+            "CPU Time (s)": self.cpu_time,
+            "GUI Wait Time (s)": self.gui_wait_time,
+            "Resource Wait Time (s)": self.resource_wait_time,
+            "Plot Commands": self.plot_commands,
+            "Plot Command Rate (1/s)": self.plot_command_rate(),
+            "Preparation Time (s)": self.preparation_time,
+            "Gap Before Run (s)": self.gap_time,
+            "Data Size (bytes)": self.data_size,
+            "Peak Memory Increase (bytes)": self.peak_memory_increase,
+        }
+        if self.stalls is not None:
+            profile_as_dict["Event Loop Stalls"] = self.stalls.as_dict()
+        if len(self.tickers) > 0:
+            profile_as_dict["Periodic Timers"] = [ticker.as_dict() for ticker in self.tickers]
+        return profile_as_dict
+
+
+class StallStatistics:
+    """Event loop stalls detected while a step ran. Only the worst stalls keep their stacks."""
+
+    WORST_STALL_COUNT = 3
+
+    def __init__(self):
+        self.duration = TimingStatistics()
+        self.worst_stalls: list[tuple[float, str]] = []  # (duration, stack), longest first
+
+    def add(self, duration: float, stack: str):
+        """Record a stall that lasted **duration** seconds with the given **stack**."""
+        self.duration.add(duration)
+        self.worst_stalls.append((duration, stack))
+        self.worst_stalls.sort(key=lambda stall: stall[0], reverse=True)
+        del self.worst_stalls[self.WORST_STALL_COUNT :]
+
+    def as_dict(self) -> dict[str, object]:
+        """Convert the statistics to a JSON-friendly dictionary."""
+        return {
+            "Duration": self.duration.as_dict(),
+            "Worst": [
+                {"Duration (s)": duration, "Stack": stack.splitlines()}
+                for duration, stack in self.worst_stalls
+            ],
+        }
+
+
+@dataclass
+class StepTypeProfile:
+    """Totals for every run of one type of step. See `SequenceProfile`."""
+
+    wall_time: TimingStatistics = field(default_factory=TimingStatistics)
+    cpu_time: float = 0
+    gui_wait_time: float = 0
+    plot_commands: int = 0
+
+    def add(self, profile: StepProfile):
+        """Add a finished step's **profile**."""
+        self.wall_time.add(profile.wall_time)
+        self.cpu_time += profile.cpu_time
+        self.gui_wait_time += profile.gui_wait_time
+        self.plot_commands += profile.plot_commands
+
+    def as_dict(self) -> dict[str, object]:
+        """Convert the totals to a JSON-friendly dictionary."""
+        return {
+            "Wall Time": self.wall_time.as_dict(),
+            "CPU Time (s)": self.cpu_time,
+            "GUI Wait Time (s)": self.gui_wait_time,
+            "Plot Commands": self.plot_commands,
+        }
+
+
+class SequenceProfile:
+    """
+    The rollup of a sequence's performance: the whole sequence's profile and totals per step type.
+    Step types are identified by their fully qualified class names, which also tells you which
+    plugin the step comes from. Totals are kept as the sequence runs, so memory use stays constant
+    no matter how many steps run.
+    """
+
+    def __init__(self):
+        self.profile = StepProfile(None, "Sequence")
+        self.step_types: dict[str, StepTypeProfile] = {}
+        self.event_loop_lag: TimingStatistics | None = None  # set if stalls were being detected
+        self.resources: dict[str, CallStatistics] = {}  # wait and hold times by resource name
+        self.step_gaps = TimingStatistics()  # the idle time between consecutive steps
+        self.plot_batches: PlotBatchStatistics | None = None  # set when the sequence ends
+
+    def add_step(self, step_type: type, profile: StepProfile):
+        """Add the **profile** of a finished step of type **step_type**."""
+        name = f"{step_type.__module__}.{step_type.__qualname__}"
+        try:
+            step_type_profile = self.step_types[name]
+        except KeyError:
+            step_type_profile = self.step_types[name] = StepTypeProfile()
+        step_type_profile.add(profile)
+        if profile.gap_time is not None:
+            self.step_gaps.add(profile.gap_time)
+
+    def as_dict(self) -> dict[str, object]:
+        """Convert the rollup to a JSON-friendly dictionary. Step types are sorted slowest first."""
+        step_types = sorted(
+            self.step_types.items(), key=lambda item: item[1].wall_time.total, reverse=True
+        )
+        rollup: dict[str, object] = {
+            "Sequence": self.profile.as_dict(),
+            "Step Types": {name: profile.as_dict() for name, profile in step_types},
+        }
+        if self.event_loop_lag is not None:
+            rollup["Event Loop Lag"] = self.event_loop_lag.as_dict()
+        if self.step_gaps.count > 0:
+            rollup["Step Gaps"] = self.step_gaps.as_dict()
+        if self.plot_batches is not None and self.plot_batches.batches > 0:
+            rollup["Plot Batches"] = self.plot_batches.as_dict()
+        if len(self.resources) > 0:
+            rollup["Resources"] = {
+                name: {"Wait": statistics.wait.as_dict(), "Hold": statistics.run.as_dict()}
+                for name, statistics in self.resources.items()
+            }
+        return rollup
+
+
+def current_profile() -> StepProfile | None:
+    """Get the profile of the step that is currently running (if any)."""
+    return CURRENT_PROFILE.get()
+
+
+def directory_size(directory: Path) -> int:
+    """Get the total size (in bytes) of the files in **directory** and its subdirectories."""
+    size = 0
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        size += directory_size(Path(entry.path))
+                    elif entry.is_file(follow_symlinks=False):
+                        size += entry.stat(follow_symlinks=False).st_size
+                except OSError:  # the entry was removed while we were looking at it
+                    pass
+    except OSError:
+        pass
+    return size
+
+
+def peak_memory() -> int | None:
+    """
+    Get the process's peak resident memory (in bytes) so far, or `None` if it isn't available on
+    this platform.
+    """
+    if sys.platform == "win32":
+        return windows_peak_memory()
+    try:
+        import resource  # not available on Windows
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux reports kilobytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def windows_peak_memory() -> int | None:
+    """`peak_memory()` for Windows."""
+    import ctypes
+    from ctypes import wintypes
+
+    class ProcessMemoryCounters(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    try:
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        windll = getattr(ctypes, "windll")
+        if not windll.psapi.GetProcessMemoryInfo(
+            windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb
+        ):
+            return None
+        return int(counters.PeakWorkingSetSize)
+    except Exception:
+        return None
@@ -0,0 +1,252 @@
+"""Rules for answering sequence prompts without waiting for the user."""
+
+import fnmatch
+import json
+import logging
+import typing
+from collections.abc import Mapping, Sequence
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime
+from os import PathLike
+from typing import Self
+
+from ..utility.serde import Json
+
+TITLE = "title"
+MESSAGE = "message"
+ANSWER = "answer"
+TIMEOUT = "timeout"
+LIMIT = "limit"
+RULES = "rules"
+DEFAULT = "default"
+
+
+@dataclass
+class PromptRule:
+    """
+    Answers prompts whose title and message match glob-style patterns.
+
+    Parameters
+    ----------
+    title
+        The pattern the prompt's title must match (i.e. `"Sequence: Unexpected error in *"`).
+    message
+        The pattern the prompt's message must match.
+    answer
+        Either the text of the option to choose or the option's value.
+    timeout
+        If this is `None`, the prompt is answered immediately. Otherwise the prompt is shown and
+        **answer** is chosen if the user doesn't respond within this many seconds.
+    limit
+        The maximum number of times this rule answers prompts for a single run of a step (i.e. retry
+        up to 3 times, then ask the user). `None` means there is no limit.
+    """
+
+    title: str
+    message: str
+    answer: str | int
+    timeout: float | None = None
+    limit: int | None = None
+
+    def matches(self, title: str, message: str) -> bool:
+        """Whether the rule applies to a prompt with **title** and **message**."""
+        return fnmatch.fnmatchcase(title, self.title) and fnmatch.fnmatchcase(message, self.message)
+
+    @classmethod
+    def from_dict(cls, rule_as_dict: Mapping[str, Json]) -> Self:
+        """
+        Create a rule from a dictionary like `{"title": ..., "answer": ...}`. Every key except
+        `"answer"` is optional and omitted patterns match anything.
+
+        Raises
+        ------
+        KeyError
+            `"answer"` is missing.
+        ValueError
+            A value has the wrong type.
+        """
+        timeout = rule_as_dict.get(TIMEOUT)
+        limit = rule_as_dict.get(LIMIT)
+        return cls(
+            str(rule_as_dict.get(TITLE, "*")),
+            str(rule_as_dict.get(MESSAGE, "*")),
+            validate_answer(rule_as_dict[ANSWER]),
+            None if timeout is None else float(typing.cast(float, timeout)),
+            None if limit is None else int(typing.cast(int, limit)),
+        )
+
+    def to_dict(self) -> dict[str, Json]:
+        """Convert the rule to a JSON-friendly dictionary (see `from_dict()`)."""
+        rule_as_dict: dict[str, Json] = {
+            TITLE: self.title,
+            MESSAGE: self.message,
+            ANSWER: self.answer,
+        }
+        if self.timeout is not None:
+            rule_as_dict[TIMEOUT] = self.timeout
+        if self.limit is not None:
+            rule_as_dict[LIMIT] = self.limit
+        return rule_as_dict
+
+
+@dataclass
+class PromptDecision:
+    """An answer that a `PromptPolicy` chose. These are recorded in the step's metadata."""
+
+    title: str
+    message: str
+    answer: str
+    timed_out: bool
+    decided_at: datetime
+    rule_number: int
+
+    def as_dict(self) -> dict[str, object]:
+        """Convert the decision to a JSON-friendly dictionary."""
+        return {
+            "Datetime": str(self.decided_at),
+            "Title": self.title,
+            "Message": self.message,
+            "Answer": self.answer,
+            "Reason": "Timeout" if self.timed_out else "Policy",
+        }
+
+
+PROMPT_DECISIONS: ContextVar[list[PromptDecision] | None] = ContextVar(
+    "PROMPT_DECISIONS", default=None
+)
+"""The answers the prompt policy chose for the running step."""
+
+
+class PromptPolicy:
+    """
+    Answers sequence prompts without user interaction. Rules are checked in order and the first one
+    that matches (and names a valid option and hasn't reached its limit) answers the prompt.
+
+    Parameters
+    ----------
+    rules
+        The rules to check.
+    """
+
+    def __init__(self, rules: Sequence[PromptRule]):
+        self.rules = rules
+
+    @classmethod
+    def from_json(cls, file: PathLike[str] | str) -> Self:
+        """
+        Load a policy from a JSON **file** like
+
+        ```
+        {
+            "rules": [
+                {"title": "Sequence: Unexpected error in *", "answer": "Continue"},
+                {"message": "Failed to record metadata.*", "answer": "Retry", "limit": 3},
+                {"answer": "Cancel Step", "timeout": 600}
+            ],
+            "default": "Cancel Step"
+        }
+        ```
+
+        See `PromptRule.from_dict()`. `"default"` is optional and is the same as a final rule with
+        only an answer.
+
+        Raises
+        ------
+        Exception
+            The file could not be read or is not a valid policy.
+        """
+        with open(file, "r") as f:
+            policy_as_json = typing.cast(Mapping[str, Json], json.load(f))
+        rules = [
+            PromptRule.from_dict(rule_as_json)
+            for rule_as_json in typing.cast(
+                Sequence[Mapping[str, Json]], policy_as_json.get(RULES, [])
+            )
+        ]
+        if (default := policy_as_json.get(DEFAULT)) is not None:
+            rules.append(PromptRule("*", "*", validate_answer(default)))
+        return cls(rules)
+
+    def to_json(self, file: PathLike[str] | str):
+        """
+        Save the policy to a JSON **file** (see `from_json()`).
+
+        Raises
+        ------
+        OSError
+            The file could not be written.
+        """
+        with open(file, "w") as f:
+            json.dump({RULES: [rule.to_dict() for rule in self.rules]}, f, indent=4)
+
+    def match(
+        self,
+        title: str,
+        message: str,
+        options: Mapping[int, str],
+        answer_counts: Mapping[int, int],
+    ) -> tuple[int, PromptRule, int] | None:
+        """
+        Find the rule that answers a prompt.
+
+        Parameters
+        ----------
+        title
+            The prompt's title.
+        message
+            The prompt's message.
+        options
+            The prompt's options.
+        answer_counts
+            How many times each rule (by position) has already answered prompts. Rules that have
+            reached their limit are skipped.
+
+        Returns
+        -------
+        A tuple of (the rule's position, the rule, the value of the option to choose), or `None` if
+        the policy has no answer.
+        """
+        for rule_number, rule in enumerate(self.rules):
+            if not rule.matches(title, message):
+                continue
+            if rule.limit is not None and answer_counts.get(rule_number, 0) >= rule.limit:
+                continue
+            if (value := find_option(options, rule.answer)) is not None:
+                return (rule_number, rule, value)
+            logging.getLogger(__name__).warning(
+                f"Prompt rule {rule} matched {title!r} but {rule.answer!r} is not an option"
+            )
+        return None
+
+
+def find_option(options: Mapping[int, str], answer: str | int) -> int | None:
+    """
+    Find the option **answer** refers to. **answer** is either an option's value or its text
+    (case-insensitive). Returns the option's value, or `None` if no option matches.
+    """
+    if isinstance(answer, int):
+        return answer if answer in options else None
+    for value, text in options.items():
+        if text.casefold() == answer.strip().casefold():
+            return value
+    # allow typing the value
+    try:
+        value = int(answer)
+    except ValueError:
+        return None
+    return value if value in options else None
+
+
+def validate_answer(answer: Json) -> str | int:
+    """
+    Make sure **answer** is an option's text or value.
+
+    Raises
+    ------
+    ValueError
+        **answer** has the wrong type.
+    """
+    if isinstance(answer, bool) or not isinstance(answer, str | int):
+        raise ValueError(f"Prompt answers must be option text or values, got {answer!r}")
+    return answer
@@ -0,0 +1,59 @@
+import asyncio
+from typing import Any
+
+
+class Reply[Data: Any]:
+    """
+    A one-time reply that another thread sends to the sequence. The sequence waits for the reply
+    with `wait()` and any thread sends it with `set()`. Waiting does not use any CPU.
+
+    This must be created from inside the sequence's event loop.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.future: asyncio.Future[Data] = self.loop.create_future()
+        self.withdrawn = False
+
+    def set(self, data: Data):
+        """Send **data** to the waiting sequence. This is thread-safe."""
+        try:
+            self.loop.call_soon_threadsafe(self.resolve, data)
+        except RuntimeError:  # the event loop is closed, so nobody is waiting anymore
+            pass
+
+    def fail(self, exception: BaseException):
+        """
+        Raise **exception** in the waiting sequence instead of sending data. This is thread-safe.
+        """
+        try:
+            self.loop.call_soon_threadsafe(self.reject, exception)
+        except RuntimeError:  # the event loop is closed, so nobody is waiting anymore
+            pass
+
+    async def wait(self) -> Data:
+        """Wait for the reply and return it."""
+        return await self.future
+
+    def withdraw(self):
+        """
+        Stop waiting for the reply (i.e. because a timeout expired). Replies sent after this are
+        ignored. Call this from inside the sequence's event loop.
+        """
+        self.withdrawn = True
+        self.future.cancel()
+
+    def is_withdrawn(self) -> bool:
+        """Whether the sequence stopped waiting for the reply. This is thread-safe."""
+        return self.withdrawn
+
+    def resolve(self, data: Data):  # private
+        """Set the future's result. This runs inside the sequence's event loop."""
+        # the waiting task might have been cancelled, in which case the future is already done
+        if not self.future.done():
+            self.future.set_result(data)
+
+    def reject(self, exception: BaseException):  # private
+        """Set the future's exception. This runs inside the sequence's event loop."""
+        if not self.future.done():
+            self.future.set_exception(exception)
@@ -0,0 +1,204 @@
+"""Named locks and semaphores that sequence steps share."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import Hashable
+from contextvars import ContextVar
+
+from . import profiling
+from .exceptions import ResourceDeadlockError
+from .timing import CallStatistics
+
+HELD_RESOURCES: ContextVar[tuple[Acquisition, ...]] = ContextVar("HELD_RESOURCES", default=())
+"""
+The resources held by the current task. Tasks inherit this, so a step's substeps know what the step
+holds.
+"""
+
+
+class Acquisition:
+    """One use of a `Resource`. Pass this to `Resource.release()` when finished."""
+
+    def __init__(self, resource: Resource, task: asyncio.Task[object] | None):
+        self.resource = resource
+        self.task = task
+        self.acquired_time = time.perf_counter()
+        self.active = True
+
+
+class Resource:
+    """
+    A named resource that up to **capacity** tasks can use at once (a lock if **capacity** is 1,
+    otherwise a counted semaphore). Waiting tasks are served in the order they arrived and waiting
+    doesn't block the sequence. Use `StepRunner.resource()` instead of creating these directly.
+
+    Parameters
+    ----------
+    pool
+        The pool this resource belongs to (used to detect deadlocks).
+    name
+        The resource's name.
+    capacity
+        How many tasks can hold the resource at once.
+    """
+
+    def __init__(self, pool: ResourcePool, name: Hashable, capacity: int):
+        self.pool = pool
+        self.name = name
+        self.capacity = capacity
+        self.available = capacity
+        self.holders: set[Acquisition] = set()
+        self.waiters: deque[asyncio.Future[None]] = deque()
+        self.statistics = CallStatistics()  # how long the resource was waited for and held
+
+    async def acquire(self) -> Acquisition:
+        """
+        Wait until the resource is available, then take one unit of it.
+
+        Raises
+        ------
+        ResourceDeadlockError
+            Waiting would never finish because the current task (or a step that started it) already
+            holds the resource, or because of a cycle of tasks waiting for each other.
+        """
+        task = asyncio.current_task()
+        start_time = time.perf_counter()
+        if self.available > 0 and len(self.waiters) == 0:
+            self.available -= 1
+        else:
+            self.pool.check_deadlock(self, task)
+            future = asyncio.get_running_loop().create_future()
+            self.waiters.append(future)
+            if task is not None:
+                self.pool.waiting[task] = self
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.cancelled():
+                    if future in self.waiters:  # `hand_off()` may have skipped it already
+                        self.waiters.remove(future)
+                else:  # the resource was handed to us as we were cancelled, so pass it on
+                    self.hand_off()
+                raise
+            finally:
+                if task is not None:
+                    self.pool.waiting.pop(task, None)
+
+        wait_time = time.perf_counter() - start_time
+        self.statistics.wait.add(wait_time)
+        if (profile := profiling.current_profile()) is not None:
+            profile.add_resource_wait(wait_time)
+        acquisition = Acquisition(self, task)
+        self.holders.add(acquisition)
+        return acquisition
+
+    def release(self, acquisition: Acquisition):
+        """Give back the unit taken by **acquisition**. Releasing twice does nothing."""
+        if not acquisition.active:
+            return
+        acquisition.active = False
+        self.holders.discard(acquisition)
+        self.statistics.run.add(time.perf_counter() - acquisition.acquired_time)
+        self.hand_off()
+
+    def is_held(self) -> bool:
+        """
+        Whether the current task holds the resource through `StepRunner.resource()` (directly or
+        because a step that started it does).
+        """
+        return any(
+            acquisition.active and acquisition.resource is self
+            for acquisition in HELD_RESOURCES.get()
+        )
+
+    def hand_off(self):  # private
+        """Give a free unit to the longest-waiting task, or make it available if nobody waits."""
+        while len(self.waiters) > 0:
+            future = self.waiters.popleft()
+            if not future.done():
+                future.set_result(None)
+                return
+        self.available += 1
+
+
+class ResourcePool:
+    """The named resources of one sequence."""
+
+    def __init__(self):
+        self.resources: dict[Hashable, Resource] = {}
+        self.waiting: dict[asyncio.Task[object], Resource] = {}  # {task: what it's waiting for}
+
+    def get(self, name: Hashable, capacity: int = 1) -> Resource:
+        """
+        Get the resource called **name**, creating it with **capacity** if it doesn't exist.
+
+        Raises
+        ------
+        ValueError
+            The resource exists with a different capacity, or **capacity** is less than 1.
+        """
+        if (resource := self.resources.get(name)) is None:
+            if capacity < 1:
+                raise ValueError(f"Resources need a capacity of at least 1, not {capacity}")
+            resource = self.resources[name] = Resource(self, name, capacity)
+        elif resource.capacity != capacity:
+            raise ValueError(
+                f"Resource {name!r} has a capacity of {resource.capacity}, not {capacity}"
+            )
+        return resource
+
+    def check_deadlock(self, resource: Resource, task: asyncio.Task[object] | None):  # private
+        """
+        Make sure **task** can wait for **resource** without waiting forever.
+
+        Raises
+        ------
+        ResourceDeadlockError
+            Waiting would deadlock.
+        """
+        held = {acquisition for acquisition in HELD_RESOURCES.get() if acquisition.active}
+        if self.is_stuck(resource, task, held, set()):
+            raise ResourceDeadlockError(
+                f"Waiting for resource {resource.name!r} would deadlock. It is held by the current "
+                "step (or a step running it), or by tasks that are waiting for the current step"
+            )
+
+    def is_stuck(
+        self,
+        resource: Resource,
+        task: asyncio.Task[object] | None,
+        held: set[Acquisition],
+        visiting: set[Resource],
+    ) -> bool:  # private
+        """
+        Whether no holder of **resource** can release it while **task** waits. A holder is stuck if
+        it is **task** itself, if it is one of the **held** acquisitions (which **task** inherited),
+        or if it is waiting for a resource that is stuck. **visiting** contains the resources being
+        checked, so a cycle counts as stuck.
+        """
+        if resource in visiting:
+            return True
+        visiting.add(resource)
+        try:
+            for acquisition in resource.holders:
+                if acquisition in held or acquisition.task is task:
+                    continue  # we never release it while we wait
+                if acquisition.task is None:
+                    return False
+                waiting_for = self.waiting.get(acquisition.task)
+                if waiting_for is None or not self.is_stuck(waiting_for, task, held, visiting):
+                    return False  # this holder can still finish and release the resource
+            return len(resource.holders) > 0
+        finally:
+            visiting.discard(resource)
+
+    def statistics(self) -> dict[str, CallStatistics]:
+        """Get the wait and hold times of every resource that was used, by name."""
+        return {
+            str(name): resource.statistics
+            for name, resource in self.resources.items()
+            if resource.statistics.wait.count > 0
+        }
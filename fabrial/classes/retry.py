@@ -0,0 +1,60 @@
+"""Automatic retries for steps that fail with recoverable errors."""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    How a step is retried when its `run()` raises an exception. The step is reset and run again
+    after a delay that grows exponentially, and the user is only prompted once the policy gives up.
+    Return one of these from `SequenceStep.retry_policy()`.
+
+    Parameters
+    ----------
+    max_attempts
+        The maximum number of times the step runs (including the first run).
+    initial_delay
+        The number of seconds to wait before the first retry.
+    backoff
+        The delay is multiplied by this after every retry.
+    max_delay
+        The longest delay (in seconds) between attempts.
+    exceptions
+        Only these exception types (and their subclasses) are retried. Other errors are reported to
+        the user immediately.
+    """
+
+    max_attempts: int = 3
+    initial_delay: float = 1
+    backoff: float = 2
+    max_delay: float = 60
+    exceptions: tuple[type[Exception], ...] = (Exception,)
+
+    def should_retry(self, error: Exception, attempt: int) -> bool:
+        """Whether to retry after attempt number **attempt** (starting at 1) raised **error**."""
+        return attempt < self.max_attempts and isinstance(error, self.exceptions)
+
+    def delay(self, attempt: int) -> float:
+        """The number of seconds to wait after attempt number **attempt** (starting at 1) fails."""
+        return min(self.initial_delay * self.backoff ** (attempt - 1), self.max_delay)
+
+
+@dataclass
+class FailedAttempt:
+    """An attempt at running a step that failed and was retried. Recorded in the step's metadata."""
+
+    attempt: int
+    error: str
+    delay: float
+    failed_at: datetime = field(default_factory=datetime.now)
+
+    def as_dict(self) -> dict[str, object]:
+        """Convert the attempt to a JSON-friendly dictionary."""
+        return {
+            "Attempt": self.attempt,
+            "Datetime": str(self.failed_at),
+            "Error": self.error,
+            "Retry Delay (s)": self.delay,
+        }
@@ -0,0 +1,95 @@
+"""A ring buffer that streams samples from the sequence's thread to the display without locks."""
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+
+class SampleRing:
+    """
+    A fixed-size buffer of (x, y) samples that one thread writes and another thread reads, without
+    locks or copies. The writer stores samples and then publishes them by updating `write_count`;
+    the reader shows the newest **window** samples as of the `write_count` it read.
+
+    The buffer holds twice **window** samples, so a reader can use its views while the writer adds
+    up to **window** more samples. Every sample is stored twice, which keeps the newest samples in
+    one contiguous slice.
+
+    Parameters
+    ----------
+    window
+        The number of newest samples that are shown.
+
+    Raises
+    ------
+    ValueError
+        **window** is less than 1.
+    """
+
+    def __init__(self, window: int):
+        if window < 1:
+            raise ValueError(f"The window must hold at least 1 sample, not {window}")
+        self.window = window
+        self.capacity = 2 * window
+        # sample `i` is stored at `i % capacity` and `i % capacity + capacity`
+        self.x_values = np.zeros(2 * self.capacity)
+        self.y_values = np.zeros(2 * self.capacity)
+        # the number of samples written so far. Only the writer changes this, after the samples are
+        # stored, so the reader never sees a sample that isn't complete
+        self.write_count = 0
+
+    def write(self, x_values: ArrayLike, y_values: ArrayLike):
+        """
+        Add samples. If there are more than the buffer holds, only the newest ones are stored. This
+        must only be called from one thread.
+
+        Raises
+        ------
+        ValueError
+            **x_values** and **y_values** have different lengths.
+        """
+        x_array = np.ravel(np.asarray(x_values, dtype=np.float64))
+        y_array = np.ravel(np.asarray(y_values, dtype=np.float64))
+        if len(x_array) != len(y_array):
+            raise ValueError(
+                f"Got {len(x_array)} x values but {len(y_array)} y values; they must match"
+            )
+        write_count = self.write_count + max(len(x_array) - self.capacity, 0)
+        x_array = x_array[-self.capacity :]
+        y_array = y_array[-self.capacity :]
+        count = len(x_array)
+        start = write_count % self.capacity
+        first_count = min(count, self.capacity - start)  # the rest wraps around to the beginning
+        for storage, values in ((self.x_values, x_array), (self.y_values, y_array)):
+            for offset in (0, self.capacity):
+                storage[offset + start : offset + start + first_count] = values[:first_count]
+                storage[offset : offset + count - first_count] = values[first_count:]
+        self.write_count = write_count + count  # publish
+
+    def append(self, x: float, y: float):
+        """Add a single sample. This must only be called from one thread."""
+        position = self.write_count % self.capacity
+        self.x_values[position] = self.x_values[position + self.capacity] = x
+        self.y_values[position] = self.y_values[position + self.capacity] = y
+        self.write_count += 1  # publish
+
+    def latest(self, write_count: int | None = None) -> tuple[NDArray[np.float64], ...]:
+        """
+        Get read-only views of the newest `window` samples (or all samples if there are fewer) as
+        of **write_count** (by default, the current `write_count`). This doesn't copy anything, so
+        the cost doesn't depend on the number of samples. The views are valid until `window` more
+        samples are written.
+
+        Returns
+        -------
+        A tuple of `(x values, y values)`.
+        """
+        if write_count is None:
+            write_count = self.write_count
+        count = min(write_count, self.window)
+        start = (write_count - count) % self.capacity
+        views: list[NDArray[np.float64]] = []
+        for storage in (self.x_values, self.y_values):
+            view = storage[start : start + count]
+            view.flags.writeable = False
+            views.append(view)
+        return tuple(views)
@@ -3,26 +3,30 @@ from __future__ import annotations
 import logging
 import os
 import typing
-from collections.abc import Callable
 from pathlib import Path
-from queue import Queue
 from typing import TYPE_CHECKING
 
 from PyQt6.QtCore import QModelIndex
 from PyQt6.QtWidgets import QMessageBox, QPushButton
 
 from ..constants.paths.settings import sequence as sequence_paths
+from ..constants.sequence import AUTOSAVE_FILENAME
 from ..custom_widgets import DontShowAgainDialog, YesNoDialog
 from ..enums import SequenceCommand
-from ..utility import errors
+from ..utility import errors, sequence_settings
 from .exceptions import PluginError
-from .lock import DataLock
+from .plot_batcher import PlotBatch
+from .reply import Reply
 from .sequence_step import SequenceStep
 from .sequence_thread import SequenceThread
+from .timer import Timer
 
 if TYPE_CHECKING:
     from ..sequence_builder import SequenceModel
-    from ..tabs import SequenceBuilderTab, SequenceDisplayTab
+    from ..tabs import SequenceBuilderTab, SequenceDisplayTab, SequenceMonitorTab
+
+
+PROMPT_WITHDRAWN_CHECK_INTERVAL_MS = 200
 
 
 class ValueButton(QPushButton):
@@ -34,26 +38,41 @@ class ValueButton(QPushButton):
 
 
 class SequenceRunner:
-    """Initialize and run a sequence."""
+    """
+    Initialize and run a sequence. Several sequences can run at once, each with its own runner.
+    """
 
     def __init__(self):
-        self.command_queue: Queue[SequenceCommand] = Queue()
         self.thread: SequenceThread | None = None  # we have to keep a reference to the thread
+        self.data_directory: Path | None = None
+        self.monitor_tab: SequenceMonitorTab | None = None
+        # how many times each step is currently running (steps can run concurrently)
+        self.running_counts: dict[int, int] = {}
 
     def run_sequence(
-        self, sequence_tab: SequenceBuilderTab, model: SequenceModel, data_directory: Path
+        self,
+        sequence_tab: SequenceBuilderTab,
+        model: SequenceModel,
+        data_directory: Path,
+        resume: bool = False,
     ):
         """
         Run the sequence. Creates the data directory if it doesn't exist. Logs errors. Returns
         whether the sequence was successfully started.
+
+        The sequence runs from a copy of **model**, so the sequence builder can be edited (and
+        other sequences started) while this sequence is running. If **resume** is `True`, the
+        sequence continues a previous run in **data_directory**, skipping the steps that run
+        completed.
         """
         if not model.root().subitem_count() > 0:  # do nothing if there are no items
             return False
-        # make the data directory
-        if not self.create_files(model, data_directory):
+        # make the data directory (a resumed sequence already has one)
+        if not resume and not self.create_files(model, data_directory):
             return False
         # create the `SequenceStep`s
         try:
+            model = self.copy_model(model)
             sequence_steps, step_item_map = self.create_sequence_steps(model)
         except PluginError:
             logging.getLogger(__name__).exception(
@@ -65,10 +84,19 @@ class SequenceRunner:
                 "See the error log for details.",
             )
             return False
-        # create the thread
-        self.thread = SequenceThread(sequence_steps, data_directory, self.command_queue)
+        # create the thread and the tab that monitors it
+        self.data_directory = data_directory
+        self.thread = SequenceThread(
+            sequence_steps,
+            data_directory,
+            sequence_settings.load_stall_threshold(),
+            resume,
+            sequence_settings.load_prompt_policy(),
+            sequence_settings.load_plot_frame_rate(),
+        )
+        self.monitor_tab = sequence_tab.visuals_tab.add_sequence_tab(model, data_directory)
         # connect signals so the application responds to changes in the sequence
-        self.connect_signals(self.thread, sequence_tab, model, step_item_map)
+        self.connect_signals(self.thread, sequence_tab, self.monitor_tab, model, step_item_map)
         # start
         self.thread.start()
         return True
@@ -99,7 +127,7 @@ class SequenceRunner:
             ).run():
                 return False
         # try to generate an autosave of the sequence
-        if not model.to_json(data_directory.joinpath("autosave.json")):
+        if not model.to_json(data_directory.joinpath(AUTOSAVE_FILENAME)):
             return YesNoDialog(
                 "Minor Error",
                 "Failed to generate sequence autosave. "
@@ -107,6 +135,20 @@ class SequenceRunner:
             ).run()
         return True
 
+    def copy_model(self, model: SequenceModel) -> SequenceModel:
+        """
+        Copy **model** so the sequence is independent of the sequence builder.
+
+        Raises
+        ------
+        PluginError
+            An item failed to copy, which indicates a faulty plugin. The sequence cannot start.
+        """
+        try:
+            return model.copy()
+        except Exception:
+            raise PluginError("Error while copying the sequence's items")
+
     def create_sequence_steps(
         self, model: SequenceModel
     ) -> tuple[list[SequenceStep], dict[int, QModelIndex]]:
@@ -155,28 +197,48 @@ class SequenceRunner:
         self,
         sequence_thread: SequenceThread,
         sequence_tab: SequenceBuilderTab,
+        monitor_tab: SequenceMonitorTab,
         model: SequenceModel,
         step_item_map: dict[int, QModelIndex],
     ):
         """Connect signals at construction."""
-        # send the status to the sequence tab
-        sequence_thread.statusChanged.connect(sequence_tab.handle_sequence_status_change)
+        # controls
+        monitor_tab.pause_button.clicked.connect(self.pause)
+        monitor_tab.unpause_button.clicked.connect(self.unpause)
+        monitor_tab.cancel_button.clicked.connect(self.cancel)
+        # send the status to the monitor tab
+        sequence_thread.statusChanged.connect(monitor_tab.handle_sequence_status_change)
         # make the corresponding step bold/not bold in the model
         sequence_thread.stepStateChanged.connect(
-            lambda step_address, running: model.set_emphasized(step_item_map[step_address], running)
+            lambda step_address, running: self.handle_step_state_change(
+                model, step_item_map[step_address], step_address, running
+            )
         )
         # show the prompt and send the response
         sequence_thread.promptRequested.connect(self.show_prompt)
-        # run the command on the visuals tab
-        sequence_thread.plotCommandRequested.connect(
-            lambda command: self.run_plot_command(command, sequence_tab.visuals_tab)
+        # run the commands on the visuals tab
+        sequence_thread.plotCommandsRequested.connect(
+            lambda batch: self.run_plot_commands(batch, monitor_tab.visuals_tab)
         )
         # notify finish
-        sequence_thread.finished.connect(lambda: sequence_tab.handle_sequence_state_change(False))
+        sequence_thread.finished.connect(monitor_tab.handle_sequence_finished)
+        sequence_thread.finished.connect(lambda: sequence_tab.handle_sequence_finished(self))
 
-    def show_prompt(
-        self, title: str, message: str, options: dict[int, str], receiver: DataLock[int | None]
+    def handle_step_state_change(
+        self, model: SequenceModel, index: QModelIndex, step_address: int, running: bool
     ):
+        """
+        Emphasize the item at **index** while its step is running. A step stays emphasized until
+        every concurrent run of it has finished.
+        """
+        count = self.running_counts.get(step_address, 0) + (1 if running else -1)
+        if count > 0:
+            self.running_counts[step_address] = count
+        else:
+            self.running_counts.pop(step_address, None)
+        model.set_emphasized(index, count > 0)
+
+    def show_prompt(self, title: str, message: str, options: dict[int, str], receiver: Reply[int]):
         """Show a prompt to the user, then send the response back to the sequence."""
         # create the prompt
         prompt = QMessageBox()
@@ -184,31 +246,48 @@ class SequenceRunner:
         prompt.setText(message)
         for value, button_text in options.items():  # add the options from **options**
             prompt.addButton(ValueButton(button_text, value), QMessageBox.ButtonRole.NoRole)
+        # close the prompt if the sequence stops waiting (i.e. the prompt policy's timeout expired)
+        withdrawn_timer = Timer(
+            prompt,
+            PROMPT_WITHDRAWN_CHECK_INTERVAL_MS,
+            lambda: prompt.done(0) if receiver.is_withdrawn() else None,
+        )
+        withdrawn_timer.start()
         prompt.exec()  # run the prompt
-        selected_value = typing.cast(ValueButton, prompt.clickedButton()).value  # get the result
-        receiver.set(selected_value)  # send to the receiver
+        withdrawn_timer.stop()
+        if (button := prompt.clickedButton()) is not None:
+            receiver.set(typing.cast(ValueButton, button).value)  # send the result to the receiver
 
-    def run_plot_command(
-        self, command: Callable[[SequenceDisplayTab], None], visuals_tab: SequenceDisplayTab
-    ):
-        """Run a plot **command**."""
+    def run_plot_commands(self, batch: PlotBatch, visuals_tab: SequenceDisplayTab):
+        """Run a **batch** of plot commands in order."""
         try:
-            command(visuals_tab)
+            visuals_tab.run_plot_commands(batch.commands)
         except Exception:
             logging.getLogger(__name__).exception(
                 "Error while running a plot command. This usually indicates that a plugin used an "
                 "invalid `PlotHandle` or `LineHandle`"
             )
-            self.command_queue.put_nowait(SequenceCommand.RaiseFatal)
+            self.send_command(SequenceCommand.RaiseFatal)
+        finally:
+            batch.mark_applied()
+
+    def send_command(self, command: SequenceCommand):
+        """Send a **command** to the sequence thread (if the sequence was started)."""
+        if self.thread is not None:
+            self.thread.send_command(command)
 
     def pause(self):
         """Pause the sequence."""
-        self.command_queue.put_nowait(SequenceCommand.Pause)
+        self.send_command(SequenceCommand.Pause)
 
     def unpause(self):
         """Unpause the sequence."""
-        self.command_queue.put_nowait(SequenceCommand.Unpause)
+        self.send_command(SequenceCommand.Unpause)
 
     def cancel(self):
         """Cancel the sequence."""
-        self.command_queue.put_nowait(SequenceCommand.Cancel)
+        self.send_command(SequenceCommand.Cancel)
+
+    def is_running(self) -> bool:
+        """Whether the sequence was started and has not finished."""
+        return self.thread is not None and not self.thread.isFinished()
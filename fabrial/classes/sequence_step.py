@@ -3,9 +3,15 @@ from __future__ import annotations
 import asyncio
 import time
 from abc import abstractmethod
+from collections.abc import Mapping
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Protocol
 
+from ..enums import MissedTickPolicy
+from . import pause, plot_batcher, profiling, sweep
+from .retry import RetryPolicy
+from .ticker import Ticker
+
 if TYPE_CHECKING:
     from .step_runner import StepRunner
 
@@ -49,20 +55,89 @@ class SequenceStep(Protocol):
         """
         return {}
 
+    async def prepare(self, runner: StepRunner):
+        """
+        Get ready to run (i.e. load a calibration file or precompute a waveform). This is called
+        before every `run()`, including retries. When steps run one after another, the next step is
+        prepared while the current step is still running, so slow setup doesn't leave a gap between
+        steps. By default this does nothing.
+
+        Since this can run at the same time as the previous step, it must not depend on the previous
+        step's results. Use `runner.resource()` to share devices with the step that is running.
+        Exceptions are handled like exceptions raised by `run()`. If the sequence is cancelled
+        before this step runs, this is cancelled too.
+        """
+        pass
+
+    def retry_policy(self) -> RetryPolicy | None:
+        """
+        Get the policy for automatically retrying this step when `run()` raises an exception, or
+        `None` to ask the user immediately (the default). Before each retry the step is reset. The
+        failed attempts are recorded in the step's metadata.
+
+        Override this to make every step of a type retry, or return a policy chosen by the step's
+        item to configure retries per item.
+        """
+        return None
+
     async def sleep(self, delay: float):
         """
         Sleep this sequence step for **delay** seconds. This is *not* equivalent to `time.sleep()`
-        and should be used *instead* of `time.sleep()`.
+        and should be used *instead* of `time.sleep()`. If the sequence is paused, this also waits
+        until the sequence is unpaused. If this step filled a plot line that uses
+        `PlotOverflowPolicy.Block`, this also waits until the display catches up.
 
         Do not override this.
         """
         await asyncio.sleep(delay)
+        await pause.wait_if_paused()
+        await plot_batcher.wait_for_display()
 
     async def sleep_until(self, when: float):
         """
-        Sleep until **when**, which is a `float` as returned by `time.time()`.
+        Sleep until **when**, which is a `float` as returned by `time.time()`. For periodic work,
+        use `every()` instead.
 
         Do not override this.
         """
         await self.sleep(0)  # make sure we sleep at all
         await self.sleep(when - time.time())
+
+    def every(self, interval: float, policy: MissedTickPolicy = MissedTickPolicy.Skip) -> Ticker:
+        """
+        Get a timer that ticks every **interval** seconds without drifting, for use with
+        `async for`. The first tick is immediate. The timer's statistics are recorded in this step's
+        `Performance` metadata.
+
+        ```python
+        async for tick in self.every(0.1):  # 10 Hz
+            record_sample()
+        ```
+
+        Parameters
+        ----------
+        interval
+            The number of seconds between ticks.
+        policy
+            What to do with ticks that come due while the step is busy or the sequence is paused.
+
+        Raises
+        ------
+        ValueError
+            **interval** is not positive.
+
+        Do not override this.
+        """
+        ticker = Ticker(interval, policy)
+        if (profile := profiling.current_profile()) is not None:
+            profile.add_ticker(ticker)
+        return ticker
+
+    def sweep_parameters(self) -> Mapping[str, float]:
+        """
+        Get the parameter values of the **Sweep** point this step is running in, by name (i.e.
+        `self.sweep_parameters()["Setpoint"]`). This is empty if the step isn't inside a sweep.
+
+        Do not override this.
+        """
+        return sweep.current_parameters()
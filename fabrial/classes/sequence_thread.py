@@ -1,6 +1,5 @@
 import asyncio
 import logging
-import time
 from asyncio import CancelledError, TaskGroup
 from collections.abc import Iterable
 from pathlib import Path
@@ -10,7 +9,9 @@ from PyQt6.QtCore import QThread, pyqtSignal
 
 from ..enums import SequenceCommand, SequenceStatus
 from .exceptions import FatalSequenceError
-from .lock import DataLock
+from .plot_batcher import DEFAULT_FRAME_RATE
+from .prompt_policy import PromptPolicy
+from .reply import Reply
 from .sequence_step import SequenceStep
 from .step_runner import StepRunner
 
@@ -25,31 +26,40 @@ class SequenceThread(QThread):
     Sends
     - The status as a `SequenceStatus`.
     """
-    promptRequested = pyqtSignal(str, str, dict, DataLock)  # see `StepRunner`
-    plotCommandRequested = pyqtSignal(object)  # see `StepRunner`
+    promptRequested = pyqtSignal(str, str, dict, Reply)  # see `StepRunner`
+    plotCommandsRequested = pyqtSignal(object)  # see `StepRunner`
     stepStateChanged = pyqtSignal("qint64", bool)  # see `StepRunner`
 
     def __init__(
         self,
         steps: Iterable[SequenceStep],
         data_directory: Path,
-        command_queue: Queue[SequenceCommand],
+        stall_threshold: float | None = None,
+        resume: bool = False,
+        prompt_policy: PromptPolicy | None = None,
+        plot_frame_rate: float | None = DEFAULT_FRAME_RATE,
     ):
         QThread.__init__(self)
         self.steps = steps
         self.data_directory = data_directory
-        self.command_queue = command_queue
+        self.resume = resume
+        # commands are stored in a thread-safe queue and the sequence's event loop is woken up when
+        # one arrives, so the sequence never has to poll for commands
+        self.command_queue: Queue[SequenceCommand] = Queue()
+        self.loop = asyncio.new_event_loop()
+        self.command_event = asyncio.Event()
         # create the runner
-        self.runner = StepRunner()
+        self.runner = StepRunner(stall_threshold, prompt_policy, plot_frame_rate)
         self.runner.moveToThread(self)
         self.runner.promptRequested.connect(self.promptRequested)
-        self.runner.plotCommandRequested.connect(self.plotCommandRequested)
+        self.runner.plotCommandsRequested.connect(self.plotCommandsRequested)
         self.runner.stepStateChanged.connect(self.stepStateChanged)
 
     def run(self):  # overridden
         try:
             self.statusChanged.emit(SequenceStatus.Active)
-            cancelled = not asyncio.run(self.run_actual())
+            with asyncio.Runner(loop_factory=lambda: self.loop) as runner:
+                cancelled = not runner.run(self.run_actual())
             self.statusChanged.emit(
                 SequenceStatus.Cancelled if cancelled else SequenceStatus.Completed
             )
@@ -64,7 +74,7 @@ class SequenceThread(QThread):
         """
         async with TaskGroup() as task_group:
             sequence_task = task_group.create_task(
-                self.runner.run_steps(self.steps, self.data_directory)
+                self.runner.run_sequence(self.steps, self.data_directory, self.resume)
             )
             monitor_task = task_group.create_task(self.monitor())
             # if either task ends, cancel the other
@@ -73,11 +83,21 @@ class SequenceThread(QThread):
 
         return not sequence_task.cancelled()
 
+    def send_command(self, command: SequenceCommand):
+        """Send a **command** to the sequence. This is thread-safe."""
+        self.command_queue.put_nowait(command)
+        try:  # wake up the sequence's event loop
+            self.loop.call_soon_threadsafe(self.command_event.set)
+        except RuntimeError:  # the event loop is closed, so the sequence already finished
+            pass
+
     async def monitor(self) -> None:
-        """Monitor for messages and commands."""
+        """Wait for commands and process them."""
         while True:
+            await self.command_event.wait()
+            # clear before processing so commands that arrive while processing wake us up again
+            self.command_event.clear()
             self.check_commands()
-            await asyncio.sleep(0)
 
     def check_commands(self):
         """Check for commands and process them."""
@@ -87,31 +107,26 @@ class SequenceThread(QThread):
                 match command:
                     case SequenceCommand.Pause:
                         self.pause()
+                    case SequenceCommand.Unpause:
+                        self.unpause()
                     case SequenceCommand.Cancel:
                         raise CancelledError
-                    case SequenceCommand.Unpause:  # this should never run
-                        raise ValueError(
-                            "Received `SequenceStep.Unpause`, which should be impossible"
-                        )
                     case SequenceCommand.RaiseFatal:
                         raise FatalSequenceError("The main thread requested a fatal error")
         except Empty:
             pass
 
     def pause(self):
-        """Pause the sequence."""
-        self.statusChanged.emit(SequenceStatus.Paused)
-        while True:
-            try:
-                command = self.command_queue.get_nowait()
-                match command:
-                    case SequenceCommand.Cancel:
-                        raise CancelledError
-                    case SequenceCommand.Unpause:
-                        self.statusChanged.emit(SequenceStatus.Active)
-                        return
-                    case SequenceCommand.Pause:  # ignore additional pauses
-                        pass
-            except Empty:
-                pass
-            time.sleep(0)  # this is not `asyncio.sleep()`
+        """
+        Pause the sequence. Pausable tasks stop at their next `SequenceStep.sleep()`; everything
+        else (including this monitor) keeps running.
+        """
+        if self.runner.pause_gate.is_open():  # ignore additional pauses
+            self.runner.pause_gate.close()
+            self.statusChanged.emit(SequenceStatus.Paused)
+
+    def unpause(self):
+        """Unpause the sequence."""
+        if not self.runner.pause_gate.is_open():  # ignore additional unpauses
+            self.runner.pause_gate.open()
+            self.statusChanged.emit(SequenceStatus.Active)
@@ -2,33 +2,57 @@ from __future__ import annotations
 
 import asyncio
 import contextlib
-import copy
+import contextvars
+import functools
 import json
 import logging
+import multiprocessing
 import os
-from asyncio import CancelledError
-from collections.abc import AsyncGenerator, Callable, Iterable
+import time
+from asyncio import CancelledError, TaskGroup
+from collections import Counter, defaultdict
+from collections.abc import AsyncGenerator, Callable, Coroutine, Hashable, Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import Any
 
 from PyQt6.QtCore import QObject, pyqtSignal
 
-from ..constants.sequence import METADATA_FILENAME
-from ..plotting import PlotHandle, PlotIndex, PlotSettings
+from ..constants.sequence import (
+    BACKGROUND_DIRECTORY_NAME,
+    METADATA_FILENAME,
+    PERFORMANCE_FILENAME,
+)
+from ..plotting import AddPlot, PlotCommand, PlotHandle, PlotIndex, PlotSettings, RemovePlot
+from . import data_store, journal, pause, plot_batcher, profiling, sweep
+from .data_store import SequenceData
 from .exceptions import FatalSequenceError, StepCancellation
-from .lock import DataLock
+from .journal import ProgressJournal
+from .pause import PauseGate
+from .plot_batcher import DEFAULT_FRAME_RATE, PlotCommandBatcher
+from .profiling import SequenceProfile, StepProfile
+from .prompt_policy import PROMPT_DECISIONS, PromptDecision, PromptPolicy
+from .reply import Reply
+from .resources import HELD_RESOURCES, ResourcePool
+from .retry import FailedAttempt
 from .sequence_step import SequenceStep
+from .timing import CallStatistics
+from .watchdog import StallWatchdog
 
-if TYPE_CHECKING:
-    from ..tabs import SequenceDisplayTab
+MAX_BLOCKING_THREADS = 8
+"""The maximum number of threads used by `StepRunner.run_blocking()`."""
+
+
+class BranchCancellation(Exception):
+    """Raised when a branch of `StepRunner.run_steps_concurrently()` cancels the sequence."""
 
 
 class StepRunner(QObject):
     """Runs `SequenceStep`s and provides utility functions that steps can call."""
 
     # title, message, options, response receiver
-    promptRequested = pyqtSignal(str, str, dict, DataLock)
+    promptRequested = pyqtSignal(str, str, dict, Reply)
     """
     Emitted when a prompt needs to be sent the the main thread.
 
@@ -37,15 +61,16 @@ class StepRunner(QObject):
     - The prompt title as a `str`.
     - The prompt text as a `str`.
     - The prompt options as a `dict[int, str]`.
-    - The receiver as a `DataLock[int | None]`.
+    - The receiver as a `Reply[int]`.
     """
-    plotCommandRequested = pyqtSignal(object)
+    plotCommandsRequested = pyqtSignal(object)
     """
-    Emitted when a plot command needs to be run.
+    Emitted when plot commands need to be run (at most once per display frame, see
+    `PlotCommandBatcher`).
 
     Sends
     -----
-    - The plot command as a `Callable[SequenceDisplayTab]`.
+    - The commands as a `PlotBatch`. Run them in order, then call `PlotBatch.mark_applied()`.
     """
     # the first argument is `qint64` because using `int` constrains it to 32 bits
     stepStateChanged = pyqtSignal("qint64", bool)
@@ -60,8 +85,117 @@ class StepRunner(QObject):
 
     # ----------------------------------------------------------------------------------------------
     # public
-    def __init__(self):
+    def __init__(
+        self,
+        stall_threshold: float | None = None,
+        prompt_policy: PromptPolicy | None = None,
+        plot_frame_rate: float | None = DEFAULT_FRAME_RATE,
+    ):
         QObject.__init__(self)
+        # if this is not `None`, event loop stalls longer than this many seconds are detected and
+        # recorded in the running step's metadata
+        self.stall_threshold = stall_threshold
+        # if this is not `None`, it answers prompts so unattended sequences don't wait for the user
+        self.prompt_policy = prompt_policy
+        self.pause_gate = PauseGate()
+        # plot commands are sent to the display in batches of at most **plot_frame_rate** per second
+        self.plot_batcher = PlotCommandBatcher(self.plotCommandsRequested.emit, plot_frame_rate)
+        # created the first time a step needs them and shut down when the sequence ends
+        self.process_pool: ProcessPoolExecutor | None = None
+        self.thread_pool: ThreadPoolExecutor | None = None
+        # named locks and semaphores, including the devices used by `run_blocking()`
+        self.resources = ResourcePool()
+        # {"function name (device)": timing}
+        self.blocking_call_statistics: defaultdict[str, CallStatistics] = defaultdict(
+            CallStatistics
+        )
+        self.sequence_profile = SequenceProfile()
+        self.journal: ProgressJournal | None = None  # created when the sequence starts
+        self.data = SequenceData()  # values and channels that steps share in memory
+        # background tasks run in this group and are stopped when the sequence's steps finish
+        self.background_task_group: TaskGroup | None = None
+        self.background_tasks: set[asyncio.Task[None]] = set()
+        self.background_task_count = 0
+        self.stopping_background_tasks = False
+        self.data_directory: Path | None = None
+        # the context that background tasks start from (so they don't inherit the context of the
+        # step that spawned them)
+        self.sequence_context: contextvars.Context | None = None
+
+    async def run_sequence(
+        self, steps: Iterable[SequenceStep], data_directory: Path, resume: bool = False
+    ):
+        """
+        Run an entire sequence. This is not for use by `SequenceStep`s; use `run_steps()` instead.
+
+        Parameters
+        ----------
+        steps
+            The sequence's top-level steps.
+        data_directory
+            The sequence's data directory.
+        resume
+            Whether to resume a previous run of the sequence in **data_directory**. Steps that the
+            previous run completed are skipped.
+
+        Raises
+        ------
+        See `run_single_step()`.
+        """
+        # every task created by the sequence inherits the gate, the plot batcher, and the profile
+        pause.CURRENT_GATE.set(self.pause_gate)
+        plot_batcher.CURRENT_BATCHER.set(self.plot_batcher)
+        self.sequence_profile = SequenceProfile()
+        profiling.CURRENT_PROFILE.set(self.sequence_profile.profile)
+        watchdog: StallWatchdog | None = None
+        if self.stall_threshold is not None:
+            watchdog = StallWatchdog(
+                asyncio.get_running_loop(), self.stall_threshold, self.sequence_profile.profile
+            )
+            watchdog.start()
+        self.journal = self.open_journal(data_directory, resume)
+        self.data_directory = data_directory
+        self.sequence_context = contextvars.copy_context()
+        try:
+            await self.run_steps_with_background_tasks(steps, data_directory)
+        finally:
+            self.background_task_group = None
+            if self.journal is not None:
+                self.journal.close()
+                self.journal = None
+            if watchdog is not None:
+                watchdog.stop()
+                self.sequence_profile.event_loop_lag = watchdog.lag
+            self.shutdown_pools()
+            self.plot_batcher.flush(force=True)  # deliver the last commands
+            self.record_sequence_profile(data_directory)
+
+    async def run_steps_with_background_tasks(
+        self, steps: Iterable[SequenceStep], data_directory: Path
+    ):
+        """
+        Run the sequence's top-level **steps** while supervising the sequence's background tasks.
+        Background tasks are stopped once the steps finish.
+
+        Raises
+        ------
+        See `run_single_step()`. A background task can also raise `FatalSequenceError`.
+        """
+        try:
+            async with TaskGroup() as task_group:
+                self.background_task_group = task_group
+                try:
+                    await self.run_steps(steps, data_directory)
+                finally:
+                    self.stopping_background_tasks = True
+                    for task in self.background_tasks:
+                        task.cancel()
+        except BaseExceptionGroup as exception_group:
+            # re-raise the errors as the plain exceptions `run_single_step()` documents
+            for exception in exception_group.exceptions:
+                if isinstance(exception, FatalSequenceError):
+                    raise exception
+            raise
 
     async def run_steps(self, steps: Iterable[SequenceStep], data_directory: Path):
         """
@@ -78,10 +212,71 @@ class StepRunner(QObject):
         ------
         See `run_single_step()`.
         """
-        for i, step in enumerate(steps):
-            await self.run_single_step(step, data_directory, i + 1)  # run the step
+        # each step is prepared while the step before it runs
+        step_iterator = iter(steps)
+        step = next(step_iterator, None)
+        preparation: asyncio.Task[float] | None = None
+        previous_finish_time: float | None = None
+        step_number = 1
+        try:
+            while step is not None:
+                next_step = next(step_iterator, None)
+                next_preparation: asyncio.Task[float] | None = None
+                if next_step is not None and next_step is not step:
+                    next_preparation = self.start_preparation(next_step)
+                try:
+                    previous_finish_time = await self.run_single_step(
+                        step, data_directory, step_number, preparation, previous_finish_time
+                    )
+                finally:
+                    if preparation is not None:  # in case the step didn't use it
+                        preparation.cancel()
+                    preparation = next_preparation
+                step = next_step
+                step_number += 1
+        finally:
+            if preparation is not None:  # the prepared step will never run
+                preparation.cancel()
+
+    async def run_steps_concurrently(self, steps: Iterable[SequenceStep], data_directory: Path):
+        """
+        Run the provided steps at the same time (each step is a separate branch). This can be
+        called by `SequenceStep`s. If one branch cancels the sequence or raises a fatal error, the
+        other branches are cancelled.
+
+        Parameters
+        ----------
+        steps
+            The steps to run.
+        data_directory
+            The base directory to put the steps' data directories in. The directories are numbered
+            in the same order as **steps**.
 
-    async def run_single_step(self, step: SequenceStep, data_directory: Path, step_number: int):
+        Raises
+        ------
+        See `run_single_step()`.
+        """
+        try:
+            async with TaskGroup() as task_group:
+                for i, step in enumerate(steps):
+                    task_group.create_task(self.run_branch(step, data_directory, i + 1))
+        except BaseExceptionGroup as exception_group:
+            # re-raise the errors as the plain exceptions `run_single_step()` documents
+            for exception in exception_group.exceptions:
+                if isinstance(exception, FatalSequenceError):
+                    raise exception
+            if exception_group.subgroup(BranchCancellation) is not None:
+                raise CancelledError
+            raise
+
+    async def run_single_step(
+        self,
+        step: SequenceStep,
+        data_directory: Path,
+        step_number: int,
+        preparation: asyncio.Task[float] | None = None,
+        previous_finish_time: float | None = None,
+    ) -> float | None:
         """
         Run a single sequence step. This can be called by `SequenceStep`s.
 
@@ -93,6 +288,18 @@ class StepRunner(QObject):
             The base directory to put the step's data directory in.
         step_number
             The step's number (currently used to prefix the step's data directory).
+        preparation
+            The task that is already preparing **step** (see `start_preparation()`). If this is
+            `None`, the step is prepared right before it runs. The caller cancels the task if the
+            step doesn't use it.
+        previous_finish_time
+            When the previous step's `run()` returned (from `time.perf_counter()`). If provided,
+            the gap between the steps is recorded in the step's profile.
+
+        Returns
+        -------
+        When the step finished running (from `time.perf_counter()`), or `None` if the step was
+        skipped.
 
         Raises
         ------
@@ -103,20 +310,42 @@ class StepRunner(QObject):
 
         Do not suppress these errors.
         """
+        await self.pause_gate.wait()  # don't start new steps while paused
+        step_data_directory = self.step_directory(data_directory, step, step_number)
+        step_path: str | None = None
+        if self.journal is not None:
+            step_path = self.journal.step_path(step_data_directory)
+            if self.journal.is_completed(step_path):  # a previous run already completed this step
+                logging.getLogger(__name__).info(f"Skipping completed step {step_path}")
+                return None
+        prompt_decisions: list[PromptDecision] = []  # the prompt policy's answers for this step
         # create the data directory first
+        decisions_token = PROMPT_DECISIONS.set(prompt_decisions)
         try:
-            step_data_directory = await self.make_step_directory(data_directory, step, step_number)
+            await self.make_step_directory(step_data_directory, step)
         except StepCancellation:
-            return
+            return None
+        finally:
+            PROMPT_DECISIONS.reset(decisions_token)
+        self.record_step_started(step_path)
 
         step_address = id(step)  # get the address
         self.stepStateChanged.emit(step_address, True)  # notify start
         cancelled = False
         error_occurred = False
         start_datetime = datetime.now()  # record step start time
+        # the step (and any tasks it creates) records its measurements in this profile
+        profile = StepProfile(profiling.current_profile(), step.name())
+        profile_token = profiling.CURRENT_PROFILE.set(profile)
+        outputs: list[tuple[data_store.DataKey[Any], Any]] = []  # values to persist
+        outputs_token = data_store.STEP_OUTPUTS.set(outputs)
+        decisions_token = PROMPT_DECISIONS.set(prompt_decisions)
+        failed_attempts: list[FailedAttempt] = []
         try:
             try:
-                await step.run(self, step_data_directory)
+                await self.run_with_retries(
+                    step, step_data_directory, profile, failed_attempts, preparation
+                )
             except FatalSequenceError:  # fatal errors are not recoverable
                 # intentionally putting this code here far clarity
                 # we don't log metadata for fatal errors
@@ -135,21 +364,53 @@ class StepRunner(QObject):
                 )
         except CancelledError:  # log cancellation then cancel
             cancelled = True
+            self.stop_profile(step, profile, step_data_directory)
             await self.record_metadata(
-                step_data_directory, step, start_datetime, cancelled, error_occurred
+                step_data_directory,
+                step,
+                start_datetime,
+                cancelled,
+                error_occurred,
+                profile,
+                failed_attempts,
+                prompt_decisions,
             )
             raise
         finally:
+            finish_time = time.perf_counter()
+            profiling.CURRENT_PROFILE.reset(profile_token)
+            data_store.STEP_OUTPUTS.reset(outputs_token)
+            PROMPT_DECISIONS.reset(decisions_token)
             self.stepStateChanged.emit(step_address, False)  # notify finish
+        if previous_finish_time is not None and profile.run_start_time is not None:
+            profile.gap_time = profile.run_start_time - previous_finish_time
         # this runs if there wasn't a fatal error and the *sequence* wasn't cancelled
+        await self.persist_outputs(outputs, step_data_directory)
+        self.stop_profile(step, profile, step_data_directory)
         await self.record_metadata(
-            step_data_directory, step, start_datetime, cancelled, error_occurred
+            step_data_directory,
+            step,
+            start_datetime,
+            cancelled,
+            error_occurred,
+            profile,
+            failed_attempts,
+            prompt_decisions,
         )
+        if cancelled:
+            outcome = journal.CANCELLED
+        elif error_occurred:
+            outcome = journal.FAILED
+        else:
+            outcome = journal.SUCCEEDED
+        await self.record_step_completed(step_path, outcome)
+        return finish_time
 
     async def prompt_user(self, step: SequenceStep, message: str, options: dict[int, str]) -> int:
         """
         Show a popup prompt to the user and wait for a response. This can be called by
-        `SequenceStep`s.
+        `SequenceStep`s. If the sequence's prompt policy has an answer, the prompt might be answered
+        automatically (the answer is recorded in the **step**'s metadata).
 
         Parameters
         ----------
@@ -198,6 +459,276 @@ class StepRunner(QObject):
             case _:
                 raise FatalSequenceError(f"Got {response} but expected 0 or 1")
 
+    def create_task[Result](
+        self,
+        coroutine: Coroutine[Any, Any, Result],
+        name: str | None = None,
+        pausable: bool = True,
+    ) -> asyncio.Task[Result]:
+        """
+        Create an `asyncio.Task` that runs **coroutine** on the sequence. This can be called by
+        `SequenceStep`s. The caller is responsible for awaiting or cancelling the task.
+
+        Parameters
+        ----------
+        coroutine
+            The coroutine to run.
+        name
+            The task's name.
+        pausable
+            Whether the task stops at its next `SequenceStep.sleep()` when the sequence is paused.
+            Pass `False` for background work that must keep running while the sequence is paused
+            (i.e. logging or instrument keepalives).
+        """
+        context = contextvars.copy_context()
+        if not pausable:
+            context.run(pause.PAUSABLE.set, False)
+        return asyncio.create_task(coroutine, name=name, context=context)
+
+    async def run_in_process[**Params, Result](
+        self, function: Callable[Params, Result], *args: Params.args, **kwargs: Params.kwargs
+    ) -> Result:
+        """
+        Run **function** in a separate process and wait for the result. This can be called by
+        `SequenceStep`s. Use this for CPU-heavy work (i.e. curve fitting) so the rest of the
+        sequence keeps running. If the caller is cancelled before the function starts, the function
+        never runs.
+
+        **function**, its arguments, and its result must be picklable, so **function** should be
+        defined at the top level of a module.
+
+        Parameters
+        ----------
+        function
+            The function to run.
+        *args
+            Positional arguments to pass to **function**.
+        **kwargs
+            Keyword arguments to pass to **function**.
+
+        Returns
+        -------
+        The result of **function**.
+        """
+        if self.process_pool is None:
+            self.process_pool = ProcessPoolExecutor(
+                # leave a core for the sequence and the GUI
+                max_workers=max(1, (os.process_cpu_count() or 1) - 1),
+                # forking a process that is running Qt threads is unsafe
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return await asyncio.get_running_loop().run_in_executor(
+            self.process_pool, functools.partial(function, *args, **kwargs)
+        )
+
+    async def run_blocking[**Params, Result](
+        self, function: Callable[Params, Result], *args: Params.args, **kwargs: Params.kwargs
+    ) -> Result:
+        """
+        Run a blocking **function** (i.e. a call to an instrument driver) on one of the sequence's
+        threads and wait for the result. This can be called by `SequenceStep`s. The rest of the
+        sequence keeps running while **function** runs. Use `run_blocking_on()` for calls that need
+        a device to themselves.
+
+        Parameters
+        ----------
+        function
+            The function to run.
+        *args
+            Positional arguments to pass to **function**.
+        **kwargs
+            Keyword arguments to pass to **function**.
+
+        Returns
+        -------
+        The result of **function**.
+
+        Notes
+        -----
+        If the caller is cancelled while **function** is running, **function** still runs to
+        completion (threads cannot be interrupted).
+        """
+        return await self.run_blocking_on(None, function, *args, **kwargs)
+
+    async def run_blocking_on[**Params, Result](
+        self,
+        device: Hashable | None,
+        function: Callable[Params, Result],
+        *args: Params.args,
+        **kwargs: Params.kwargs,
+    ) -> Result:
+        """
+        Like `run_blocking()`, but calls with an equal **device** (i.e. a serial port name) never
+        run at the same time. Callers wait their turn without blocking the sequence.
+
+        Parameters
+        ----------
+        device
+            The device **function** uses. This uses the resource called **device** (see
+            `resource()`), so it also waits for steps holding that resource. If the caller already
+            holds that resource (i.e. inside `async with runner.resource(device)`), the call doesn't
+            wait for it. If this is `None`, the call doesn't wait for anything.
+        function
+            The function to run.
+        *args
+            Positional arguments to pass to **function**.
+        **kwargs
+            Keyword arguments to pass to **function**.
+
+        Returns
+        -------
+        The result of **function**.
+
+        Notes
+        -----
+        If the caller is cancelled while **function** is running, **function** still runs to
+        completion (threads cannot be interrupted) and **device** stays locked until it finishes.
+        """
+        loop = asyncio.get_running_loop()
+        if self.thread_pool is None:
+            self.thread_pool = ThreadPoolExecutor(
+                MAX_BLOCKING_THREADS, thread_name_prefix="fabrial-sequence-blocking"
+            )
+        name = getattr(function, "__qualname__", repr(function))
+        if device is not None:
+            name = f"{name} ({device})"
+        times: list[float] = []  # (start time, end time)
+
+        def timed_function() -> Result:
+            times.append(time.perf_counter())
+            try:
+                return function(*args, **kwargs)
+            finally:
+                times.append(time.perf_counter())
+
+        submitted_time = time.perf_counter()
+        resource = self.resources.get(device) if device is not None else None
+        if resource is not None and resource.is_held():
+            resource = None  # the caller already has the device to itself
+        acquisition = await resource.acquire() if resource is not None else None
+        try:
+            future = self.thread_pool.submit(timed_function)
+        except BaseException:
+            if resource is not None and acquisition is not None:
+                resource.release(acquisition)
+            raise
+        if resource is not None and acquisition is not None:
+            # release the device when the function finishes, not when the caller stops waiting
+            future.add_done_callback(
+                lambda _: call_soon_threadsafe(loop, lambda: resource.release(acquisition))
+            )
+        try:
+            return await asyncio.wrap_future(future)
+        finally:
+            if len(times) == 2:  # the function ran and finished
+                start_time, end_time = times
+                statistics = self.blocking_call_statistics[name]
+                statistics.wait.add(start_time - submitted_time)
+                statistics.run.add(end_time - start_time)
+
+    def spawn_background(
+        self,
+        function: Callable[[Path], Coroutine[Any, Any, Any]],
+        name: str,
+        pausable: bool = True,
+    ) -> asyncio.Task[None]:
+        """
+        Start a task that keeps running after the calling step finishes, until the sequence ends
+        (i.e. logging a temperature for the entire sequence). This can be called by
+        `SequenceStep`s.
+
+        ```python
+        async def log_temperature(data_directory: Path):
+            with open(data_directory.joinpath("temperature.csv"), "w") as f:
+                async for tick in self.every(5):
+                    f.write(f"{time.time()},{await read_temperature()}\\n")
+
+        runner.spawn_background(log_temperature, "Oven Temperature")
+        ```
+
+        The task gets its own data directory (in the sequence's data directory, under
+        "Background Tasks") with a metadata file containing the task's `Performance`. Errors raised
+        by the task are logged and recorded in its metadata without affecting the sequence, except
+        for `FatalSequenceError`, which ends the sequence.
+
+        Parameters
+        ----------
+        function
+            Called with the task's data directory to create the task's coroutine.
+        name
+            The task's name, used for its data directory.
+        pausable
+            Whether the task stops at `SequenceStep.sleep()` (and `SequenceStep.every()`) while the
+            sequence is paused.
+
+        Returns
+        -------
+        The task. Cancel it to stop it early.
+
+        Raises
+        ------
+        RuntimeError
+            The sequence isn't running.
+        OSError
+            The task's data directory couldn't be created.
+        """
+        task_group = self.background_task_group
+        if task_group is None or self.data_directory is None or self.sequence_context is None:
+            raise RuntimeError("Background tasks can only be started while the sequence runs")
+        self.background_task_count += 1
+        data_directory = self.data_directory.joinpath(
+            BACKGROUND_DIRECTORY_NAME, f"{self.background_task_count} {name}"
+        )
+        os.makedirs(data_directory, exist_ok=True)
+        context = self.sequence_context.copy()
+        context.run(pause.PAUSABLE.set, pausable)
+        task = task_group.create_task(
+            self.run_background_task(function, name, data_directory), name=name, context=context
+        )
+        self.background_tasks.add(task)  # we have to keep references to tasks
+        task.add_done_callback(self.background_tasks.discard)
+        return task
+
+    @contextlib.asynccontextmanager
+    async def resource(self, name: Hashable, capacity: int = 1) -> AsyncGenerator[None]:
+        """
+        Use the sequence's resource called **name** (i.e. an instrument that only one step can use
+        at a time). This can be called by `SequenceStep`s. Waiting doesn't block the sequence, and
+        waiting steps get the resource in the order they asked for it.
+
+        ```python
+        async with runner.resource("oven-1"):
+            await set_temperature(...)
+        ```
+
+        Time spent waiting is recorded in the step's `Performance` metadata, and per-resource
+        totals are recorded in the sequence's performance file.
+
+        Parameters
+        ----------
+        name
+            The resource's name. Resources are shared by every step in the sequence.
+        capacity
+            How many users the resource can have at once. Use 1 (the default) for a lock. Every
+            use of a resource must agree on its capacity.
+
+        Raises
+        ------
+        ResourceDeadlockError
+            Waiting would never finish, i.e. the step (or a step running it) already holds the
+            resource.
+        ValueError
+            **capacity** doesn't match the resource's capacity.
+        """
+        resource = self.resources.get(name, capacity)
+        acquisition = await resource.acquire()
+        token = HELD_RESOURCES.set((*HELD_RESOURCES.get(), acquisition))
+        try:
+            yield
+        finally:
+            HELD_RESOURCES.reset(token)
+            resource.release(acquisition)
+
     @contextlib.asynccontextmanager
     async def create_plot(
         self, step: SequenceStep, tab_text: str, plot_settings: PlotSettings
@@ -219,35 +750,185 @@ class StepRunner(QObject):
         -------
         A thread-safe handle for the plot that can be used to modify it from your `SequenceStep`.
         """
-        receiver: DataLock[PlotIndex | None] = DataLock(None)
-        step_address = id(step)  # copy
-        step_name = step.name()  # copy
+        receiver: Reply[PlotIndex] = Reply()
         # notify that we want to create a new plot
         self.submit_plot_command(
-            lambda plot_tab: plot_tab.add_plot(
-                step_address, step_name, tab_text, plot_settings, receiver
-            )
+            AddPlot(id(step), step.name(), tab_text, plot_settings, receiver), immediate=True
         )
-        # wait for a response
-        while True:
-            await asyncio.sleep(0)
-            if (plot_index := receiver.get()) is not None:
-                plot_handle = PlotHandle(self, plot_index)
-                try:
-                    yield plot_handle  # return the plot handle
-                finally:  # this runs at the end of the context manager
-                    self.submit_plot_command(  # remove the plot
-                        lambda plot_tab: plot_tab.remove_plot(copy.copy(plot_index))
-                    )
-                return  # exit
+        plot_index = await self.wait_for_reply(receiver)  # wait for a response
+        plot_handle = PlotHandle(self, plot_index)
+        try:
+            yield plot_handle  # return the plot handle
+        finally:  # this runs at the end of the context manager
+            self.submit_plot_command(RemovePlot(plot_index))  # remove the plot
 
     # ----------------------------------------------------------------------------------------------
     # private
-    async def make_step_directory(
-        self, data_directory: Path, step: SequenceStep, number: int
-    ) -> Path:
+    async def run_branch(self, step: SequenceStep, data_directory: Path, step_number: int):
         """
-        Create the data directory for **step** and return the directory's path.
+        Run a single step as one branch of `run_steps_concurrently()`.
+
+        Raises
+        ------
+        BranchCancellation
+            The step cancelled the sequence.
+        FatalSequenceError
+            The sequence encountered a fatal error.
+        """
+        try:
+            await self.run_single_step(step, data_directory, step_number)
+        except CancelledError:
+            # a `TaskGroup` treats a task that raises `CancelledError` as cancelled and keeps
+            # running the other tasks. If the cancellation came from inside the step (i.e. the user
+            # chose to cancel the sequence) we turn it into an error so the other branches get
+            # cancelled
+            task = asyncio.current_task()
+            if task is not None and task.cancelling() == 0:
+                raise BranchCancellation from None
+            raise
+
+    async def run_with_retries(
+        self,
+        step: SequenceStep,
+        data_directory: Path,
+        profile: StepProfile,
+        failed_attempts: list[FailedAttempt],
+        preparation: asyncio.Task[float] | None,
+    ):
+        """
+        Prepare and run **step**, resetting it and trying again as its retry policy allows. The
+        first attempt uses **preparation** if it isn't `None`. Failed attempts are added to
+        **failed_attempts**.
+
+        Raises
+        ------
+        Whatever the final attempt raised.
+        """
+        policy = step.retry_policy()
+        attempt = 1
+        while True:
+            try:
+                if preparation is None:
+                    profile.preparation_time += await self.prepare_step(step)
+                else:
+                    profile.preparation_time += await preparation
+                    preparation = None  # retries prepare again
+                if profile.run_start_time is None:
+                    profile.run_start_time = time.perf_counter()
+                await step.run(self, data_directory)
+                return
+            except (FatalSequenceError, StepCancellation):
+                raise
+            except Exception as error:
+                if policy is None or not policy.should_retry(error, attempt):
+                    raise
+                delay = policy.delay(attempt)
+                logging.getLogger(__name__).warning(
+                    f"{step.name()} failed (attempt {attempt} of {policy.max_attempts}), "
+                    f"retrying in {delay:g} s",
+                    exc_info=True,
+                )
+                failed_attempts.append(FailedAttempt(attempt, repr(error), delay))
+            step.reset()
+            await step.sleep(delay)
+            attempt += 1
+
+    def start_preparation(self, step: SequenceStep) -> asyncio.Task[float]:
+        """
+        Start preparing **step** in a separate task so it's ready by the time it runs. The task
+        returns the number of seconds preparation took.
+        """
+        task = asyncio.create_task(self.prepare_step(step), name=f"Prepare {step.name()}")
+        # the step that uses the task reports its errors. If the step never runs, the task is
+        # cancelled and any error is dropped
+        task.add_done_callback(lambda task: task.cancelled() or task.exception())
+        return task
+
+    async def prepare_step(self, step: SequenceStep) -> float:
+        """Call **step**'s `prepare()` and return the number of seconds it took."""
+        start_time = time.perf_counter()
+        await step.prepare(self)
+        return time.perf_counter() - start_time
+
+    async def run_background_task(
+        self, function: Callable[[Path], Coroutine[Any, Any, Any]], name: str, data_directory: Path
+    ):
+        """
+        Run a background task started by `spawn_background()` and record its metadata.
+
+        Raises
+        ------
+        CancelledError
+            The task was cancelled.
+        FatalSequenceError
+            The task raised a fatal error.
+        """
+        start_datetime = datetime.now()
+        # this runs in the task's own context, so the profile only applies to this task
+        profile = StepProfile(profiling.current_profile(), name)
+        profiling.CURRENT_PROFILE.set(profile)
+        cancelled = False
+        error_occurred = False
+        try:
+            await function(data_directory)
+        except FatalSequenceError:
+            raise
+        except CancelledError:
+            # being stopped at the end of the sequence is the normal way for a background task to
+            # end
+            cancelled = not self.stopping_background_tasks
+            raise
+        except Exception:
+            logging.getLogger(__name__).exception(f"Background task {name} error")
+            error_occurred = True
+        finally:
+            profile.stop(data_directory)
+            try:
+                with open(data_directory.joinpath(METADATA_FILENAME), "w") as f:
+                    json.dump(
+                        {
+                            "Name": name,
+                            "Start Datetime": str(start_datetime),
+                            "End Datetime": str(datetime.now()),
+                            "Cancelled": cancelled,
+                            "Error": error_occurred,
+                            "Performance": profile.as_dict(),
+                        },
+                        f,
+                        indent=4,
+                    )
+            except Exception:
+                logging.getLogger(__name__).exception("Failed to write background task metadata")
+
+    def shutdown_pools(self):
+        """
+        Shut down the executors used by the sequence. Queued work is cancelled and work that is
+        already running finishes in the background.
+        """
+        if self.process_pool is not None:
+            self.process_pool.shutdown(wait=False, cancel_futures=True)
+            self.process_pool = None
+        if self.thread_pool is not None:
+            self.thread_pool.shutdown(wait=False, cancel_futures=True)
+            self.thread_pool = None
+        if len(self.blocking_call_statistics) > 0:
+            logging.getLogger(__name__).info(
+                "Blocking call statistics: "
+                + json.dumps(
+                    {
+                        name: statistics.as_dict()
+                        for name, statistics in self.blocking_call_statistics.items()
+                    }
+                )
+            )
+
+    def step_directory(self, data_directory: Path, step: SequenceStep, number: int) -> Path:
+        """Get the path of the data directory for **step**."""
+        return data_directory.joinpath(f"{number} {step.directory_name()}")
+
+    async def make_step_directory(self, step_data_directory: Path, step: SequenceStep):
+        """
+        Create **step**'s data directory (**step_data_directory**).
 
         Raises
         ------
@@ -256,11 +937,10 @@ class StepRunner(QObject):
         FatalSequenceError
             The sequence encountered a fatal error.
         """
-        step_data_directory = data_directory.joinpath(f"{number} {step.directory_name()}")
         while True:
             try:
                 os.makedirs(step_data_directory, exist_ok=True)
-                return step_data_directory
+                return
             except OSError:
                 await self.prompt_retry_cancel(
                     step, f"Failed to create data directory, {step_data_directory}"
@@ -291,14 +971,49 @@ class StepRunner(QObject):
                 raise FatalSequenceError(f"Reponse was {response} when it should have been 0 or 1")
 
     async def send_prompt_and_wait(self, title: str, message: str, options: dict[int, str]) -> int:
-        """Private helper function to send a message the the user and wait for a response."""
-        receiver: DataLock[int | None] = DataLock(None)
+        """
+        Private helper function to send a message the the user and wait for a response. The prompt
+        policy (if any) gets the first chance to answer. Its answers are recorded for the running
+        step.
+        """
+        if self.prompt_policy is None:
+            return await self.ask_user(title, message, options)
+        if (decisions := PROMPT_DECISIONS.get()) is None:  # outside of a step
+            decisions = []
+        answer_counts = Counter(decision.rule_number for decision in decisions)
+        if (match := self.prompt_policy.match(title, message, options, answer_counts)) is None:
+            return await self.ask_user(title, message, options)
+
+        rule_number, rule, value = match
+        timed_out = False
+        if rule.timeout is not None:  # give the user a chance to answer first
+            receiver: Reply[int] = Reply()
+            self.promptRequested.emit(
+                title,
+                f"{message}\n\n(Choosing {options[value]!r} automatically in {rule.timeout:g} s.)",
+                options,
+                receiver,
+            )
+            try:
+                async with asyncio.timeout(rule.timeout):
+                    return await self.wait_for_reply(receiver)
+            except TimeoutError:
+                receiver.withdraw()  # closes the prompt
+            timed_out = True
+        decisions.append(
+            PromptDecision(title, message, options[value], timed_out, datetime.now(), rule_number)
+        )
+        logging.getLogger(__name__).info(
+            f"Answered prompt {title!r} with {options[value]!r} "
+            f"{'after a timeout' if timed_out else 'from the prompt policy'}"
+        )
+        return value
+
+    async def ask_user(self, title: str, message: str, options: dict[int, str]) -> int:
+        """Show a prompt and wait for the user's response."""
+        receiver: Reply[int] = Reply()
         self.promptRequested.emit(title, message, options, receiver)  # request a prompt
-        # wait for the response
-        while True:
-            await asyncio.sleep(0)
-            if (response := receiver.get()) is not None:
-                return response
+        return await self.wait_for_reply(receiver)  # wait for the response
 
     async def record_metadata(
         self,
@@ -307,10 +1022,16 @@ class StepRunner(QObject):
         start_datetime: datetime,
         cancelled: bool,
         error_occurred: bool,
+        profile: StepProfile,
+        failed_attempts: Sequence[FailedAttempt],
+        prompt_decisions: list[PromptDecision],
     ):
         """
-        Generate the default metadata and combine it with the **step**'s metadata, then write the
-        data to a metadata file in the **step**'s data directory. Logs any errors.
+        Generate the default metadata (including the step's performance **profile**, any
+        **failed_attempts** that were retried, the **prompt_decisions** the prompt policy made, and
+        the parameters of the sweep point the step ran in) and combine it with the **step**'s
+        metadata, then write the data to a metadata file in the **step**'s data directory. Logs any
+        errors.
 
         Raises
         ------
@@ -319,32 +1040,133 @@ class StepRunner(QObject):
         FatalSequenceError
             The sequence encountered a fatal error.
         """
-        while True:
+        # the policy can also answer prompts about writing the metadata
+        decisions_token = PROMPT_DECISIONS.set(prompt_decisions)
+        try:
+            while True:
+                try:
+                    file = directory.joinpath(METADATA_FILENAME)
+                    data = step.metadata()
+                    # we do it in this order so the step's metadata gets overridden if there are
+                    # duplicate keys. The default keys are reserved
+                    data.update(
+                        {
+                            "Start Datetime": str(start_datetime),
+                            "End Datetime": str(datetime.now()),
+                            "Cancelled": cancelled,
+                            "Error": error_occurred,
+                            "Performance": profile.as_dict(),
+                        }
+                    )
+                    if len(failed_attempts) > 0:
+                        data["Retries"] = [attempt.as_dict() for attempt in failed_attempts]
+                    if len(prompt_decisions) > 0:
+                        data["Automatic Prompt Answers"] = [
+                            decision.as_dict() for decision in prompt_decisions
+                        ]
+                    if len(parameters := sweep.current_parameters()) > 0:
+                        data["Sweep Parameters"] = dict(parameters)
+                    with open(file, "w") as f:
+                        # any non-JSON types are converted to strings
+                        json.dump(data, f, indent=4, default=str)
+                    break  # exit the loop
+                except Exception:
+                    logging.getLogger(__name__).exception("Failed to write metadata")
+                    await self.prompt_retry_cancel(step, "Failed to record metadata.")
+        finally:
+            PROMPT_DECISIONS.reset(decisions_token)
+
+    async def persist_outputs(
+        self, outputs: list[tuple[data_store.DataKey[Any], Any]], data_directory: Path
+    ):
+        """
+        Save the values a step published with `persist=True` to its **data_directory**. The files
+        are written on another thread so large arrays don't stall the sequence. Logs errors.
+        """
+        if len(outputs) == 0:
+            return
+        try:
+            await asyncio.to_thread(data_store.save_outputs, outputs, data_directory)
+        except Exception:
+            logging.getLogger(__name__).exception("Failed to persist the step's published values")
+
+    def open_journal(self, data_directory: Path, resume: bool) -> ProgressJournal | None:
+        """
+        Create (or resume) the sequence's progress journal. Logs errors and returns `None` if the
+        journal couldn't be opened; the sequence still runs, it just can't be resumed.
+        """
+        try:
+            if resume:
+                return ProgressJournal.resume(data_directory)
+            return ProgressJournal.create(data_directory)
+        except OSError:
+            logging.getLogger(__name__).exception("Failed to open the progress journal")
+            return None
+
+    def record_step_started(self, step_path: str | None):
+        """Record that a step started in the journal (if there is one). Logs errors."""
+        if self.journal is not None and step_path is not None:
             try:
-                file = directory.joinpath(METADATA_FILENAME)
-                data = step.metadata()
-                # we do it in this order so the step's metadata gets overridden if there are
-                # duplicate keys. The default keys are reserved
-                data.update(
-                    {
-                        "Start Datetime": str(start_datetime),
-                        "End Datetime": str(datetime.now()),
-                        "Cancelled": cancelled,
-                        "Error": error_occurred,
-                    }
-                )
-                with open(file, "w") as f:
-                    # any non-JSON types are converted to strings
-                    json.dump(data, f, indent=4, default=str)
-                break  # exit the loop
-            except Exception:
-                logging.getLogger(__name__).exception("Failed to write metadata")
-                await self.prompt_retry_cancel(step, "Failed to record metadata.")
+                self.journal.step_started(step_path)
+            except OSError:
+                logging.getLogger(__name__).exception("Failed to record the sequence's progress")
+
+    async def record_step_completed(self, step_path: str | None, outcome: str):
+        """
+        Record that a step completed with **outcome** in the journal (if there is one). Logs errors.
+        """
+        if self.journal is not None and step_path is not None:
+            try:
+                await self.journal.step_completed(step_path, outcome)
+            except OSError:
+                logging.getLogger(__name__).exception("Failed to record the sequence's progress")
+
+    def stop_profile(self, step: SequenceStep, profile: StepProfile, data_directory: Path):
+        """Stop measuring **step** and add its **profile** to the sequence's rollup."""
+        profile.stop(data_directory)
+        self.sequence_profile.add_step(type(step), profile)
+
+    def record_sequence_profile(self, data_directory: Path):
+        """
+        Stop measuring the sequence and write the sequence's performance rollup to
+        **data_directory**. Logs errors.
+        """
+        self.sequence_profile.profile.stop(data_directory)
+        self.sequence_profile.resources = self.resources.statistics()
+        self.sequence_profile.plot_batches = self.plot_batcher.statistics
+        try:
+            with open(data_directory.joinpath(PERFORMANCE_FILENAME), "w") as f:
+                json.dump(self.sequence_profile.as_dict(), f, indent=4)
+        except Exception:
+            logging.getLogger(__name__).exception("Failed to write the sequence's performance")
 
     # used externally
-    def submit_plot_command(self, command: Callable[[SequenceDisplayTab], None]):
+    async def wait_for_reply[Data](self, receiver: Reply[Data]) -> Data:
         """
-        Submit a **command** to the plot command queue. This is not for direct use by
-        `SequenceStep`s.
+        Wait for a reply from the GUI and count the time toward the running step's profile. This is
+        not for direct use by `SequenceStep`s.
         """
-        self.plotCommandRequested.emit(command)
+        start_time = time.perf_counter()
+        try:
+            return await receiver.wait()
+        finally:
+            if (profile := profiling.current_profile()) is not None:
+                profile.add_gui_wait(time.perf_counter() - start_time)
+
+    def submit_plot_command(self, command: PlotCommand, immediate: bool = False):
+        """
+        Submit a **command** to the plot command queue. The command is delivered with the next
+        batch, or right away if **immediate** is `True` (for commands whose reply is awaited). This
+        is not for direct use by `SequenceStep`s.
+        """
+        if (profile := profiling.current_profile()) is not None:
+            profile.add_plot_command()
+        self.plot_batcher.submit(command, immediate)
+
+
+def call_soon_threadsafe(loop: asyncio.AbstractEventLoop, callback: Callable[[], Any]):
+    """Schedule **callback** on **loop** from any thread. Does nothing if **loop** is closed."""
+    try:
+        loop.call_soon_threadsafe(callback)
+    except RuntimeError:  # the loop is closed
+        pass
@@ -0,0 +1,156 @@
+"""Parameter sweeps that are expanded one point at a time while the sequence runs."""
+
+import math
+import typing
+from collections.abc import Iterator, Mapping, Sequence
+from contextvars import ContextVar
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Self
+
+from ..enums import SweepSpacing
+from ..utility.serde import Json
+
+NAME = "name"
+SPACING = "spacing"
+START = "start"
+STOP = "stop"
+POINTS = "points"
+VALUES = "values"
+
+SWEEP_PARAMETERS: ContextVar[Mapping[str, float]] = ContextVar(
+    "SWEEP_PARAMETERS", default=MappingProxyType({})
+)
+"""The parameter values of the sweep point(s) the current step is running in."""
+
+
+@dataclass(frozen=True)
+class ParameterRange:
+    """
+    The values of one swept parameter. Only the range is stored, so large sweeps take no more
+    memory than small ones; values are computed when they are needed.
+
+    Parameters
+    ----------
+    name
+        The parameter's name (i.e. `"Setpoint"`).
+    spacing
+        How the values are spaced.
+    start
+        The first value (not used for `SweepSpacing.List`).
+    stop
+        The last value (not used for `SweepSpacing.List`).
+    points
+        The number of values, including **start** and **stop** (not used for `SweepSpacing.List`).
+    values
+        The values of a `SweepSpacing.List` range.
+
+    Raises
+    ------
+    ValueError
+        The range is empty, or a logarithmic range doesn't have positive endpoints.
+    """
+
+    name: str
+    spacing: SweepSpacing
+    start: float = 0
+    stop: float = 0
+    points: int = 1
+    values: tuple[float, ...] = ()
+
+    def __post_init__(self):
+        match self.spacing:
+            case SweepSpacing.List:
+                if len(self.values) == 0:
+                    raise ValueError(f"Parameter {self.name!r} has no values")
+            case SweepSpacing.Linear | SweepSpacing.Log:
+                if self.points < 1:
+                    raise ValueError(f"Parameter {self.name!r} needs at least 1 point")
+                if self.spacing is SweepSpacing.Log and (self.start <= 0 or self.stop <= 0):
+                    raise ValueError(
+                        f"Logarithmic parameter {self.name!r} needs positive start and stop values"
+                    )
+
+    def __len__(self) -> int:
+        return len(self.values) if self.spacing is SweepSpacing.List else self.points
+
+    def value(self, index: int) -> float:
+        """Get the value at position **index** (starting at 0)."""
+        if self.spacing is SweepSpacing.List:
+            return self.values[index]
+        if self.points == 1:
+            return self.start
+        fraction = index / (self.points - 1)
+        if self.spacing is SweepSpacing.Log:
+            return self.start * (self.stop / self.start) ** fraction
+        return self.start + (self.stop - self.start) * fraction
+
+    @classmethod
+    def from_dict(cls, range_as_dict: Mapping[str, Json]) -> Self:
+        """
+        Create a range from a dictionary (see `to_dict()`).
+
+        Raises
+        ------
+        KeyError
+            A required key is missing or the spacing is unknown.
+        ValueError
+            A value is invalid.
+        """
+        spacing = SweepSpacing[str(range_as_dict[SPACING])]
+        name = str(range_as_dict[NAME])
+        if spacing is SweepSpacing.List:
+            values = typing.cast(Sequence[float], range_as_dict[VALUES])
+            return cls(name, spacing, values=tuple(float(value) for value in values))
+        return cls(
+            name,
+            spacing,
+            float(typing.cast(float, range_as_dict[START])),
+            float(typing.cast(float, range_as_dict[STOP])),
+            int(typing.cast(int, range_as_dict[POINTS])),
+        )
+
+    def to_dict(self) -> dict[str, Json]:
+        """Convert the range to a JSON-friendly dictionary."""
+        range_as_dict: dict[str, Json] = {NAME: self.name, SPACING: self.spacing.name}
+        if self.spacing is SweepSpacing.List:
+            range_as_dict[VALUES] = list(self.values)
+        else:
+            range_as_dict.update({START: self.start, STOP: self.stop, POINTS: self.points})
+        return range_as_dict
+
+
+def point_count(ranges: Sequence[ParameterRange]) -> int:
+    """The number of points in a sweep over every combination of **ranges**."""
+    return math.prod(len(parameter_range) for parameter_range in ranges)
+
+
+def sweep_points(ranges: Sequence[ParameterRange]) -> Iterator[dict[str, float]]:
+    """
+    Generate every combination of **ranges**' values, one at a time. The first range changes
+    slowest. Points are computed as they are needed, so memory use doesn't depend on the size of
+    the sweep. Without any ranges, there is a single point with no parameters.
+
+    Raises
+    ------
+    ValueError
+        Two ranges have the same name.
+    """
+    names = [parameter_range.name for parameter_range in ranges]
+    if len(set(names)) != len(names):
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        raise ValueError(f"Swept parameters need unique names, but {duplicates} are repeated")
+    for point_index in range(point_count(ranges)):
+        point: dict[str, float] = {}
+        for parameter_range in reversed(ranges):  # the last range changes fastest
+            point_index, index = divmod(point_index, len(parameter_range))
+            point[parameter_range.name] = parameter_range.value(index)
+        yield {parameter_range.name: point[parameter_range.name] for parameter_range in ranges}
+
+
+def current_parameters() -> Mapping[str, float]:
+    """
+    Get the parameter values of the sweep point the current step is running in, by name. Nested
+    sweeps contribute all of their parameters. This is empty outside of a sweep.
+    """
+    return SWEEP_PARAMETERS.get()
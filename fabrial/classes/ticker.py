@@ -0,0 +1,105 @@
+"""Drift-free periodic timing for sequence steps."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from dataclasses import dataclass
+from typing import Self
+
+from ..enums import MissedTickPolicy
+from . import pause, plot_batcher
+from .timing import TimingStatistics
+
+
+@dataclass(frozen=True)
+class Tick:
+    """
+    One tick of a `Ticker`.
+
+    Parameters
+    ----------
+    number
+        The tick's position in the schedule (the first tick is 0). Skipped ticks are counted, so
+        `number * interval` is always the scheduled time since the first tick.
+    deadline
+        When the tick was scheduled, as returned by `time.monotonic()`.
+    lateness
+        How many seconds after **deadline** the tick was delivered.
+    missed
+        How many ticks were skipped immediately before this one.
+    """
+
+    number: int
+    deadline: float
+    lateness: float
+    missed: int
+
+
+class Ticker:
+    """
+    An asynchronous iterator that yields a `Tick` every **interval** seconds. Deadlines are
+    calculated from the first tick (`start + number * interval`) using `time.monotonic()`, so time
+    spent working between ticks doesn't delay later ticks and the schedule doesn't drift, even over
+    long runs or when the system clock changes. Use `SequenceStep.every()` to create one.
+
+    If the sequence is paused, the ticker waits before delivering the next tick. Ticks that come due
+    while paused (or while the step is busy) are handled according to **policy**.
+
+    Parameters
+    ----------
+    interval
+        The number of seconds between ticks.
+    policy
+        What to do with ticks that are already late by a full interval.
+    """
+
+    def __init__(self, interval: float, policy: MissedTickPolicy = MissedTickPolicy.Skip):
+        if not interval > 0:
+            raise ValueError(f"The interval must be positive, not {interval}")
+        self.interval = interval
+        self.policy = policy
+        self.start_time: float | None = None  # set at the first tick
+        self.number = 0  # the number of the next tick
+        self.missed_ticks = 0
+        self.lateness = TimingStatistics()
+
+    def __aiter__(self) -> Self:
+        return self
+
+    async def __anext__(self) -> Tick:
+        await pause.wait_if_paused()
+        await plot_batcher.wait_for_display()
+        if (start_time := self.start_time) is None:
+            start_time = self.start_time = time.monotonic()
+        missed = 0
+        deadline = start_time + self.number * self.interval
+        if self.policy is MissedTickPolicy.Skip:
+            # skip every tick that is at least one full interval late
+            if (behind := math.floor((time.monotonic() - deadline) / self.interval)) > 0:
+                missed = behind
+                self.number += missed
+                deadline = start_time + self.number * self.interval
+        # always sleep so a burst of late ticks can't starve other tasks. The event loop can wake
+        # up slightly early, so keep sleeping until the deadline passes
+        await asyncio.sleep(max(deadline - time.monotonic(), 0))
+        while (remaining := deadline - time.monotonic()) > 0:
+            await asyncio.sleep(remaining)
+
+        lateness = time.monotonic() - deadline
+        tick = Tick(self.number, deadline, lateness, missed)
+        self.number += 1
+        self.missed_ticks += missed
+        self.lateness.add(lateness)
+        return tick
+
+    def as_dict(self) -> dict[str, object]:
+        """Convert the ticker's statistics to a JSON-friendly dictionary."""
+        return {
+            "Interval (s)": self.interval,
+            "Missed Tick Policy": self.policy.name,
+            "Ticks": self.lateness.count,
+            "Missed Ticks": self.missed_ticks,
+            "Lateness": self.lateness.as_dict(),
+        }
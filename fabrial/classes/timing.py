@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+
+@dataclass
+class TimingStatistics:
+    """Running statistics for an operation that is timed repeatedly. Durations are in seconds."""
+
+    count: int = 0
+    total: float = 0
+    maximum: float = 0
+
+    def add(self, duration: float):
+        """Record one **duration**."""
+        self.count += 1
+        self.total += duration
+        self.maximum = max(self.maximum, duration)
+
+    def mean(self) -> float:
+        """The mean duration (0 if nothing was recorded)."""
+        return self.total / self.count if self.count > 0 else 0
+
+    def as_dict(self) -> dict[str, float]:
+        """Convert the statistics to a JSON-friendly dictionary."""
+        return {
+            "Count": self.count,
+            "Total (s)": self.total,
+            "Mean (s)": self.mean(),
+            "Max (s)": self.maximum,
+        }
+
+
+@dataclass
+class CallStatistics:
+    """
+    Timing for calls that wait for a resource before running.
+
+    Parameters
+    ----------
+    wait
+        How long calls waited before they started running.
+    run
+        How long calls ran.
+    """
+
+    wait: TimingStatistics = field(default_factory=TimingStatistics)
+    run: TimingStatistics = field(default_factory=TimingStatistics)
+
+    def as_dict(self) -> dict[str, dict[str, float]]:
+        """Convert the statistics to a JSON-friendly dictionary."""
+        return {"Wait": self.wait.as_dict(), "Run": self.run.as_dict()}
@@ -0,0 +1,115 @@
+"""Detects when a sequence step blocks the sequence's event loop."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+
+from . import profiling
+from .profiling import StepProfile
+from .timing import TimingStatistics
+
+CHECK_INTERVAL = 0.1
+"""The maximum number of seconds between checks of the event loop."""
+
+
+class StallWatchdog:
+    """
+    A background thread that regularly schedules a callback on the sequence's event loop and
+    measures how long the callback takes to run (the loop's scheduling lag). If the callback doesn't
+    run within **threshold** seconds, the loop is stalled (i.e. a step called a blocking function).
+    The watchdog then captures the loop thread's stack, logs it, and records the stall in the
+    profile of the step that was running.
+
+    Parameters
+    ----------
+    loop
+        The sequence's event loop. It must be running on the thread that calls `start()`.
+    threshold
+        How long (in seconds) the loop can be unresponsive before it counts as stalled.
+    sequence_profile
+        The whole sequence's profile. Every stall is also recorded here.
+    """
+
+    def __init__(
+        self, loop: asyncio.AbstractEventLoop, threshold: float, sequence_profile: StepProfile
+    ):
+        self.loop = loop
+        self.threshold = threshold
+        self.sequence_profile = sequence_profile
+        self.loop_thread_id = 0
+        self.lag = TimingStatistics()  # only written by the watchdog thread
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(
+            target=self.watch, name="fabrial-sequence-watchdog", daemon=True
+        )
+
+    def start(self):
+        """Start watching. Call this from the event loop's thread."""
+        self.loop_thread_id = threading.get_ident()
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stop watching and wait (at most `CHECK_INTERVAL` seconds) for the watchdog thread to exit.
+        """
+        self.stop_event.set()
+        if self.thread.is_alive():
+            # the loop can't run heartbeats while this waits, but the thread checks `stop_event`
+            # between short waits, so it exits without reporting a stall
+            self.thread.join(CHECK_INTERVAL)
+
+    def watch(self):  # private
+        """The watchdog thread's main loop."""
+        interval = min(self.threshold, CHECK_INTERVAL)
+        while not self.stop_event.is_set():
+            heartbeat = threading.Event()
+            scheduled_time = time.perf_counter()
+            try:
+                self.loop.call_soon_threadsafe(heartbeat.set)
+            except RuntimeError:  # the event loop is closed
+                return
+            stalled = False
+            while not heartbeat.wait(interval):
+                if self.stop_event.is_set():  # stopping blocks the loop, which isn't a stall
+                    return
+                if not stalled and time.perf_counter() - scheduled_time >= self.threshold:
+                    # the loop is stalled. Find out what it's doing while it's still stuck
+                    stalled = True
+                    if not self.handle_stall(scheduled_time):
+                        return
+            self.lag.add(time.perf_counter() - scheduled_time)
+            self.stop_event.wait(interval)
+
+    def handle_stall(self, start_time: float) -> bool:  # private
+        """
+        Log a stall that started at **start_time** and record it in the running step's profile.
+        Returns `False` if the event loop is closed.
+        """
+        frame = sys._current_frames().get(self.loop_thread_id)
+        stack = "".join(traceback.format_stack(frame)) if frame is not None else ""
+        profile: StepProfile | None = None
+        # the running task carries the profile of the step that created it
+        if (task := asyncio.current_task(self.loop)) is not None:
+            profile = task.get_context().get(profiling.CURRENT_PROFILE)
+        if profile is None:  # the stall happened outside of any step
+            profile = self.sequence_profile
+
+        logging.getLogger(__name__).warning(
+            f"The sequence has been blocked for more than {self.threshold:.3f} s while running "
+            f"{profile.name}. This usually means a step called a blocking function instead of "
+            f"awaiting. Stack during the stall:\n{stack}"
+        )
+        profiles = {profile, self.sequence_profile}
+        for stalled_profile in profiles:
+            stalled_profile.begin_stall(start_time, stack)
+        try:  # the stall ends as soon as the loop can run these
+            for stalled_profile in profiles:
+                self.loop.call_soon_threadsafe(stalled_profile.end_stall)
+        except RuntimeError:  # the event loop is closed
+            return False
+        return True
@@ -12,3 +12,6 @@ SEQUENCE_DIRECTORY_FILE = SEQUENCE_SETTINGS_FOLDER.joinpath("sequence_directory.
 NON_EMPTY_DIRECTORY_WARNING_FILE = SEQUENCE_SETTINGS_FOLDER.joinpath(
     "non_empty_directory_warning.json"
 )
+STALL_THRESHOLD_FILE = SEQUENCE_SETTINGS_FOLDER.joinpath("stall_threshold.json")
+PROMPT_POLICY_FILE = SEQUENCE_SETTINGS_FOLDER.joinpath("prompt_policy.json")
+PLOT_FRAME_RATE_FILE = SEQUENCE_SETTINGS_FOLDER.joinpath("plot_frame_rate.json")
@@ -1 +1,5 @@
 METADATA_FILENAME = "metadata.json"
+PERFORMANCE_FILENAME = "performance.json"
+AUTOSAVE_FILENAME = "autosave.json"
+JOURNAL_FILENAME = "progress.jsonl"
+BACKGROUND_DIRECTORY_NAME = "Background Tasks"
@@ -1,14 +1,19 @@
 import typing
+from collections.abc import Sequence
 from typing import Literal
 
 import pyqtgraph as pg
+from PyQt6.QtCore import QTimer
 from PyQt6.QtGui import QColor
 from PyQt6.QtWidgets import QApplication, QFileDialog, QHBoxLayout, QVBoxLayout
 from pyqtgraph.exporters import ImageExporter
 
 from ..classes import Shortcut
-from ..plotting import LineData, LineParams, SymbolParams
-from ..utility import errors, layout as layout_util
+from ..classes.plot_batcher import DEFAULT_FRAME_RATE
+from ..classes.sample_ring import SampleRing
+from ..plotting import LineData, LineParams, StreamLineData, SymbolParams
+from ..utility import errors
+from ..utility import layout as layout_util
 from .augmented import Button, Widget
 
 
@@ -22,6 +27,18 @@ def get_background_color() -> QColor:
     return QApplication.palette().window().color()
 
 
+def redraw_interval(frame_rate: float | None) -> int:
+    """
+    Get the number of milliseconds between redraws at **frame_rate** redraws per second. If
+    **frame_rate** is `None` (i.e. plotting is unbatched), redraw at the screen's refresh rate.
+    """
+    if frame_rate is None:
+        screen = QApplication.primaryScreen()
+        refresh_rate = screen.refreshRate() if screen is not None else 0
+        frame_rate = refresh_rate if refresh_rate > 0 else DEFAULT_FRAME_RATE
+    return max(round(1000 / frame_rate), 1)
+
+
 class PlotItem(pg.PlotItem):
     """Plot item that automatically uses the OS color theme. This is not the widget."""
 
@@ -32,7 +49,12 @@ class PlotItem(pg.PlotItem):
     def __init__(self) -> None:
         """Create a new PlotItem."""
         pg.PlotItem.__init__(self)
-        self.lines: list[LineData] = []
+        self.lines: list[LineData | StreamLineData] = []
+        self.streams: list[StreamLineData] = []
+        # redraws streamed lines once per frame
+        self.stream_timer = QTimer(self)
+        self.stream_timer.setInterval(redraw_interval(DEFAULT_FRAME_RATE))
+        self.stream_timer.timeout.connect(self.redraw_streams)
         self.init_plot()
 
     def init_plot(self):
@@ -101,6 +123,47 @@ class PlotItem(pg.PlotItem):
         -------
         A reference to the plotted data.
         """
+        line = self.create_line(x_data, y_data, legend_label, line_params, symbol_params)
+        line_data = LineData(line, x_data, y_data)
+        self.lines.append(line_data)
+        return line_data
+
+    def plot_stream(
+        self,
+        ring: SampleRing,
+        legend_label: str | None,
+        line_params: LineParams | None,
+        symbol_params: SymbolParams | None,
+        frame_rate: float | None = DEFAULT_FRAME_RATE,
+    ) -> StreamLineData:
+        """
+        Plot a new line that shows the newest samples in **ring**. The line reads the ring
+        **frame_rate** times per second (or at the screen's refresh rate if **frame_rate** is
+        `None`), as long as this item exists. See `plot()` for the other parameters.
+        """
+        line = self.create_line([], [], legend_label, line_params, symbol_params)
+        stream = StreamLineData(line, ring)
+        self.lines.append(stream)
+        self.streams.append(stream)
+        self.stream_timer.setInterval(redraw_interval(frame_rate))
+        if not self.stream_timer.isActive():
+            self.stream_timer.start()
+        return stream
+
+    def redraw_streams(self):
+        """Show the newest samples of every streamed line."""
+        for stream in self.streams:
+            stream.redraw()
+
+    def create_line(
+        self,
+        x_data: list[float],
+        y_data: list[float],
+        legend_label: str | None,
+        line_params: LineParams | None,
+        symbol_params: SymbolParams | None,
+    ) -> pg.PlotDataItem:  # private
+        """Create the graphics item for a line. See `plot()`."""
         if line_params is None:
             line_pen = None
         else:
@@ -119,21 +182,60 @@ class PlotItem(pg.PlotItem):
             )
         else:  # otherwise plot without symbols
             line = pg.PlotItem.plot(self, x_data, y_data, name=legend_label, pen=line_pen)
+        return line
 
-        line_data = LineData(line, x_data, y_data)
-        self.lines.append(line_data)
-        return line_data
+    def add_point(self, x: float, y: float, line_index: int, redraw: bool = True) -> LineData:
+        """
+        Add a point to the line at **line_index** and return the line. See `LineData.add_point()`.
+
+        Raises
+        ------
+        IndexError
+            **line_index** is out of range.
+        TypeError
+            The line is streamed.
+        """
+        line = self.get_line(line_index)
+        line.add_point(x, y, redraw)
+        return line
+
+    def add_points(
+        self,
+        x_values: Sequence[float],
+        y_values: Sequence[float],
+        line_index: int,
+        redraw: bool = True,
+    ) -> LineData:
+        """
+        Add several points to the line at **line_index** and return the line. See
+        `LineData.add_points()`.
+
+        Raises
+        ------
+        IndexError
+            **line_index** is out of range.
+        TypeError
+            The line is streamed.
+        """
+        line = self.get_line(line_index)
+        line.add_points(x_values, y_values, redraw)
+        return line
 
-    def add_point(self, x: float, y: float, line_index: int):
+    def get_line(self, line_index: int) -> LineData:  # private
         """
-        Add a point to the line at **line_index**.
+        Get the line at **line_index**.
 
         Raises
         ------
         IndexError
             **line_index** is out of range.
+        TypeError
+            The line is streamed, so it doesn't take points.
         """
-        self.lines[line_index].add_point(x, y)
+        line = self.lines[line_index]
+        if not isinstance(line, LineData):
+            raise TypeError(f"Line {line_index} is streamed and doesn't take points")
+        return line
 
     def export_to_image(self, file: str):
         """Export the item to an image. This uses the item's current dimensions."""
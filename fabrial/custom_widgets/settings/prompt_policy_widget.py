@@ -0,0 +1,101 @@
+from PyQt6.QtWidgets import (
+    QAbstractItemView,
+    QHBoxLayout,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+)
+
+from ...classes import PromptPolicy, PromptRule
+from ..augmented import FixedButton, Widget
+
+HEADERS = ("Title", "Message", "Answer", "Timeout (s)", "Limit")
+TITLE_COLUMN, MESSAGE_COLUMN, ANSWER_COLUMN, TIMEOUT_COLUMN, LIMIT_COLUMN = range(len(HEADERS))
+
+
+class PromptPolicyWidget(Widget):
+    """
+    Edits the rules of a `PromptPolicy` as a table. Each row is one rule, checked from top to
+    bottom. Empty patterns match anything, an empty timeout answers immediately, and an empty limit
+    means there is no limit.
+    """
+
+    def __init__(self):
+        layout = QVBoxLayout()
+        Widget.__init__(self, layout)
+        self.table = QTableWidget(0, len(HEADERS))
+        self.table.setHorizontalHeaderLabels(HEADERS)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        if (header := self.table.horizontalHeader()) is not None:
+            header.setStretchLastSection(True)
+        self.table.setToolTip(
+            "Patterns can use * and ?. The answer is the text of the option to choose."
+        )
+
+        button_layout = QHBoxLayout()
+        self.add_button = FixedButton("Add Rule", lambda: self.add_rule())
+        self.remove_button = FixedButton("Remove Rule", self.remove_selected_rules)
+        button_layout.addWidget(self.add_button)
+        button_layout.addWidget(self.remove_button)
+        button_layout.addStretch()
+
+        layout.addWidget(self.table)
+        layout.addLayout(button_layout)
+
+    def add_rule(self, rule: PromptRule | None = None):
+        """Add a row for **rule** (or an empty row) to the end of the table."""
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        if rule is None:
+            return
+        cells = {
+            TITLE_COLUMN: "" if rule.title == "*" else rule.title,
+            MESSAGE_COLUMN: "" if rule.message == "*" else rule.message,
+            ANSWER_COLUMN: str(rule.answer),
+            TIMEOUT_COLUMN: "" if rule.timeout is None else f"{rule.timeout:g}",
+            LIMIT_COLUMN: "" if rule.limit is None else str(rule.limit),
+        }
+        for column, text in cells.items():
+            self.table.setItem(row, column, QTableWidgetItem(text))
+
+    def remove_selected_rules(self):
+        """Remove the selected rows."""
+        for row in sorted({index.row() for index in self.table.selectedIndexes()}, reverse=True):
+            self.table.removeRow(row)
+
+    def set_policy(self, policy: PromptPolicy | None):
+        """Show the rules of **policy** (or an empty table if **policy** is `None`)."""
+        self.table.setRowCount(0)
+        if policy is not None:
+            for rule in policy.rules:
+                self.add_rule(rule)
+
+    def policy(self) -> PromptPolicy:
+        """
+        Create a policy from the table. Rows without an answer or with invalid numbers are skipped.
+        """
+        rules: list[PromptRule] = []
+        for row in range(self.table.rowCount()):
+            answer = self.cell_text(row, ANSWER_COLUMN)
+            if answer == "":
+                continue
+            try:
+                timeout = self.cell_text(row, TIMEOUT_COLUMN)
+                limit = self.cell_text(row, LIMIT_COLUMN)
+                rules.append(
+                    PromptRule(
+                        self.cell_text(row, TITLE_COLUMN) or "*",
+                        self.cell_text(row, MESSAGE_COLUMN) or "*",
+                        answer,
+                        float(timeout) if timeout != "" else None,
+                        int(limit) if limit != "" else None,
+                    )
+                )
+            except ValueError:
+                continue
+        return PromptPolicy(rules)
+
+    def cell_text(self, row: int, column: int) -> str:  # private
+        """Get the stripped text of a cell."""
+        item = self.table.item(row, column)
+        return item.text().strip() if item is not None else ""
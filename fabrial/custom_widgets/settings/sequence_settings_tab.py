@@ -3,11 +3,12 @@ from __future__ import annotations
 import json
 import typing
 
-from PyQt6.QtCore import Qt
-from PyQt6.QtWidgets import QCheckBox, QVBoxLayout
+from PyQt6.QtWidgets import QCheckBox, QFormLayout, QLabel, QVBoxLayout
 
 from ...constants.paths import settings
-from ..augmented import Widget
+from ...utility import sequence_settings
+from ..augmented import SpinBox, Widget
+from .prompt_policy_widget import PromptPolicyWidget
 
 
 class SequenceSettingsTab(Widget):
@@ -20,10 +21,39 @@ class SequenceSettingsTab(Widget):
             "Show a warning when starting the sequence with a non-empty data directory."
         )
 
-        layout.addWidget(
-            self.non_empty_directory_warning_checkbox, alignment=Qt.AlignmentFlag.AlignTop
+        # a step that blocks the sequence for longer than this is recorded in its metadata
+        self.stall_threshold_spinbox = SpinBox(0, 60_000)
+        self.stall_threshold_spinbox.setSuffix(" ms")
+        self.stall_threshold_spinbox.setSpecialValueText("Disabled")
+        self.stall_threshold_spinbox.setToolTip(
+            "Record steps that block the sequence for longer than this (for finding slow plugins)."
         )
 
+        # plot commands are sent to the display in batches, at most this many per second
+        self.plot_frame_rate_spinbox = SpinBox(0, 240)
+        self.plot_frame_rate_spinbox.setSuffix(" Hz")
+        self.plot_frame_rate_spinbox.setSpecialValueText("Unbatched")
+        self.plot_frame_rate_spinbox.setToolTip(
+            "How often plots are updated while a sequence runs. Lower rates keep the application "
+            "responsive when steps plot many points."
+        )
+
+        # answers prompts so unattended sequences don't wait for the user
+        self.prompt_policy_widget = PromptPolicyWidget()
+
+        layout.addWidget(self.non_empty_directory_warning_checkbox)
+        form_layout = QFormLayout()
+        form_layout.addRow("Stall detection threshold", self.stall_threshold_spinbox)
+        form_layout.addRow("Plot update rate", self.plot_frame_rate_spinbox)
+        layout.addLayout(form_layout)
+        prompt_policy_label = QLabel(
+            "Prompt policy (rules that answer prompts automatically, checked from top to bottom). "
+            "Automatic answers are recorded in the step's metadata."
+        )
+        prompt_policy_label.setWordWrap(True)
+        layout.addWidget(prompt_policy_label)
+        layout.addWidget(self.prompt_policy_widget)
+
     def window_open_event(self):
         """Call this when the settings window is opened to refresh settings."""
         try:
@@ -33,6 +63,14 @@ class SequenceSettingsTab(Widget):
             checked = True
         self.non_empty_directory_warning_checkbox.setChecked(checked)
 
+        threshold = sequence_settings.load_stall_threshold()
+        self.stall_threshold_spinbox.setValue(
+            round(threshold * 1000) if threshold is not None else 0
+        )
+        frame_rate = sequence_settings.load_plot_frame_rate()
+        self.plot_frame_rate_spinbox.setValue(round(frame_rate) if frame_rate is not None else 0)
+        self.prompt_policy_widget.set_policy(sequence_settings.load_prompt_policy())
+
     def save_on_close(self):
         """Call this when closing the settings window to save settings."""
         try:
@@ -40,3 +78,8 @@ class SequenceSettingsTab(Widget):
                 json.dump(self.non_empty_directory_warning_checkbox.isChecked(), f)
         except Exception:
             pass
+        threshold_ms = self.stall_threshold_spinbox.value()
+        sequence_settings.save_stall_threshold(threshold_ms / 1000 if threshold_ms > 0 else None)
+        frame_rate = self.plot_frame_rate_spinbox.value()
+        sequence_settings.save_plot_frame_rate(frame_rate if frame_rate > 0 else None)
+        sequence_settings.save_prompt_policy(self.prompt_policy_widget.policy())
@@ -1 +1,7 @@
-from .sequence import SequenceCommand, SequenceStatus
+from .sequence import (
+    MissedTickPolicy,
+    PlotOverflowPolicy,
+    SequenceCommand,
+    SequenceStatus,
+    SweepSpacing,
+)
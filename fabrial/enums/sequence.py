@@ -18,3 +18,42 @@ class SequenceCommand(Enum):
     Unpause = auto()
     Cancel = auto()
     RaiseFatal = auto()
+
+
+class MissedTickPolicy(Enum):
+    """What a periodic timer (see `SequenceStep.every()`) does with ticks that are late."""
+
+    Skip = auto()
+    """Drop ticks that are a full interval late and stay on the original schedule."""
+    CatchUp = auto()
+    """Deliver every tick, back to back, until the timer is back on schedule."""
+
+
+class SweepSpacing(Enum):
+    """How the values of a swept parameter are spaced (see `ParameterRange`)."""
+
+    Linear = auto()
+    """Evenly spaced values from a start value to a stop value."""
+    Log = auto()
+    """Logarithmically spaced values from a start value to a stop value (both positive)."""
+    List = auto()
+    """An explicit list of values."""
+
+
+class PlotOverflowPolicy(Enum):
+    """
+    What happens to new points of a plot line when the display has fallen behind and the line's
+    pending points reached their limit (see `PlotHandle.add_line()`). This only affects the plot;
+    data the step records itself is never dropped.
+    """
+
+    Block = auto()
+    """
+    Keep every point and make the step wait at its next `sleep()` until the display catches up.
+    """
+    DropOldest = auto()
+    """Keep the newest points and drop the oldest pending ones."""
+    KeepEveryNth = auto()
+    """Thin out the pending points evenly, keeping every Nth point (N grows as needed)."""
+    KeepMinMax = auto()
+    """Thin out the pending points, keeping the lowest and highest point of every group."""
@@ -0,0 +1,9 @@
+"""Flow control items that ship with Fabrial. These are loaded like a plugin that is always on."""
+
+from ..utility.sequence_builder import PluginCategory
+from .items import LoopItem, ParallelItem, SweepItem
+
+
+def categories() -> list[PluginCategory]:
+    """Get the built-in item categories."""
+    return [PluginCategory("Flow Control", [LoopItem(), ParallelItem(), SweepItem()])]
@@ -0,0 +1,3 @@
+from .loop import LoopItem
+from .parallel import ParallelItem
+from .sweep import SweepItem
@@ -0,0 +1 @@
+from .loop_item import LoopItem
@@ -0,0 +1,43 @@
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from ....classes import SequenceStep, StepRunner
+from .loop_widget import NAME
+
+
+class LoopStep(SequenceStep):
+    """Repeat the nested items a specified number of times; step."""
+
+    def __init__(self, number_of_loops: int, steps: Iterable[SequenceStep]):
+        self.number_of_loops = number_of_loops
+        self.steps = list(steps)
+        self.completed_loops = 0
+
+    async def run(self, runner: StepRunner, data_directory: Path):  # implementation
+        # the same step objects run every loop, so memory use doesn't grow with the number of loops
+        for loop_number in range(1, self.number_of_loops + 1):
+            if loop_number > 1:
+                self.reset_substeps()
+            # the loop's directory is created along with its first step's directory
+            await runner.run_steps(self.steps, data_directory.joinpath(str(loop_number)))
+            self.completed_loops = loop_number
+            await self.sleep(0)  # give the sequence time to do other things
+
+    def reset(self):  # implementation
+        self.reset_substeps()
+        self.completed_loops = 0
+
+    def name(self) -> str:  # implementation
+        return NAME
+
+    def metadata(self) -> dict[str, Any]:  # overridden
+        return {
+            "Selected Number of Loops": self.number_of_loops,
+            "Completed Loops": self.completed_loops,
+        }
+
+    def reset_substeps(self):  # private
+        """Reset the nested steps so they can run again."""
+        for step in self.steps:
+            step.reset()
@@ -0,0 +1,44 @@
+from PyQt6.QtWidgets import QFormLayout
+
+from ....custom_widgets import SpinBox, Widget
+from ....sequence_builder import ItemWidget
+from ....utility import images
+from ....utility.descriptions import TextDescription
+
+NAME = "Loop"
+ICON_FILENAME = "arrow-repeat.png"
+LOOP_COUNT_LABEL = "Number of Loops"
+
+
+class LoopWidget(ItemWidget):
+    """Repeat the nested items a specified number of times; widget."""
+
+    def __init__(self, number_of_loops: int):
+        layout = QFormLayout()
+        parameter_widget = Widget(layout)
+
+        ItemWidget.__init__(
+            self,
+            parameter_widget,
+            NAME,
+            images.make_icon(ICON_FILENAME),
+            TextDescription(
+                NAME,
+                "Repeat the nested items a specified number of times. The nested steps are reset "
+                "and reused for every loop, so even long loops use a constant amount of memory.",
+                {LOOP_COUNT_LABEL: "The number of times to repeat the nested items."},
+                {
+                    "[X]": "Where **[X]** is a numbered directory for each loop that contains the "
+                    "data directories of the nested steps."
+                },
+            ),
+        )
+
+        self.loop_count_spinbox = SpinBox(1, initial_value=number_of_loops)
+        layout.addRow(LOOP_COUNT_LABEL, self.loop_count_spinbox)
+        self.loop_count_spinbox.editingFinished.connect(self.handle_value_change)
+        self.handle_value_change()
+
+    def handle_value_change(self):
+        """Show the loop count in the window title."""
+        self.setWindowTitle(f"{NAME} ({self.loop_count_spinbox.text()})")
@@ -0,0 +1 @@
+from .parallel_item import ParallelItem
@@ -0,0 +1,32 @@
+from collections.abc import Iterable, Mapping
+from typing import Self
+
+from ....classes import SequenceStep
+from ....sequence_builder import WidgetDataItem
+from ....utility.serde import Json
+from .parallel_step import ParallelStep
+from .parallel_widget import ParallelWidget
+
+
+class ParallelItem(WidgetDataItem):
+    """Run the nested items concurrently; item."""
+
+    def __init__(self):
+        self.parallel_widget = ParallelWidget()
+
+    @classmethod
+    def deserialize(cls, serialized_obj: Mapping[str, Json]) -> Self:  # implementation
+        return cls()
+
+    def serialize(self) -> dict[str, Json]:  # implementation
+        return {}
+
+    def widget(self) -> ParallelWidget:  # implementation
+        return self.parallel_widget
+
+    # implementation
+    def create_sequence_step(self, substeps: Iterable[SequenceStep]) -> SequenceStep:
+        return ParallelStep(substeps)
+
+    def supports_subitems(self) -> bool:  # overridden
+        return True
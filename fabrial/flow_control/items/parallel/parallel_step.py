@@ -0,0 +1,26 @@
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from ....classes import SequenceStep, StepRunner
+from .parallel_widget import NAME
+
+
+class ParallelStep(SequenceStep):
+    """Run the nested items concurrently; step."""
+
+    def __init__(self, steps: Iterable[SequenceStep]):
+        self.steps = list(steps)
+
+    async def run(self, runner: StepRunner, data_directory: Path):  # implementation
+        await runner.run_steps_concurrently(self.steps, data_directory)
+
+    def reset(self):  # implementation
+        for step in self.steps:
+            step.reset()
+
+    def name(self) -> str:  # implementation
+        return NAME
+
+    def metadata(self) -> dict[str, Any]:  # overridden
+        return {"Number of Branches": len(self.steps)}
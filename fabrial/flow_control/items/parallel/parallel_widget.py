@@ -0,0 +1,29 @@
+from ....sequence_builder import ItemWidget
+from ....utility import images
+from ....utility.descriptions import TextDescription
+
+NAME = "Parallel"
+ICON_FILENAME = "arrow-in.png"
+
+
+class ParallelWidget(ItemWidget):
+    """Run the nested items concurrently; widget."""
+
+    def __init__(self):
+        ItemWidget.__init__(
+            self,
+            None,
+            NAME,
+            images.make_icon(ICON_FILENAME),
+            TextDescription(
+                NAME,
+                "Run the nested items at the same time. Each nested item is a separate branch, so "
+                "independent instruments can be used simultaneously. If one branch cancels the "
+                "sequence or encounters a fatal error, the other branches are stopped.",
+                {},
+                {
+                    "Substep Directories": "All data directories for the nested steps. The data "
+                    "directories are number-prefixed in the same order as the nested items."
+                },
+            ),
+        )
@@ -0,0 +1 @@
+from .sweep_item import SweepItem
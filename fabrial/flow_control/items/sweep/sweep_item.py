@@ -0,0 +1,47 @@
+import typing
+from collections.abc import Iterable, Mapping, Sequence
+from typing import Self
+
+from ....classes import SequenceStep
+from ....classes.sweep import ParameterRange
+from ....sequence_builder import WidgetDataItem
+from ....utility.serde import Json
+from .sweep_step import SweepStep
+from .sweep_widget import SweepWidget
+
+PARAMETERS = "parameters"
+
+
+class SweepItem(WidgetDataItem):
+    """Repeat the nested items for every point of a parameter sweep; item."""
+
+    def __init__(self, ranges: Sequence[ParameterRange] = ()):
+        self.sweep_widget = SweepWidget(ranges)
+
+    @classmethod
+    def deserialize(cls, serialized_obj: Mapping[str, Json]) -> Self:  # implementation
+        return cls(
+            [
+                ParameterRange.from_dict(range_as_dict)
+                for range_as_dict in typing.cast(
+                    Sequence[Mapping[str, Json]], serialized_obj[PARAMETERS]
+                )
+            ]
+        )
+
+    def serialize(self) -> dict[str, Json]:  # implementation
+        return {
+            PARAMETERS: [
+                parameter_range.to_dict() for parameter_range in self.sweep_widget.ranges()
+            ]
+        }
+
+    def widget(self) -> SweepWidget:  # implementation
+        return self.sweep_widget
+
+    # implementation
+    def create_sequence_step(self, substeps: Iterable[SequenceStep]) -> SequenceStep:
+        return SweepStep(self.sweep_widget.ranges(), substeps)
+
+    def supports_subitems(self) -> bool:  # overridden
+        return True
@@ -0,0 +1,52 @@
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any
+
+from ....classes import SequenceStep, StepRunner, sweep
+from ....classes.sweep import ParameterRange
+from .sweep_widget import NAME
+
+
+class SweepStep(SequenceStep):
+    """Repeat the nested items for every point of a parameter sweep; step."""
+
+    def __init__(self, ranges: Sequence[ParameterRange], steps: Iterable[SequenceStep]):
+        self.ranges = tuple(ranges)
+        self.steps = list(steps)
+        self.completed_points = 0
+
+    async def run(self, runner: StepRunner, data_directory: Path):  # implementation
+        # points are generated one at a time and the same step objects run for every point
+        for point_number, point in enumerate(sweep.sweep_points(self.ranges), start=1):
+            if point_number > 1:
+                self.reset_substeps()
+            # nested sweeps add their parameters to the outer sweep's
+            parameters_token = sweep.SWEEP_PARAMETERS.set(
+                MappingProxyType({**sweep.current_parameters(), **point})
+            )
+            try:
+                await runner.run_steps(self.steps, data_directory.joinpath(str(point_number)))
+            finally:
+                sweep.SWEEP_PARAMETERS.reset(parameters_token)
+            self.completed_points = point_number
+            await self.sleep(0)  # give the sequence time to do other things
+
+    def reset(self):  # implementation
+        self.reset_substeps()
+        self.completed_points = 0
+
+    def name(self) -> str:  # implementation
+        return NAME
+
+    def metadata(self) -> dict[str, Any]:  # overridden
+        return {
+            "Swept Parameters": [parameter_range.to_dict() for parameter_range in self.ranges],
+            "Number of Points": sweep.point_count(self.ranges),
+            "Completed Points": self.completed_points,
+        }
+
+    def reset_substeps(self):  # private
+        """Reset the nested steps so they can run again."""
+        for step in self.steps:
+            step.reset()
@@ -0,0 +1,149 @@
+from collections.abc import Sequence
+
+from PyQt6.QtWidgets import (
+    QAbstractItemView,
+    QComboBox,
+    QHBoxLayout,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+)
+
+from ....classes.sweep import ParameterRange, point_count
+from ....custom_widgets import FixedButton, Widget
+from ....enums import SweepSpacing
+from ....sequence_builder import ItemWidget
+from ....utility import images
+from ....utility.descriptions import TextDescription
+
+NAME = "Sweep"
+ICON_FILENAME = "chart-up.png"
+HEADERS = ("Name", "Spacing", "Start", "Stop", "Points", "Values")
+NAME_COLUMN, SPACING_COLUMN, START_COLUMN, STOP_COLUMN, POINTS_COLUMN, VALUES_COLUMN = range(
+    len(HEADERS)
+)
+
+
+class SweepWidget(ItemWidget):
+    """Repeat the nested items for every point of a parameter sweep; widget."""
+
+    def __init__(self, ranges: Sequence[ParameterRange]):
+        layout = QVBoxLayout()
+        parameter_widget = Widget(layout)
+
+        ItemWidget.__init__(
+            self,
+            parameter_widget,
+            NAME,
+            images.make_icon(ICON_FILENAME),
+            TextDescription(
+                NAME,
+                "Repeat the nested items for every combination of the swept parameters' values. "
+                "Only the ranges are stored, so a sweep over thousands of points is as small as "
+                "a sweep over two. The nested steps are reset and reused for every point and can "
+                "read the point's values with `sweep_parameters()`.",
+                {
+                    "Name": "The parameter's name.",
+                    "Spacing": "**Linear** or **Log** spacing from **Start** to **Stop** with "
+                    "**Points** values, or a **List** of comma-separated **Values**.",
+                },
+                {
+                    "[X]": "Where **[X]** is a numbered directory for each point that contains the "
+                    "data directories of the nested steps. The nested steps' metadata lists the "
+                    "point's parameter values under `Sweep Parameters`."
+                },
+            ),
+        )
+
+        self.table = QTableWidget(0, len(HEADERS))
+        self.table.setHorizontalHeaderLabels(HEADERS)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        if (header := self.table.horizontalHeader()) is not None:
+            header.setStretchLastSection(True)
+        self.table.setToolTip("The first parameter changes slowest.")
+        self.table.cellChanged.connect(self.handle_value_change)
+
+        button_layout = QHBoxLayout()
+        self.add_button = FixedButton("Add Parameter", lambda: self.add_range())
+        self.remove_button = FixedButton("Remove Parameter", self.remove_selected_ranges)
+        button_layout.addWidget(self.add_button)
+        button_layout.addWidget(self.remove_button)
+        button_layout.addStretch()
+
+        layout.addWidget(self.table)
+        layout.addLayout(button_layout)
+
+        for parameter_range in ranges:
+            self.add_range(parameter_range)
+        self.handle_value_change()
+
+    def add_range(self, parameter_range: ParameterRange | None = None):
+        """Add a row for **parameter_range** (or an empty row) to the end of the table."""
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        spacing_combo_box = QComboBox()
+        spacing_combo_box.addItems([spacing.name for spacing in SweepSpacing])
+        spacing_combo_box.currentTextChanged.connect(self.handle_value_change)
+        self.table.setCellWidget(row, SPACING_COLUMN, spacing_combo_box)
+        if parameter_range is None:
+            return
+        spacing_combo_box.setCurrentText(parameter_range.spacing.name)
+        cells = {NAME_COLUMN: parameter_range.name}
+        if parameter_range.spacing is SweepSpacing.List:
+            cells[VALUES_COLUMN] = ", ".join(f"{value:g}" for value in parameter_range.values)
+        else:
+            cells[START_COLUMN] = f"{parameter_range.start:g}"
+            cells[STOP_COLUMN] = f"{parameter_range.stop:g}"
+            cells[POINTS_COLUMN] = str(parameter_range.points)
+        for column, text in cells.items():
+            self.table.setItem(row, column, QTableWidgetItem(text))
+
+    def remove_selected_ranges(self):
+        """Remove the selected rows."""
+        for row in sorted({index.row() for index in self.table.selectedIndexes()}, reverse=True):
+            self.table.removeRow(row)
+        self.handle_value_change()
+
+    def ranges(self) -> list[ParameterRange]:
+        """
+        Create the parameter ranges from the table. Incomplete or invalid rows (including rows that
+        repeat an earlier row's name) are skipped.
+        """
+        ranges: list[ParameterRange] = []
+        for row in range(self.table.rowCount()):
+            name = self.cell_text(row, NAME_COLUMN)
+            if name == "" or any(parameter_range.name == name for parameter_range in ranges):
+                continue
+            spacing_combo_box = self.table.cellWidget(row, SPACING_COLUMN)
+            assert isinstance(spacing_combo_box, QComboBox)
+            spacing = SweepSpacing[spacing_combo_box.currentText()]
+            try:
+                if spacing is SweepSpacing.List:
+                    values = self.cell_text(row, VALUES_COLUMN).replace(",", " ").split()
+                    ranges.append(
+                        ParameterRange(
+                            name, spacing, values=tuple(float(value) for value in values)
+                        )
+                    )
+                else:
+                    ranges.append(
+                        ParameterRange(
+                            name,
+                            spacing,
+                            float(self.cell_text(row, START_COLUMN)),
+                            float(self.cell_text(row, STOP_COLUMN)),
+                            int(self.cell_text(row, POINTS_COLUMN)),
+                        )
+                    )
+            except ValueError:
+                continue
+        return ranges
+
+    def handle_value_change(self):
+        """Show the number of points in the window title."""
+        self.setWindowTitle(f"{NAME} ({point_count(self.ranges())} points)")
+
+    def cell_text(self, row: int, column: int) -> str:  # private
+        """Get the stripped text of a cell."""
+        item = self.table.item(row, column)
+        return item.text().strip() if item is not None else ""
@@ -0,0 +1,7 @@
+"""Run sequences from the command line without the graphical interface (`fabrial run`)."""
+
+from ..classes.prompt_policy import PromptPolicy, PromptRule
+from .cli import main
+from .plots import HeadlessDisplay
+from .prompts import StdinPrompter
+from .runner import HeadlessSequence
@@ -0,0 +1,186 @@
+import argparse
+import logging
+import os
+import sys
+import time
+from collections.abc import Sequence
+from pathlib import Path
+
+from PyQt6.QtWidgets import QApplication
+
+from ..classes import PluginError, SequenceRunner, journal
+from ..classes.prompt_policy import PromptPolicy
+from ..constants.sequence import AUTOSAVE_FILENAME
+from ..enums import SequenceStatus
+from ..sequence_builder import SequenceModel
+from ..utility import errors, sequence_settings
+from ..utility import plugins as plugin_util
+from .plots import HeadlessDisplay
+from .runner import HeadlessSequence
+
+SETUP_ERROR_EXIT_CODE = 2
+EXIT_CODES = {
+    SequenceStatus.Completed: 0,
+    SequenceStatus.FatalError: 1,
+    SequenceStatus.Cancelled: 3,
+}
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """Create the argument parser for `fabrial run`."""
+    parser = argparse.ArgumentParser(
+        prog="fabrial run",
+        description="Run a saved sequence without the graphical interface.",
+        epilog="Exit codes: 0 completed, 1 fatal error, 2 invalid setup, 3 cancelled.",
+    )
+    parser.add_argument(
+        "sequence_file",
+        type=Path,
+        nargs="?",
+        help="A sequence saved from the sequence builder (JSON). "
+        "Defaults to the data directory's autosave when resuming.",
+    )
+    parser.add_argument(
+        "--data-dir", type=Path, required=True, help="Where the sequence records its data."
+    )
+    parser.add_argument(
+        "--prompt-policy",
+        type=Path,
+        help="A JSON file that answers prompts (defaults to the application's setting). "
+        "Unanswered prompts are read from standard input.",
+    )
+    parser.add_argument(
+        "--plot-dir",
+        type=Path,
+        help="Write the data of each plot to a CSV file in this directory. "
+        "By default plot data is discarded.",
+    )
+    parser.add_argument(
+        "--stall-threshold",
+        type=float,
+        metavar="MILLISECONDS",
+        help="Record steps that block the sequence for longer than this "
+        "(defaults to the application's setting).",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Resume an interrupted sequence in the data directory, skipping completed steps.",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Allow recording to a data directory that is not empty.",
+    )
+    return parser
+
+
+def main(arguments: Sequence[str]) -> int:
+    """
+    Run a sequence from the command line without any windows. This is `fabrial run`.
+
+    Parameters
+    ----------
+    arguments
+        The command line arguments after `run`.
+
+    Returns
+    -------
+    The process exit code.
+    """
+    options = create_parser().parse_args(arguments)
+    errors.set_up_logging(None)  # log to the terminal
+    # items from plugins create (hidden) widgets, so Qt still needs an application. The offscreen
+    # platform means no display is needed
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication(sys.argv[:1])  # noqa
+
+    sequence = create_sequence(options)
+    if sequence is None:
+        return SETUP_ERROR_EXIT_CODE
+
+    start_time = time.perf_counter()
+    status = sequence.run()
+    elapsed_time = time.perf_counter() - start_time
+    rate = sequence.completed_steps / elapsed_time if elapsed_time > 0 else 0
+    print(
+        f"{status.name}: {sequence.completed_steps} steps in {elapsed_time:.3f} s "
+        f"({rate:.1f} steps/s)"
+    )
+    return EXIT_CODES[status]
+
+
+def create_sequence(options: argparse.Namespace) -> HeadlessSequence | None:
+    """Load plugins, the sequence, and the prompt policy, then create the data directories."""
+    logger = logging.getLogger(__name__)
+    # importing the plugins registers their items so the sequence can be deserialized
+    failed_plugins = plugin_util.load_plugin_modules()[1]
+    if len(failed_plugins) > 0:
+        logger.warning(f"Failed to load plugins: {', '.join(failed_plugins)}")
+
+    data_directory: Path = options.data_dir
+    sequence_file: Path | None = options.sequence_file
+    if options.resume:
+        if not journal.can_resume(data_directory):
+            logger.error(f"Data directory {data_directory} has no sequence to resume")
+            return None
+        if sequence_file is None:
+            sequence_file = data_directory.joinpath(AUTOSAVE_FILENAME)
+    elif sequence_file is None:
+        logger.error("A sequence file is required unless resuming")
+        return None
+
+    model = SequenceModel([])
+    if not model.init_from_json(sequence_file):
+        logger.error(f"Failed to load the sequence from {sequence_file}")
+        return None
+    if not model.root().subitem_count() > 0:
+        logger.error("The sequence is empty")
+        return None
+    try:
+        sequence_steps, step_item_map = SequenceRunner().create_sequence_steps(model)
+    except PluginError:
+        logger.exception("Item from plugin generated error during sequence construction")
+        return None
+    step_names = {
+        step_address: item.display_name()
+        for step_address, index in step_item_map.items()
+        if (item := model.get_item(index)) is not None
+    }
+
+    policy = sequence_settings.load_prompt_policy()
+    if options.prompt_policy is not None:
+        try:
+            policy = PromptPolicy.from_json(options.prompt_policy)
+        except Exception:
+            logger.exception(f"Failed to load the prompt policy from {options.prompt_policy}")
+            return None
+
+    try:
+        os.makedirs(data_directory, exist_ok=True)
+        if not options.resume and not options.force and any(data_directory.iterdir()):
+            logger.error(f"Data directory {data_directory} is not empty (use --force to proceed)")
+            return None
+        if options.plot_dir is not None:
+            os.makedirs(options.plot_dir, exist_ok=True)
+    except OSError:
+        logger.exception("Failed to create the data directories")
+        return None
+    if not options.resume and not model.to_json(data_directory.joinpath(AUTOSAVE_FILENAME)):
+        logger.warning("Failed to generate sequence autosave")
+
+    if options.stall_threshold is None:
+        stall_threshold = sequence_settings.load_stall_threshold()
+    else:
+        stall_threshold = options.stall_threshold / 1000 if options.stall_threshold > 0 else None
+
+    return HeadlessSequence(
+        sequence_steps,
+        data_directory,
+        step_names,
+        policy,
+        HeadlessDisplay(options.plot_dir),
+        stall_threshold,
+        sequence_settings.load_plot_frame_rate(),
+        resume=options.resume,
+    )
@@ -0,0 +1,162 @@
+import csv
+import logging
+import re
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from os import PathLike
+from pathlib import Path
+
+from ..classes import Reply
+from ..classes.sample_ring import SampleRing
+from ..plotting import LineIndex, LineParams, PlotIndex, PlotSettings, SymbolParams
+
+# characters that can't be used in file names on at least one platform
+INVALID_FILENAME_CHARACTERS = re.compile(r'[<>:"/\\|?*\x00-\x1f]')
+
+
+@dataclass
+class RecordedLine:
+    """The data of a line on a `RecordedPlot`."""
+
+    label: str | None
+    x_data: list[float] = field(default_factory=list)
+    y_data: list[float] = field(default_factory=list)
+    stream: SampleRing | None = None  # for streamed lines, which don't use `x_data` and `y_data`
+
+
+@dataclass
+class RecordedPlot:
+    """A plot recorded by `HeadlessDisplay`."""
+
+    step_name: str
+    tab_text: str
+    plot_settings: PlotSettings
+    lines: list[RecordedLine] = field(default_factory=list)
+
+
+class HeadlessDisplay:
+    """
+    Runs plot commands without any widgets. This stands in for the `SequenceDisplayTab` and
+    provides the same plot methods.
+
+    Parameters
+    ----------
+    plot_directory
+        Where a plot's data is written (as CSV) when the plot is removed. If this is `None`, plot
+        data is discarded.
+    """
+
+    def __init__(self, plot_directory: Path | None):
+        self.plot_directory = plot_directory
+        # plot numbers are unique, so they are used as keys
+        self.plots: dict[int, RecordedPlot] = {}
+        self.plot_count = 0  # used to number plot files
+
+    def add_plot(
+        self,
+        step_address: int,
+        step_name: str,
+        tab_text: str,
+        plot_settings: PlotSettings,
+        receiver: Reply[PlotIndex],
+    ):
+        """Create a new plot. Sends a `PlotIndex` to the **receiver**."""
+        self.plot_count += 1
+        plot_index = PlotIndex(step_address, self.plot_count)
+        self.plots[plot_index.plot_number] = RecordedPlot(step_name, tab_text, plot_settings)
+        receiver.set(plot_index)
+
+    def remove_plot(self, plot_index: PlotIndex):
+        """Remove the plot at **plot_index**, writing its data if plots are being recorded."""
+        plot = self.plots.pop(plot_index.plot_number)
+        if self.plot_directory is not None:
+            filename = INVALID_FILENAME_CHARACTERS.sub(
+                "_", f"{plot_index.plot_number} {plot.step_name} - {plot.tab_text}.csv"
+            )
+            self.write_plot(plot, self.plot_directory.joinpath(filename))
+
+    def add_line(
+        self,
+        plot_index: PlotIndex,
+        legend_label: str | None,
+        line_params: LineParams | None,
+        symbol_params: SymbolParams | None,
+        receiver: Reply[LineIndex],
+    ):
+        """Add a new line to the plot at **plot_index**. Sends a `LineIndex` to the **receiver**."""
+        lines = self.plots[plot_index.plot_number].lines
+        line_number = len(lines)
+        lines.append(RecordedLine(legend_label))
+        receiver.set(LineIndex(plot_index, line_number))
+
+    def add_stream(
+        self,
+        plot_index: PlotIndex,
+        legend_label: str | None,
+        line_params: LineParams | None,
+        symbol_params: SymbolParams | None,
+        ring: SampleRing,
+        frame_rate: float | None,
+        receiver: Reply[LineIndex],
+    ):
+        """
+        Add a new line that shows the newest samples in **ring** to the plot at **plot_index**. The
+        samples in the ring's window are written with the plot's data (so **frame_rate** is not
+        used). Sends a `LineIndex` to the **receiver**.
+        """
+        lines = self.plots[plot_index.plot_number].lines
+        line_number = len(lines)
+        lines.append(RecordedLine(legend_label, stream=ring))
+        receiver.set(LineIndex(plot_index, line_number))
+
+    def add_point(self, line_index: LineIndex, x: float, y: float):
+        """Add a point to the line at **line_index**."""
+        line = self.plots[line_index.plot_index.plot_number].lines[line_index.line_number]
+        if self.plot_directory is not None:  # don't keep data that will be discarded
+            line.x_data.append(x)
+            line.y_data.append(y)
+
+    def add_points(
+        self, line_index: LineIndex, x_values: Sequence[float], y_values: Sequence[float]
+    ):
+        """Add several points to the line at **line_index**."""
+        line = self.plots[line_index.plot_index.plot_number].lines[line_index.line_number]
+        if self.plot_directory is not None:
+            line.x_data.extend(x_values)
+            line.y_data.extend(y_values)
+
+    def set_log_scale(self, plot_index: PlotIndex, x_log: bool | None, y_log: bool | None):
+        """Log scales only affect how plots look, so this just checks that the plot exists."""
+        self.plots[plot_index.plot_number]
+
+    def save_plot(self, plot_index: PlotIndex, file: PathLike[str] | str):
+        """
+        Save the data of the plot at **plot_index** next to **file** (as CSV, since there is no
+        image to save). Does nothing if plots are not being recorded.
+        """
+        if self.plot_directory is not None:
+            self.write_plot(self.plots[plot_index.plot_number], Path(file).with_suffix(".csv"))
+
+    def write_plot(self, plot: RecordedPlot, file: Path):
+        """Write **plot**'s data to a CSV **file**. Logs errors."""
+        try:
+            with open(file, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(
+                    [
+                        "Line",
+                        plot.plot_settings.x_label or "X",
+                        plot.plot_settings.y_label or "Y",
+                    ]
+                )
+                for line_number, line in enumerate(plot.lines):
+                    label = line.label if line.label is not None else str(line_number)
+                    if line.stream is not None:
+                        x_data, y_data = line.stream.latest()
+                        writer.writerows(
+                            (label, x, y) for x, y in zip(x_data.tolist(), y_data.tolist())
+                        )
+                    else:
+                        writer.writerows((label, x, y) for x, y in zip(line.x_data, line.y_data))
+        except OSError:
+            logging.getLogger(__name__).exception(f"Failed to write plot data to {file}")
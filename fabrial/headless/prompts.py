@@ -0,0 +1,70 @@
+import asyncio
+import sys
+import threading
+from collections.abc import Mapping
+from typing import TextIO
+
+from ..classes import FatalSequenceError, Reply
+from ..classes.prompt_policy import find_option
+
+
+class StdinPrompter:
+    """
+    Asks the user to answer prompts on the terminal. Only one prompt is shown at a time.
+
+    Parameters
+    ----------
+    input_stream
+        Where answers are read from.
+    output_stream
+        Where prompts are written to.
+    """
+
+    def __init__(self, input_stream: TextIO = sys.stdin, output_stream: TextIO = sys.stderr):
+        self.input_stream = input_stream
+        self.output_stream = output_stream
+        self.lock = asyncio.Lock()
+        self.pending_line: asyncio.Future[str] | None = None  # a read that hasn't finished
+
+    async def ask(self, title: str, message: str, options: Mapping[int, str]) -> int:
+        """
+        Show the prompt and wait for a valid answer. If this is cancelled, the prompt is abandoned.
+
+        Raises
+        ------
+        FatalSequenceError
+            The input stream was closed before a valid answer was given.
+        """
+        async with self.lock:
+            self.output_stream.write(f"\n[{title}]\n{message}\n")
+            for value, text in options.items():
+                self.output_stream.write(f"  {value}) {text}\n")
+            while True:
+                self.output_stream.write("Choice: ")
+                self.output_stream.flush()
+                try:
+                    line = await self.read_line()
+                except asyncio.CancelledError:
+                    self.output_stream.write("(no longer waiting for an answer)\n")
+                    raise
+                if line == "":  # end of input
+                    raise FatalSequenceError(f"No answer was available for prompt {title!r}")
+                if (value := find_option(options, line.strip())) is not None:
+                    return value
+                self.output_stream.write(f"Invalid choice: {line.strip()!r}\n")
+
+    async def read_line(self) -> str:
+        """Read a line without blocking the sequence. Returns an empty string at end of input."""
+        if self.pending_line is None:
+            receiver: Reply[str] = Reply()
+            # a daemon thread is used so a pending read never keeps the process alive
+            threading.Thread(
+                target=lambda: receiver.set(self.input_stream.readline()),
+                name="fabrial-headless-stdin",
+                daemon=True,
+            ).start()
+            self.pending_line = receiver.future
+        # if this is cancelled, the read continues and its line goes to the next prompt
+        line = await asyncio.shield(self.pending_line)
+        self.pending_line = None
+        return line
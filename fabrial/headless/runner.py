@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from asyncio import CancelledError
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+
+from ..classes import FatalSequenceError, Reply, SequenceStep, StepRunner
+from ..classes.plot_batcher import DEFAULT_FRAME_RATE, PlotBatch
+from ..classes.prompt_policy import PromptPolicy
+from ..enums import SequenceStatus
+from ..plotting import run_plot_command
+from .plots import HeadlessDisplay
+from .prompts import StdinPrompter
+
+
+class HeadlessSequence:
+    """
+    Runs a sequence on the current thread without a GUI. Prompts are answered by a `PromptPolicy`
+    (falling back to the terminal) and plot commands are run on a `HeadlessDisplay`.
+
+    Parameters
+    ----------
+    steps
+        The sequence's top-level steps.
+    data_directory
+        The sequence's data directory.
+    step_names
+        A mapping of step memory addresses to step names, used for progress messages.
+    policy
+        Answers prompts (see `StepRunner`). If this is `None` or has no answer, the prompt is shown
+        on the terminal.
+    display
+        Where plot commands are run.
+    stall_threshold
+        See `StepRunner`.
+    plot_frame_rate
+        See `StepRunner`.
+    resume
+        Whether to resume a previous run of the sequence. See `StepRunner.run_sequence()`.
+    prompter
+        Shows prompts on the terminal.
+    """
+
+    def __init__(
+        self,
+        steps: Iterable[SequenceStep],
+        data_directory: Path,
+        step_names: Mapping[int, str],
+        policy: PromptPolicy | None,
+        display: HeadlessDisplay,
+        stall_threshold: float | None = None,
+        plot_frame_rate: float | None = DEFAULT_FRAME_RATE,
+        resume: bool = False,
+        prompter: StdinPrompter | None = None,
+    ):
+        self.steps = steps
+        self.data_directory = data_directory
+        self.step_names = step_names
+        self.display = display
+        self.resume = resume
+        self.prompter = prompter if prompter is not None else StdinPrompter()
+
+        self.completed_steps = 0
+        self.fatal_error: FatalSequenceError | None = None
+        self.sequence_task: asyncio.Task[None] | None = None
+        self.prompt_tasks: set[asyncio.Task[None]] = set()  # we have to keep references to tasks
+
+        # the runner lives on this thread, so its signals call these functions directly
+        self.runner = StepRunner(stall_threshold, policy, plot_frame_rate)
+        self.runner.promptRequested.connect(self.handle_prompt)
+        self.runner.plotCommandsRequested.connect(self.run_plot_commands)
+        self.runner.stepStateChanged.connect(self.handle_step_state_change)
+
+    def run(self) -> SequenceStatus:
+        """Run the sequence until it ends and return how it ended. Logs errors."""
+        try:
+            with asyncio.Runner() as runner:
+                runner.run(self.run_actual())
+            return SequenceStatus.Completed
+        # `KeyboardInterrupt` means the user cancelled with Ctrl+C
+        except (CancelledError, KeyboardInterrupt):
+            if self.fatal_error is not None:
+                logging.getLogger(__name__).error(
+                    f"Sequence raised a fatal exception: {self.fatal_error.error_message}"
+                )
+                return SequenceStatus.FatalError
+            return SequenceStatus.Cancelled
+        except (FatalSequenceError, Exception):
+            logging.getLogger(__name__).exception("Sequence raised a fatal exception")
+            return SequenceStatus.FatalError
+
+    async def run_actual(self):
+        """The actual run function (required so we can use `asyncio.Runner`)."""
+        self.sequence_task = asyncio.create_task(
+            self.runner.run_sequence(self.steps, self.data_directory, self.resume)
+        )
+        try:
+            await self.sequence_task
+        finally:
+            for task in self.prompt_tasks:
+                task.cancel()
+
+    def raise_fatal(self, error: FatalSequenceError):
+        """End the sequence with a fatal **error** from outside the sequence's steps."""
+        if self.fatal_error is None:
+            self.fatal_error = error
+        if self.sequence_task is not None:
+            self.sequence_task.cancel()
+
+    def handle_prompt(
+        self, title: str, message: str, options: dict[int, str], receiver: Reply[int]
+    ):
+        """Ask for an answer on the terminal."""
+        task = asyncio.get_running_loop().create_task(
+            self.ask_terminal(title, message, options, receiver)
+        )
+        self.prompt_tasks.add(task)
+        task.add_done_callback(self.prompt_tasks.discard)
+        # stop asking if the sequence stops waiting (i.e. the prompt policy's timeout expired)
+        receiver.future.add_done_callback(lambda _: task.cancel())
+
+    async def ask_terminal(
+        self, title: str, message: str, options: dict[int, str], receiver: Reply[int]
+    ):
+        """Ask for an answer on the terminal and send it to the **receiver**."""
+        try:
+            receiver.set(await self.prompter.ask(title, message, options))
+        except FatalSequenceError as error:
+            receiver.fail(error)  # the step that is waiting raises the error
+
+    def run_plot_commands(self, batch: PlotBatch):
+        """Run a **batch** of plot commands in order."""
+        try:
+            for command in batch.commands:
+                run_plot_command(self.display, command)
+        except Exception:
+            logging.getLogger(__name__).exception(
+                "Error while running a plot command. This usually indicates that a plugin used an "
+                "invalid `PlotHandle` or `LineHandle`"
+            )
+            self.raise_fatal(FatalSequenceError("A plot command failed"))
+        finally:
+            batch.mark_applied()
+
+    def handle_step_state_change(self, step_address: int, running: bool):
+        """Log the step starting/finishing."""
+        step_name = self.step_names.get(step_address, "Unknown step")
+        if running:
+            logging.getLogger(__name__).info(f"Started {step_name}")
+        else:
+            self.completed_steps += 1
+            logging.getLogger(__name__).info(f"Finished {step_name}")
@@ -9,7 +9,7 @@ from .custom_widgets.settings import ApplicationSettingsWindow
 from .menu import MenuBar
 from .secondary_window import SecondaryWindow
 from .sequence_builder import CategoryItem
-from .tabs import SequenceBuilderTab, SequenceDisplayTab, sequence_builder, sequence_display
+from .tabs import SequenceBuilderTab, SequenceVisualsTab, sequence_builder, sequence_visuals
 from .utility import images
 
 
@@ -29,7 +29,7 @@ class MainWindow(QMainWindow):
         self.settings_window = settings_menu_widget
         self.settings_window.relaunchRequested.connect(self.relaunch)
         # tabs
-        self.sequence_visuals_tab = SequenceDisplayTab()
+        self.sequence_visuals_tab = SequenceVisualsTab()
         self.sequence_tab = SequenceBuilderTab(
             self.sequence_visuals_tab, self.menu_bar.sequence, category_items
         )
@@ -40,7 +40,7 @@ class MainWindow(QMainWindow):
         )
         self.tab_widget.addTab(
             self.sequence_visuals_tab,
-            images.make_icon(sequence_display.ICON_FILENAME),
+            images.make_icon(sequence_visuals.ICON_FILENAME),
             "Sequence Visuals",
         )
         self.setCentralWidget(self.tab_widget)
@@ -106,10 +106,11 @@ class MainWindow(QMainWindow):
 
     def allowed_to_close(self) -> bool:
         """Determine if the window should close."""
-        # only close if a sequence is not running, otherwise ask to cancel the sequence
+        # only close if no sequences are running, otherwise ask to cancel the sequences
         if self.sequence_tab.is_running_sequence():
             if YesCancelDialog(
-                "Close?", "A sequence is currently running. Cancel sequence and close?"
+                "Close?",
+                "At least one sequence is currently running. Cancel all sequences and close?",
             ).run():
                 self.sequence_tab.cancel_sequence()
                 while self.sequence_tab.is_running_sequence():
@@ -8,6 +8,8 @@ class SequenceMenu(QMenu):
 
     def __init__(self, parent: QMenuBar):
         QMenu.__init__(self, "&Sequence", parent)
-        self.cancel = Action(parent, "Cancel Sequence")
+        self.cancel = Action(parent, "Cancel All Sequences")
         self.cancel.setDisabled(True)  # start disabled
         self.addAction(self.cancel)
+        self.resume = Action(parent, "Resume Sequence...")
+        self.addAction(self.resume)
@@ -1,33 +1,126 @@
 from __future__ import annotations
 
-import asyncio
 import copy
+from collections.abc import Iterable, Sequence
 from dataclasses import dataclass
 from os import PathLike
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Protocol
 
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
 from pyqtgraph import PlotDataItem
 
-from .classes.lock import DataLock
+from .classes.reply import Reply
+from .classes.sample_ring import SampleRing
+from .enums import PlotOverflowPolicy
 
 if TYPE_CHECKING:
     from .classes.step_runner import StepRunner
 
+DEFAULT_MAX_PENDING_POINTS = 10_000
+"""How many points of a line can wait for the display by default (see `PlotHandle.add_line()`)."""
+DEFAULT_STREAM_WINDOW = 10_000
+"""How many samples a streamed line shows by default (see `PlotHandle.add_stream()`)."""
+
 
 class LineData:
-    """Container for a line and its data. This is similar to a `Line2D` in `matplotlib`."""
+    """
+    Container for a line and its data. This is similar to a `Line2D` in `matplotlib`.
+
+    The data is stored in NumPy arrays with room to spare. When they are full, they are replaced
+    with arrays twice the size, so adding a point takes constant time on average and redrawing
+    passes views of the arrays instead of converting the whole line.
+    """
 
-    def __init__(self, line: PlotDataItem, x_data: list[float], y_data: list[float]):
+    INITIAL_CAPACITY = 1024
+
+    def __init__(self, line: PlotDataItem, x_data: ArrayLike = (), y_data: ArrayLike = ()):
         self.line = line
-        self.x_data = x_data
-        self.y_data = y_data
+        x_array = np.asarray(x_data, dtype=np.float64)
+        y_array = np.asarray(y_data, dtype=np.float64)
+        self.count = len(x_array)
+        capacity = max(self.count, self.INITIAL_CAPACITY)
+        self.x_values = np.empty(capacity)
+        self.y_values = np.empty(capacity)
+        self.x_values[: self.count] = x_array
+        self.y_values[: self.count] = y_array
+
+    @property
+    def x_data(self) -> NDArray[np.float64]:
+        """A view of the line's x-data."""
+        return self.x_values[: self.count]
+
+    @property
+    def y_data(self) -> NDArray[np.float64]:
+        """A view of the line's y-data."""
+        return self.y_values[: self.count]
+
+    def add_point(self, x: float, y: float, redraw: bool = True):
+        """
+        Add a point to the line. If **redraw** is `False`, the point isn't shown until `redraw()` is
+        called (for adding many points at once).
+        """
+        if self.count == len(self.x_values):
+            self.reserve(self.count + 1)
+        self.x_values[self.count] = x
+        self.y_values[self.count] = y
+        self.count += 1
+        if redraw:
+            self.redraw()
+
+    def add_points(self, x_values: ArrayLike, y_values: ArrayLike, redraw: bool = True):
+        """
+        Add several points to the line. See `add_point()`.
 
-    def add_point(self, x: float, y: float):
-        """Add a point to the line."""
-        self.x_data.append(x)
-        self.y_data.append(y)
+        Raises
+        ------
+        ValueError
+            **x_values** and **y_values** have different lengths.
+        """
+        x_array = np.asarray(x_values, dtype=np.float64)
+        y_array = np.asarray(y_values, dtype=np.float64)
+        if len(x_array) != len(y_array):
+            raise ValueError(
+                f"Got {len(x_array)} x values but {len(y_array)} y values; they must match"
+            )
+        count = self.count + len(x_array)
+        if count > len(self.x_values):
+            self.reserve(count)
+        self.x_values[self.count : count] = x_array
+        self.y_values[self.count : count] = y_array
+        self.count = count
+        if redraw:
+            self.redraw()
+
+    def redraw(self):
+        """Show the line's current data."""
         self.line.setData(self.x_data, self.y_data)
 
+    def reserve(self, count: int):  # private
+        """Make room for at least **count** points, at least doubling the capacity."""
+        capacity = max(count, 2 * len(self.x_values))
+        x_values = np.empty(capacity)
+        y_values = np.empty(capacity)
+        x_values[: self.count] = self.x_data
+        y_values[: self.count] = self.y_data
+        self.x_values = x_values
+        self.y_values = y_values
+
+
+class StreamLineData:
+    """A line that shows the newest samples of a `SampleRing` (see `PlotHandle.add_stream()`)."""
+
+    def __init__(self, line: PlotDataItem, ring: SampleRing):
+        self.line = line
+        self.ring = ring
+        self.shown_count = 0  # the ring's `write_count` when the line was last redrawn
+
+    def redraw(self):
+        """Show the ring's newest samples, if any were written since the last redraw."""
+        if (write_count := self.ring.write_count) != self.shown_count:
+            self.line.setData(*self.ring.latest(write_count))
+            self.shown_count = write_count
+
 
 @dataclass
 class PlotSettings:
@@ -96,10 +189,11 @@ class SymbolParams:
         return SymbolParams(copy.copy(self.symbol), copy.copy(self.color), self.size)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PlotIndex:
     """
-    An index to a plot on the visuals tab.
+    An index to a plot on the visuals tab. Indexes are immutable, so they can be shared between
+    threads without copying.
 
     Parameters
     ----------
@@ -112,14 +206,12 @@ class PlotIndex:
     step_address: int
     plot_number: int
 
-    def __copy__(self) -> PlotIndex:
-        return PlotIndex(self.step_address, self.plot_number)
 
-
-@dataclass
+@dataclass(frozen=True, slots=True)
 class LineIndex:
     """
-    An index to a line on a plot.
+    An index to a line on a plot. Indexes are immutable, so they can be shared between threads
+    without copying.
 
     Parameters
     ----------
@@ -132,8 +224,167 @@ class LineIndex:
     plot_index: PlotIndex
     line_number: int
 
-    def __copy__(self) -> LineIndex:
-        return LineIndex(copy.copy(self.plot_index), self.line_number)
+
+# plot commands are sent from the sequence's thread to the display and must not be modified after
+# they are submitted. They use slots because high-rate steps create a lot of them
+@dataclass(slots=True)
+class AddPlot:
+    """Create a plot (see `PlotDisplay.add_plot()`)."""
+
+    step_address: int
+    step_name: str
+    tab_text: str
+    plot_settings: PlotSettings
+    receiver: Reply[PlotIndex]
+
+
+@dataclass(slots=True)
+class RemovePlot:
+    """Remove a plot (see `PlotDisplay.remove_plot()`)."""
+
+    plot_index: PlotIndex
+
+
+@dataclass(slots=True)
+class AddLine:
+    """Add a line to a plot (see `PlotDisplay.add_line()`)."""
+
+    plot_index: PlotIndex
+    legend_label: str | None
+    line_params: LineParams | None
+    symbol_params: SymbolParams | None
+    receiver: Reply[LineIndex]
+
+
+@dataclass(slots=True)
+class AddStream:
+    """Add a line that shows a `SampleRing` to a plot (see `PlotDisplay.add_stream()`)."""
+
+    plot_index: PlotIndex
+    legend_label: str | None
+    line_params: LineParams | None
+    symbol_params: SymbolParams | None
+    ring: SampleRing
+    frame_rate: float | None
+    receiver: Reply[LineIndex]
+
+
+@dataclass(slots=True)
+class AddPoint:
+    """Add a point to a line (see `PlotDisplay.add_point()`)."""
+
+    line_index: LineIndex
+    x: float
+    y: float
+
+
+@dataclass(slots=True)
+class AddPoints:
+    """Add several points to a line (see `PlotDisplay.add_points()`)."""
+
+    line_index: LineIndex
+    x_values: list[float]
+    y_values: list[float]
+
+
+@dataclass(slots=True)
+class SetLogScale:
+    """Set whether a plot's axes are logarithmic (see `PlotDisplay.set_log_scale()`)."""
+
+    plot_index: PlotIndex
+    x_log: bool | None
+    y_log: bool | None
+
+
+@dataclass(slots=True)
+class SavePlot:
+    """Save a plot to a file (see `PlotDisplay.save_plot()`)."""
+
+    plot_index: PlotIndex
+    file: PathLike[str] | str
+
+
+type PlotCommand = (
+    AddPoint | AddPoints | AddPlot | RemovePlot | AddLine | AddStream | SetLogScale | SavePlot
+)
+"""A command that a `StepRunner` sends to the display."""
+
+
+class PlotDisplay(Protocol):
+    """Something that shows plots and runs plot commands (i.e. the `SequenceDisplayTab`)."""
+
+    def add_plot(
+        self,
+        step_address: int,
+        step_name: str,
+        tab_text: str,
+        plot_settings: PlotSettings,
+        receiver: Reply[PlotIndex],
+    ): ...
+
+    def remove_plot(self, plot_index: PlotIndex): ...
+
+    def add_line(
+        self,
+        plot_index: PlotIndex,
+        legend_label: str | None,
+        line_params: LineParams | None,
+        symbol_params: SymbolParams | None,
+        receiver: Reply[LineIndex],
+    ): ...
+
+    def add_stream(
+        self,
+        plot_index: PlotIndex,
+        legend_label: str | None,
+        line_params: LineParams | None,
+        symbol_params: SymbolParams | None,
+        ring: SampleRing,
+        frame_rate: float | None,
+        receiver: Reply[LineIndex],
+    ): ...
+
+    def add_point(self, line_index: LineIndex, x: float, y: float): ...
+
+    def add_points(
+        self, line_index: LineIndex, x_values: Sequence[float], y_values: Sequence[float]
+    ): ...
+
+    def set_log_scale(self, plot_index: PlotIndex, x_log: bool | None, y_log: bool | None): ...
+
+    def save_plot(self, plot_index: PlotIndex, file: PathLike[str] | str): ...
+
+
+def run_plot_command(display: PlotDisplay, command: PlotCommand):
+    """
+    Run **command** on **display**.
+
+    Raises
+    ------
+    Exception
+        The command failed (i.e. it used an invalid index). This is fatal.
+    """
+    match command:  # the most common commands come first
+        case AddPoint(line_index, x, y):
+            display.add_point(line_index, x, y)
+        case AddPoints(line_index, x_values, y_values):
+            display.add_points(line_index, x_values, y_values)
+        case AddPlot(step_address, step_name, tab_text, plot_settings, receiver):
+            display.add_plot(step_address, step_name, tab_text, plot_settings, receiver)
+        case RemovePlot(plot_index):
+            display.remove_plot(plot_index)
+        case AddLine(plot_index, legend_label, line_params, symbol_params, receiver):
+            display.add_line(plot_index, legend_label, line_params, symbol_params, receiver)
+        case AddStream(
+            plot_index, legend_label, line_params, symbol_params, ring, frame_rate, receiver
+        ):
+            display.add_stream(
+                plot_index, legend_label, line_params, symbol_params, ring, frame_rate, receiver
+            )
+        case SetLogScale(plot_index, x_log, y_log):
+            display.set_log_scale(plot_index, x_log, y_log)
+        case SavePlot(plot_index, file):
+            display.save_plot(plot_index, file)
 
 
 class PlotHandle:
@@ -157,21 +408,19 @@ class PlotHandle:
         Set whether the x- and/or y-axis use a logarithmic scale. A value of `None` for **x_log** or
         **y_log** will leave the corresponding axis unchanged.
         """
-        plot_index = copy.copy(self.plot_index)
-        self.runner.submit_plot_command(
-            lambda plot_tab: plot_tab.set_log_scale(plot_index, x_log, y_log)
-        )
+        self.runner.submit_plot_command(SetLogScale(self.plot_index, x_log, y_log))
 
     def save_plot(self, file: PathLike[str] | str):
         """Save the plot to **file**."""
-        plot_index = copy.copy(self.plot_index)
-        self.runner.submit_plot_command(lambda plot_tab: plot_tab.save_plot(plot_index, file))
+        self.runner.submit_plot_command(SavePlot(self.plot_index, file))
 
     async def add_line(
         self,
         legend_label: str | None,
         line_params: LineParams | None,
         symbol_params: SymbolParams | None,
+        overflow_policy: PlotOverflowPolicy = PlotOverflowPolicy.KeepMinMax,
+        max_pending_points: int = DEFAULT_MAX_PENDING_POINTS,
     ) -> LineHandle:
         """
         Add an empty line to the plot.
@@ -184,22 +433,84 @@ class PlotHandle:
             How the line should look. If `None` there will be no line.
         symbol_params
             How the symbols (aka markers) should look. If `None` there will be no symbols.
+        overflow_policy
+            What happens to new points once **max_pending_points** points are waiting for the
+            display while it is behind (i.e. because plotting is slower than your step). While the
+            display keeps up, every point is plotted. This only affects the plot.
+        max_pending_points
+            How many points can wait for a display that is behind before **overflow_policy**
+            applies.
+
+        Raises
+        ------
+        ValueError
+            **max_pending_points** is less than 4.
         """
-        receiver: DataLock[LineIndex | None] = DataLock(None)
-        # we make copies because sending the originals is not thread-safe
-        plot_index = copy.copy(self.plot_index)
-        legend_label = copy.copy(legend_label)
-        line_params = copy.copy(line_params)
-        symbol_params = copy.copy(symbol_params)
-        self.runner.submit_plot_command(
-            lambda plot_tab: plot_tab.add_line(
-                plot_index, legend_label, line_params, symbol_params, receiver
+        if max_pending_points < 4:
+            raise ValueError(
+                f"Lines must be able to hold at least 4 pending points, not {max_pending_points}"
             )
+        receiver: Reply[LineIndex] = Reply()
+        # we copy the parameters because sending the originals is not thread-safe
+        self.runner.submit_plot_command(
+            AddLine(
+                self.plot_index,
+                legend_label,
+                copy.copy(line_params),
+                copy.copy(symbol_params),
+                receiver,
+            ),
+            immediate=True,
+        )
+        line_index = await self.runner.wait_for_reply(receiver)
+        self.runner.plot_batcher.set_line_policy(line_index, overflow_policy, max_pending_points)
+        return LineHandle(self, line_index)
+
+    async def add_stream(
+        self,
+        legend_label: str | None,
+        line_params: LineParams | None,
+        symbol_params: SymbolParams | None,
+        window: int = DEFAULT_STREAM_WINDOW,
+    ) -> StreamHandle:
+        """
+        Add a line for high-rate data (i.e. a kHz channel). Samples are written into a ring buffer
+        that the display reads every frame (at the sequence's plot update rate), so no plot commands
+        are sent and the cost doesn't depend on the number of samples. The line shows the newest
+        **window** samples.
+
+        Parameters
+        ----------
+        legend_label
+            The label to use for the legend. If `None` there will be no legend label.
+        line_params
+            How the line should look. If `None` there will be no line.
+        symbol_params
+            How the symbols (aka markers) should look. If `None` there will be no symbols.
+        window
+            How many of the newest samples the line shows.
+
+        Raises
+        ------
+        ValueError
+            **window** is less than 1.
+        """
+        ring = SampleRing(window)
+        receiver: Reply[LineIndex] = Reply()
+        self.runner.submit_plot_command(
+            AddStream(
+                self.plot_index,
+                legend_label,
+                copy.copy(line_params),
+                copy.copy(symbol_params),
+                ring,
+                self.runner.plot_batcher.frame_rate,
+                receiver,
+            ),
+            immediate=True,
         )
-        while True:
-            await asyncio.sleep(0)
-            if (line_index := receiver.get()) is not None:
-                return LineHandle(self, line_index)
+        await self.runner.wait_for_reply(receiver)
+        return StreamHandle(ring)
 
 
 class LineHandle:
@@ -220,7 +531,43 @@ class LineHandle:
 
     def add_point(self, x: float, y: float):
         """Add a point to the line."""
-        line_index = copy.copy(self.line_index)
+        self.parent.runner.submit_plot_command(AddPoint(self.line_index, x, y))
+
+    def add_points(self, x_values: Iterable[float], y_values: Iterable[float]):
+        """
+        Add several points to the line at once. This is faster than calling `add_point()` for each
+        point.
+        """
         self.parent.runner.submit_plot_command(
-            lambda plot_tab: plot_tab.add_point(line_index, x, y)
+            AddPoints(self.line_index, list(x_values), list(y_values))
         )
+
+
+class StreamHandle:
+    """
+    A handle to a streamed line on a plot (see `PlotHandle.add_stream()`). Only use it from the step
+    that created it.
+
+    Parameters
+    ----------
+    ring
+        The `SampleRing` the display reads.
+    """
+
+    def __init__(self, ring: SampleRing):
+        self.ring = ring
+
+    def write(self, x_values: ArrayLike, y_values: ArrayLike):
+        """
+        Add samples (i.e. NumPy arrays) to the line.
+
+        Raises
+        ------
+        ValueError
+            **x_values** and **y_values** have different lengths.
+        """
+        self.ring.write(x_values, y_values)
+
+    def append(self, x: float, y: float):
+        """Add a single sample to the line."""
+        self.ring.append(x, y)
@@ -73,6 +73,23 @@ class SequenceModel(TreeModel[SequenceItem]):
             logging.getLogger(__name__).exception("Failed to save to file")
             return False
 
+    def copy(self) -> "SequenceModel":
+        """
+        Create an independent copy of the model by serializing and deserializing its items.
+
+        Raises
+        ------
+        Exception
+            An item failed to serialize or deserialize (this is usually caused by a faulty plugin).
+        """
+        items_as_json = typing.cast(Sequence[Mapping[str, Json]], self.root().serialize())
+        model = SequenceModel([])
+        items = [
+            SequenceItem.from_dict(model.root(), item_as_json) for item_as_json in items_as_json
+        ]
+        model.insert_rows(0, QModelIndex(), items)
+        return model
+
     def set_emphasized(self, index: QModelIndex, emphasized: bool):
         """Set whether the item at **index** is emphasized."""
         if (item := self.get_item(index)) is not None:
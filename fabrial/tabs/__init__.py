@@ -1,2 +1,4 @@
 from .sequence_builder import SequenceBuilderTab
 from .sequence_display import SequenceDisplayTab
+from .sequence_monitor import SequenceMonitorTab
+from .sequence_visuals import SequenceVisualsTab
@@ -5,16 +5,16 @@ from collections.abc import Iterable
 from pathlib import Path
 
 from PyQt6.QtCore import QSize
-from PyQt6.QtWidgets import QFileDialog, QGridLayout, QHBoxLayout, QSizePolicy, QStackedWidget
+from PyQt6.QtWidgets import QFileDialog, QGridLayout, QHBoxLayout, QSizePolicy
 
-from ..classes import SequenceRunner
+from ..classes import SequenceRunner, journal
 from ..constants.paths.settings import sequence as sequence_paths
+from ..constants.sequence import AUTOSAVE_FILENAME
 from ..custom_widgets import Button, IconLabel, Label, Widget
-from ..enums import SequenceStatus
 from ..menu import SequenceMenu
-from ..sequence_builder import CategoryItem, OptionsTreeWidget, SequenceTreeWidget
+from ..sequence_builder import CategoryItem, OptionsTreeWidget, SequenceModel, SequenceTreeWidget
 from ..utility import errors, images
-from .sequence_display import SequenceDisplayTab
+from .sequence_visuals import SequenceVisualsTab
 
 ICON_FILENAME = "script-block.png"
 
@@ -26,7 +26,7 @@ class SequenceBuilderTab(Widget):
     Parameters
     ----------
     visuals_tab
-        The tab where plots are shown for sequence steps.
+        The tab where running sequences (and their plots) are shown.
     menu
         The `QMenu` that holds sequence controls.
     plugin_modules
@@ -35,14 +35,15 @@ class SequenceBuilderTab(Widget):
 
     def __init__(
         self,
-        visuals_tab: SequenceDisplayTab,
+        visuals_tab: SequenceVisualsTab,
         menu: SequenceMenu,
         category_items: Iterable[CategoryItem],
     ):
         layout = QGridLayout()
         Widget.__init__(self, layout)
 
-        self.sequence_runner: SequenceRunner | None = None  # have to keep a reference to the runner
+        # we have to keep a reference to the runners. Several sequences can run at once
+        self.sequence_runners: list[SequenceRunner] = []
 
         self.visuals_tab = visuals_tab  # another tab
         self.menu = menu
@@ -55,13 +56,12 @@ class SequenceBuilderTab(Widget):
             images.make_pixmap("folder--arrow.png"), self.load_previous_directory()
         )
 
-        self.button_layout = QStackedWidget()
         self.start_button = Button("Start", self.start_sequence)
-        self.pause_button = Button("Pause")
-        self.unpause_button = Button("Unpause")
         self.status_label = Label("Inactive").set_color("gray")
 
         self.arrange_widgets(layout)
+        self.menu.cancel.triggered.connect(self.cancel_sequence)
+        self.menu.resume.triggered.connect(self.resume_sequence)
 
     def arrange_widgets(self, layout: QGridLayout):
         """Arrange widgets at construction."""
@@ -80,16 +80,14 @@ class SequenceBuilderTab(Widget):
         directory_layout.addWidget(self.directory_button)
         directory_layout.addWidget(self.directory_label)
 
-        # start/pause button and status label
+        # start button and status label
         runner_layout = QHBoxLayout()
         layout.addLayout(runner_layout, 1, 1)
-        # buttons
-        self.button_layout.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Preferred)
-        self.button_layout.setMinimumSize(BUTTON_SIZE)
-        runner_layout.addWidget(self.button_layout)
+        # button
+        self.start_button.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Preferred)
+        self.start_button.setMinimumSize(BUTTON_SIZE)
+        runner_layout.addWidget(self.start_button)
         self.start_button.setEnabled(self.directory_is_valid())
-        for button in [self.start_button, self.pause_button, self.unpause_button]:
-            self.button_layout.addWidget(button)
         # label
         font = self.status_label.font()
         font.setPointSize(16)
@@ -104,6 +102,8 @@ class SequenceBuilderTab(Widget):
             os.path.expanduser("~"),
             QFileDialog.Option.ShowDirsOnly,
         )
+        if directory == "":  # the user cancelled the dialog
+            return
         self.directory_label.label().setText(directory)  # update label
 
         self.start_button.setEnabled(directory != "")  # enable/disable start button
@@ -140,71 +140,93 @@ class SequenceBuilderTab(Widget):
     # ----------------------------------------------------------------------------------------------
     # sequence
     def start_sequence(self):
+        """Start a sequence from the items in the sequence builder."""
+        data_directory = Path(self.data_directory())
+        if self.directory_in_use(data_directory):
+            errors.show_error(
+                "Sequence Error",
+                f"A running sequence is already recording to {data_directory}. "
+                "Choose a different data directory.",
+            )
+            return
         sequence_runner = SequenceRunner()
-        self.pause_button.clicked.connect(sequence_runner.pause)
-        self.unpause_button.clicked.connect(sequence_runner.unpause)
-        self.menu.cancel.triggered.connect(sequence_runner.cancel)
         if sequence_runner.run_sequence(
-            self, self.sequence_tree_widget.view.model(), Path(self.data_directory())
+            self, self.sequence_tree_widget.view.model(), data_directory
         ):
-            self.handle_sequence_state_change(True)
             # store a reference to the sequence runner
-            self.sequence_runner = sequence_runner
-
-    def handle_sequence_status_change(self, status: SequenceStatus):
-        """Handle the sequence's status changing."""
-        match status:
-            case SequenceStatus.Active:
-                text = "Active"
-                color = "green"
-                button = self.pause_button
-
-            case SequenceStatus.Paused:
-                text = "Paused"
-                color = "cyan"
-                button = self.unpause_button
-
-            case SequenceStatus.Completed:
-                text = "Completed"
-                color = "gray"
-                button = self.start_button
-
-            case SequenceStatus.Cancelled:
-                text = "Cancelled"
-                color = "gray"
-                button = self.start_button
-
-            case SequenceStatus.FatalError:
-                text = "Fatal Error"
-                color = "red"
-                button = self.start_button
-                # notify the user
-                errors.show_error_delayed(
-                    "Sequence: Fatal Error",
-                    "The sequence encountered a fatal error and was terminated. "
-                    "See the error log for details.",
-                )
-            case _:  # this should never run
-                raise ValueError(f"Unknown `SequenceStatus`: {status}")
-
-        self.button_layout.setCurrentWidget(button)
-        self.status_label.setText(text)
-        self.status_label.set_color(color)
-
-    def handle_sequence_state_change(self, running: bool):
-        """Handle the sequence starting/stopping."""
-        self.menu.cancel.setEnabled(running)
-        self.directory_button.setEnabled(not running)
-        self.start_button.setEnabled(not running)  # make sure the user can't spam the start button
-        self.sequence_tree_widget.set_readonly(running)  # disable editing the items
-        if not running:
-            self.sequence_runner = None  # delete the runner
+            self.sequence_runners.append(sequence_runner)
+            self.update_running_status()
+
+    def resume_sequence(self):
+        """
+        Choose the data directory of an interrupted sequence and resume it. The sequence is loaded
+        from the directory's autosave, so changes to the sequence builder don't affect it.
+        """
+        directory = QFileDialog.getExistingDirectory(
+            self,
+            "Select the data directory of the sequence to resume",
+            self.data_directory() or os.path.expanduser("~"),
+            QFileDialog.Option.ShowDirsOnly,
+        )
+        if directory == "":  # the user cancelled the dialog
+            return
+        data_directory = Path(directory)
+        if not journal.can_resume(data_directory):
+            errors.show_error(
+                "Sequence Error",
+                f"{data_directory} does not contain a sequence that can be resumed.",
+            )
+            return
+        if self.directory_in_use(data_directory):
+            errors.show_error(
+                "Sequence Error", f"A running sequence is already recording to {data_directory}."
+            )
+            return
+        model = SequenceModel([])
+        if not model.init_from_json(data_directory.joinpath(AUTOSAVE_FILENAME)):
+            errors.show_error(
+                "Sequence Error",
+                "Unable to load the sequence's autosave. See the error log for details.",
+            )
+            return
+        sequence_runner = SequenceRunner()
+        if sequence_runner.run_sequence(self, model, data_directory, resume=True):
+            self.sequence_runners.append(sequence_runner)
+            self.update_running_status()
+
+    def directory_in_use(self, data_directory: Path) -> bool:
+        """Whether a running sequence is recording to **data_directory**."""
+        data_directory = data_directory.resolve()
+        return any(
+            sequence_runner.data_directory is not None
+            and sequence_runner.data_directory.resolve() == data_directory
+            for sequence_runner in self.sequence_runners
+        )
+
+    def handle_sequence_finished(self, sequence_runner: SequenceRunner):
+        """Handle a sequence finishing."""
+        try:
+            self.sequence_runners.remove(sequence_runner)  # delete the runner
+        except ValueError:
+            pass
+        self.update_running_status()
+
+    def update_running_status(self):
+        """Update the status label and menu to reflect the number of running sequences."""
+        running_count = len(self.sequence_runners)
+        self.menu.cancel.setEnabled(running_count > 0)
+        if running_count > 0:
+            self.status_label.setText(f"{running_count} Running")
+            self.status_label.set_color("green")
+        else:
+            self.status_label.setText("Inactive")
+            self.status_label.set_color("gray")
 
     def is_running_sequence(self) -> bool:
-        """Whether a sequence is currently being run."""
-        return self.sequence_runner is not None
+        """Whether any sequence is currently being run."""
+        return len(self.sequence_runners) > 0
 
     def cancel_sequence(self):
-        """Cancel the sequence."""
-        if self.sequence_runner is not None:
-            self.sequence_runner.cancel()
+        """Cancel every running sequence."""
+        for sequence_runner in self.sequence_runners:
+            sequence_runner.cancel()
@@ -1,13 +1,26 @@
+from __future__ import annotations
+
 import logging
 import typing
+from collections.abc import Iterable, Sequence
 from os import PathLike
 
 from PyQt6.QtCore import Qt
 from PyQt6.QtWidgets import QTabWidget
 
-from ..classes import DataLock, Shortcut
+from ..classes import Reply, Shortcut
+from ..classes.sample_ring import SampleRing
 from ..custom_widgets import Button, PlotWidget
-from ..plotting import LineIndex, LineParams, PlotIndex, PlotSettings, SymbolParams
+from ..plotting import (
+    LineData,
+    LineIndex,
+    LineParams,
+    PlotCommand,
+    PlotIndex,
+    PlotSettings,
+    SymbolParams,
+    run_plot_command,
+)
 from ..secondary_window import SecondaryWindow
 from ..utility import images
 
@@ -24,9 +37,15 @@ class SequenceDisplayTab(QTabWidget):
 
         self.setCornerWidget(Button("Pop Graph", self.pop_graph), Qt.Corner.TopRightCorner)
         self.setMovable(True)  # allow moving tabs around
-        Shortcut(self, "Ctrl+G", self.pop_graph)
+        # several sequences can have a display tab, so only respond while this tab has focus
+        Shortcut(
+            self, "Ctrl+G", self.pop_graph, context=Qt.ShortcutContext.WidgetWithChildrenShortcut
+        )
 
         self.sequence_step_map: dict[int, tuple[QTabWidget, dict[int, PlotWidget]]] = {}
+        # while running a batch of commands, lines that got new points are redrawn once at the end
+        self.running_batch = False
+        self.stale_lines: set[LineData] = set()
 
         self.step_tab_icon = images.make_icon("category.png")
         self.plot_tab_icon = images.make_icon("chart-up.png")
@@ -53,7 +72,7 @@ class SequenceDisplayTab(QTabWidget):
         step_name: str,
         tab_text: str,
         plot_settings: PlotSettings,
-        receiver: DataLock[PlotIndex | None],
+        receiver: Reply[PlotIndex],
     ):
         """
         Create a new tab for the step at **step_address** (if there isn't one already), then create
@@ -108,7 +127,7 @@ class SequenceDisplayTab(QTabWidget):
         legend_label: str | None,
         line_params: LineParams | None,
         symbol_params: SymbolParams | None,
-        receiver: DataLock[LineIndex | None],
+        receiver: Reply[LineIndex],
     ):
         """
         Add a new line to the plot at **plot_index** configured using **line_settings**. Sends a
@@ -121,9 +140,63 @@ class SequenceDisplayTab(QTabWidget):
         plot_item.plot([], [], legend_label, line_params, symbol_params)
         receiver.set(LineIndex(plot_index, line_number))  # send the index to the receiver
 
+    def add_stream(
+        self,
+        plot_index: PlotIndex,
+        legend_label: str | None,
+        line_params: LineParams | None,
+        symbol_params: SymbolParams | None,
+        ring: SampleRing,
+        frame_rate: float | None,
+        receiver: Reply[LineIndex],
+    ):
+        """
+        Add a new line that shows the newest samples in **ring** to the plot at **plot_index**,
+        redrawn **frame_rate** times per second (see `PlotItem.plot_stream()`). Sends a `LineIndex`
+        to the **receiver**.
+        """
+        plot_item = self.get_plot(plot_index).view.plot_item
+        line_number = plot_item.line_count()
+        plot_item.plot_stream(ring, legend_label, line_params, symbol_params, frame_rate)
+        receiver.set(LineIndex(plot_index, line_number))
+
+    def run_plot_commands(self, commands: Iterable[PlotCommand]):
+        """
+        Run plot **commands** in order. Each line is redrawn once after all commands ran, instead of
+        after every point.
+
+        Raises
+        ------
+        Exception
+            A command failed. This is fatal.
+        """
+        self.running_batch = True
+        try:
+            for command in commands:
+                run_plot_command(self, command)
+        finally:
+            self.running_batch = False
+            for line in self.stale_lines:
+                line.redraw()
+            self.stale_lines.clear()
+
     def add_point(self, line_index: LineIndex, x: float, y: float):
         """Add a point to the line at **line_index**."""
-        self.get_plot(line_index.plot_index).view.plot_item.add_point(x, y, line_index.line_number)
+        line = self.get_plot(line_index.plot_index).view.plot_item.add_point(
+            x, y, line_index.line_number, not self.running_batch
+        )
+        if self.running_batch:
+            self.stale_lines.add(line)
+
+    def add_points(
+        self, line_index: LineIndex, x_values: Sequence[float], y_values: Sequence[float]
+    ):
+        """Add several points to the line at **line_index**."""
+        line = self.get_plot(line_index.plot_index).view.plot_item.add_points(
+            x_values, y_values, line_index.line_number, not self.running_batch
+        )
+        if self.running_batch:
+            self.stale_lines.add(line)
 
     def set_log_scale(self, plot_index: PlotIndex, x_log: bool | None, y_log: bool | None):
         """Set the whether the plot at **plot_index** uses a log scale."""
@@ -0,0 +1,119 @@
+from pathlib import Path
+
+from PyQt6.QtCore import QSize
+from PyQt6.QtWidgets import QGridLayout, QHBoxLayout, QSizePolicy, QStackedWidget
+
+from ..custom_widgets import Button, IconLabel, Label, Widget
+from ..enums import SequenceStatus
+from ..sequence_builder import SequenceModel
+from ..sequence_builder.tree_views import SequenceTreeView
+from ..utility import errors, images
+from .sequence_display import SequenceDisplayTab
+
+
+class SequenceMonitorTab(Widget):
+    """
+    Tab for a single sequence. Shows the sequence's items (running items are emphasized), its
+    status, its controls, and its plots.
+
+    Parameters
+    ----------
+    model
+        The sequence's model. This must not be the model used by the sequence builder.
+    data_directory
+        The sequence's data directory.
+    """
+
+    def __init__(self, model: SequenceModel, data_directory: Path):
+        layout = QGridLayout()
+        Widget.__init__(self, layout)
+
+        self.finished = False
+
+        self.tree_view = SequenceTreeView(model)
+        self.tree_view.set_readonly(True)
+        self.tree_view.expandAll()
+        self.visuals_tab = SequenceDisplayTab()
+
+        self.directory_label = IconLabel(
+            images.make_pixmap("folder--arrow.png"), str(data_directory)
+        )
+        self.button_layout = QStackedWidget()
+        self.pause_button = Button("Pause")
+        self.unpause_button = Button("Unpause")
+        self.cancel_button = Button("Cancel")
+        self.status_label = Label("Inactive").set_color("gray")
+
+        self.arrange_widgets(layout)
+
+    def arrange_widgets(self, layout: QGridLayout):
+        """Arrange widgets at construction."""
+        layout.addWidget(self.tree_view, 0, 0)
+        layout.addWidget(self.visuals_tab, 0, 1)
+        layout.setRowStretch(0, 1)
+        layout.setColumnStretch(1, 1)
+
+        BUTTON_SIZE = QSize(150, 50)
+
+        self.directory_label.label().setWordWrap(True)
+        layout.addWidget(self.directory_label, 1, 0)
+
+        # pause/unpause button, cancel button, and status label
+        runner_layout = QHBoxLayout()
+        layout.addLayout(runner_layout, 1, 1)
+        for button in (self.pause_button, self.unpause_button):
+            self.button_layout.addWidget(button)
+        for widget in (self.button_layout, self.cancel_button):
+            widget.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Preferred)
+            widget.setMinimumSize(BUTTON_SIZE)
+            runner_layout.addWidget(widget)
+        font = self.status_label.font()
+        font.setPointSize(16)
+        self.status_label.setFont(font)
+        runner_layout.addWidget(self.status_label)
+
+    def handle_sequence_status_change(self, status: SequenceStatus):
+        """Handle the sequence's status changing."""
+        match status:
+            case SequenceStatus.Active:
+                text = "Active"
+                color = "green"
+                self.button_layout.setCurrentWidget(self.pause_button)
+
+            case SequenceStatus.Paused:
+                text = "Paused"
+                color = "cyan"
+                self.button_layout.setCurrentWidget(self.unpause_button)
+
+            case SequenceStatus.Completed:
+                text = "Completed"
+                color = "gray"
+
+            case SequenceStatus.Cancelled:
+                text = "Cancelled"
+                color = "gray"
+
+            case SequenceStatus.FatalError:
+                text = "Fatal Error"
+                color = "red"
+                # notify the user
+                errors.show_error_delayed(
+                    "Sequence: Fatal Error",
+                    f"The sequence recording to {self.directory_label.label().text()} encountered "
+                    "a fatal error and was terminated. See the error log for details.",
+                )
+            case _:  # this should never run
+                raise ValueError(f"Unknown `SequenceStatus`: {status}")
+
+        self.status_label.setText(text)
+        self.status_label.set_color(color)
+
+    def handle_sequence_finished(self):
+        """Handle the sequence finishing. The tab can be closed afterwards."""
+        self.finished = True
+        self.button_layout.setEnabled(False)
+        self.cancel_button.setEnabled(False)
+
+    def is_finished(self) -> bool:
+        """Whether the sequence has finished."""
+        return self.finished
@@ -0,0 +1,55 @@
+import typing
+from pathlib import Path
+
+from PyQt6.QtWidgets import QTabWidget
+
+from ..sequence_builder import SequenceModel
+from ..utility import images
+from .sequence_monitor import SequenceMonitorTab
+
+ICON_FILENAME = "chart.png"
+SEQUENCE_ICON_FILENAME = "script-block.png"
+
+
+class SequenceVisualsTab(QTabWidget):
+    """
+    Tab with a `SequenceMonitorTab` for each sequence. A sequence's tab can be closed once the
+    sequence finishes.
+    """
+
+    def __init__(self):
+        QTabWidget.__init__(self)
+        self.setMovable(True)  # allow moving tabs around
+        self.setTabsClosable(True)
+        self.tabCloseRequested.connect(self.close_sequence_tab)
+
+        self.sequence_icon = images.make_icon(SEQUENCE_ICON_FILENAME)
+
+    def add_sequence_tab(self, model: SequenceModel, data_directory: Path) -> SequenceMonitorTab:
+        """
+        Add (and show) a tab for a sequence.
+
+        Parameters
+        ----------
+        model
+            The sequence's model. This must not be the model used by the sequence builder.
+        data_directory
+            The sequence's data directory. The tab is named after this directory.
+
+        Returns
+        -------
+        The created tab.
+        """
+        monitor_tab = SequenceMonitorTab(model, data_directory)
+        index = self.addTab(monitor_tab, self.sequence_icon, data_directory.name)
+        self.setTabToolTip(index, str(data_directory))
+        self.setCurrentIndex(index)
+        return monitor_tab
+
+    def close_sequence_tab(self, index: int):
+        """Close the sequence tab at **index** if its sequence has finished."""
+        # this cast is safe because we only ever add `SequenceMonitorTab`s to this widget
+        monitor_tab = typing.cast(SequenceMonitorTab | None, self.widget(index))
+        if monitor_tab is not None and monitor_tab.is_finished():
+            self.removeTab(index)
+            monitor_tab.deleteLater()
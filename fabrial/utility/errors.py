@@ -1,5 +1,6 @@
 import logging
 import sys
+from os import PathLike
 from types import TracebackType
 
 from PyQt6 import QtCore
@@ -10,6 +11,8 @@ from ..constants.paths import SAVED_DATA_FOLDER
 from ..custom_widgets import OkDialog
 from . import events
 
+LOG_FILE = SAVED_DATA_FOLDER.joinpath("lastrun.log")
+
 
 def exception_handler(
     exception_type: type[BaseException], exception: BaseException, trace: TracebackType | None
@@ -54,14 +57,17 @@ def show_error_delayed(title: str, message: str):
     events.delay_until_running(lambda: show_error(title, message))
 
 
-def set_up_logging():
-    """Configure the root logger of the `logging` module."""
+def set_up_logging(file: PathLike[str] | str | None = LOG_FILE):
+    """
+    Configure the root logger of the `logging` module. Logs to **file**, which is wiped first. If
+    **file** is `None`, logs to standard error instead.
+    """
     logging.basicConfig(
         level=logging.INFO,  # log INFO and up
         style="{",  # used for the format specifier
         datefmt="%Y-%m-%d %H:%M:%S",  # datetime format
         # show datetime, error level, logger name, the calling function's name, and the log message
         format="{asctime}.{msecs:.0f} {levelname} {message} - {name}:{funcName}()",
-        filename=SAVED_DATA_FOLDER.joinpath("lastrun.log"),  # send to `lastrun.log`
+        filename=file,  # send to `lastrun.log` by default
         filemode="w+",  # wipe the file between runs
     )
@@ -13,6 +13,7 @@ from importlib.metadata import EntryPoint
 from os import PathLike
 from types import ModuleType
 
+from .. import flow_control
 from ..constants import PLUGIN_ENTRY_POINT, SAVED_DATA_FOLDER
 from ..constants.paths.settings.plugins import GLOBAL_PLUGINS_FILE, LOCAL_PLUGINS_FILE
 from ..custom_widgets.settings import PluginSettingsWidget
@@ -180,16 +181,15 @@ def load_plugins(
     return (loaded_plugins, failed_plugins)
 
 
-def load_all_plugins() -> (
-    tuple[list[CategoryItem], dict[str, PluginSettingsWidget], PluginSettings]
-):
+def load_plugin_modules() -> tuple[dict[str, ModuleType], list[str], PluginSettings]:
     """
-    Load all plugins.
+    Discover and import all enabled plugins (Fabrial's built-in items are always loaded). Logs
+    errors.
 
     Returns
     -------
-    A tuple of (the loaded `CategoryItem`s, a mapping of plugin names to the loaded settings menu
-    for that plugin, the plugin settings).
+    A tuple of (a mapping of plugin names to the loaded plugins, the names of plugins that could not
+    be loaded, the plugin settings).
     """
     # discover plugins
     global_names, local_names = discover_plugins()
@@ -199,9 +199,28 @@ def load_all_plugins() -> (
     # load the plugins
     global_plugins, failed_globals = load_plugins(global_names, global_settings)
     local_plugins, failed_locals = load_plugins(local_names, local_settings)
-    # combine plugins (no more separation between global and local)
-    plugins = global_plugins | local_plugins
-    failed_plugins = failed_locals + failed_globals
+    # combine plugins (no more separation between global and local). Fabrial's built-in items are
+    # always loaded
+    plugins = {flow_control.__name__: flow_control} | global_plugins | local_plugins
+    return (
+        plugins,
+        failed_locals + failed_globals,
+        PluginSettings(global_settings, local_settings),
+    )
+
+
+def load_all_plugins() -> (
+    tuple[list[CategoryItem], dict[str, PluginSettingsWidget], PluginSettings]
+):
+    """
+    Load all plugins.
+
+    Returns
+    -------
+    A tuple of (the loaded `CategoryItem`s, a mapping of plugin names to the loaded settings menu
+    for that plugin, the plugin settings).
+    """
+    plugins, failed_plugins, plugin_settings = load_plugin_modules()
     # possibly report an error to the user
     if len(failed_plugins) > 0:
         errors.show_error_delayed(
@@ -230,4 +249,4 @@ def load_all_plugins() -> (
             "See the error log for details.",
         )
 
-    return (items, settings_widgets, PluginSettings(global_settings, local_settings))
+    return (items, settings_widgets, plugin_settings)
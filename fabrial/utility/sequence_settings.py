@@ -0,0 +1,86 @@
+"""Load and save sequence settings that are used when a sequence starts."""
+
+import json
+import logging
+import typing
+
+from ..classes.plot_batcher import DEFAULT_FRAME_RATE
+from ..classes.prompt_policy import PromptPolicy
+from ..constants.paths.settings import sequence as sequence_paths
+
+
+def load_stall_threshold() -> float | None:
+    """
+    Load the stall detection threshold (in seconds). Returns `None` if stall detection is disabled
+    or the setting can't be read.
+    """
+    try:
+        with open(sequence_paths.STALL_THRESHOLD_FILE, "r") as f:
+            threshold_ms = typing.cast(float, json.load(f))
+    except Exception:  # stall detection is disabled by default
+        return None
+    return threshold_ms / 1000 if threshold_ms > 0 else None
+
+
+def save_stall_threshold(threshold: float | None) -> bool:
+    """
+    Save the stall detection **threshold** (in seconds). `None` disables stall detection. Returns
+    whether the operation succeeded.
+    """
+    try:
+        with open(sequence_paths.STALL_THRESHOLD_FILE, "w") as f:
+            json.dump(threshold * 1000 if threshold is not None else 0, f)
+        return True
+    except OSError:
+        return False
+
+
+def load_plot_frame_rate() -> float | None:
+    """
+    Load how many batches of plot commands are sent to the display per second. Returns `None` if
+    plot commands aren't batched, or the default if the setting can't be read.
+    """
+    try:
+        with open(sequence_paths.PLOT_FRAME_RATE_FILE, "r") as f:
+            frame_rate = typing.cast(float, json.load(f))
+    except Exception:
+        return DEFAULT_FRAME_RATE
+    return frame_rate if frame_rate > 0 else None
+
+
+def save_plot_frame_rate(frame_rate: float | None) -> bool:
+    """
+    Save the plot **frame_rate** (batches per second). `None` disables batching. Returns whether the
+    operation succeeded.
+    """
+    try:
+        with open(sequence_paths.PLOT_FRAME_RATE_FILE, "w") as f:
+            json.dump(frame_rate if frame_rate is not None else 0, f)
+        return True
+    except OSError:
+        return False
+
+
+def load_prompt_policy() -> PromptPolicy | None:
+    """
+    Load the policy that answers prompts automatically. Returns `None` if there is no policy (the
+    default) or the policy can't be read.
+    """
+    if not sequence_paths.PROMPT_POLICY_FILE.exists():
+        return None
+    try:
+        policy = PromptPolicy.from_json(sequence_paths.PROMPT_POLICY_FILE)
+    except Exception:
+        logging.getLogger(__name__).exception("Failed to load the prompt policy")
+        return None
+    return policy if len(policy.rules) > 0 else None
+
+
+def save_prompt_policy(policy: PromptPolicy) -> bool:
+    """Save the prompt **policy**. Returns whether the operation succeeded. Logs errors."""
+    try:
+        policy.to_json(sequence_paths.PROMPT_POLICY_FILE)
+        return True
+    except OSError:
+        logging.getLogger(__name__).exception("Failed to save the prompt policy")
+        return False
@@ -0,0 +1 @@
+"""Tests the classes used to run sequences."""
@@ -0,0 +1,79 @@
+import asyncio
+import json
+from pathlib import Path
+
+import numpy as np
+from pytest import raises
+
+from fabrial.classes.data_store import DataKey, SequenceData, save_outputs
+
+SPECTRUM = DataKey("spectrum", np.ndarray)
+TEMPERATURE = DataKey("temperature", float)
+
+
+def test_read_only_views():
+    """Tests that published arrays are shared as read-only views."""
+    data = SequenceData()
+    spectrum = np.arange(5.0)
+    data.publish(SPECTRUM, spectrum)
+    view = data.get_nowait(SPECTRUM)
+    assert view is not None
+    assert np.shares_memory(view, spectrum)
+    with raises(ValueError):
+        view[0] = 10
+    spectrum[0] = 10  # the publisher's array is untouched
+    assert view[0] == 10
+
+
+def test_missing_keys():
+    """Tests reading values that haven't been published."""
+
+    async def run():
+        data = SequenceData()
+        assert data.get_nowait(TEMPERATURE) is None
+        reader = asyncio.create_task(data.get(TEMPERATURE))
+        await asyncio.sleep(0)
+        assert not reader.done()
+        data.publish(TEMPERATURE, 25.0)
+        assert await asyncio.wait_for(reader, 1) == 25.0
+
+    asyncio.run(run())
+
+
+def test_types():
+    """Tests that values and keys must agree on their type."""
+    data = SequenceData()
+    with raises(TypeError):
+        data.publish(TEMPERATURE, "hot")  # type: ignore[arg-type]
+    data.publish(TEMPERATURE, 25.0)
+    with raises(TypeError):
+        data.get_nowait(DataKey("temperature", int))
+
+
+def test_persistence(tmp_path: Path):
+    """Tests saving persisted values, including values with names that aren't filenames."""
+    outputs = [
+        (SPECTRUM, np.arange(3.0)),
+        (TEMPERATURE, 20.0),
+        (TEMPERATURE, 25.0),
+        (DataKey("../escape: me", dict), {"a": 1}),
+    ]
+    save_outputs(outputs, tmp_path)
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "_escape__me.json",
+        "spectrum.npy",
+        "temperature.json",
+    ]
+    assert np.array_equal(np.load(tmp_path.joinpath("spectrum.npy")), np.arange(3.0))
+    with open(tmp_path.joinpath("temperature.json")) as f:
+        assert json.load(f) == 25.0  # only the latest value
+
+
+def test_failed_persistence(tmp_path: Path):
+    """Tests that a value that can't be saved leaves the previous file intact."""
+    save_outputs([(TEMPERATURE, 20.0)], tmp_path)
+    with raises(TypeError):
+        save_outputs([(DataKey("temperature", object), object())], tmp_path)
+    assert [path.name for path in tmp_path.iterdir()] == ["temperature.json"]
+    with open(tmp_path.joinpath("temperature.json")) as f:
+        assert json.load(f) == 20.0
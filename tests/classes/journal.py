@@ -0,0 +1,73 @@
+import asyncio
+import json
+from pathlib import Path
+
+from fabrial.classes import journal
+from fabrial.classes.journal import ProgressJournal, read_journal
+from fabrial.constants.sequence import JOURNAL_FILENAME
+
+
+def run_steps(data_directory: Path, outcomes: dict[str, str | None], resume: bool = False):
+    """
+    Run a sequence whose steps finish with **outcomes** (`None` means the step was interrupted).
+    """
+
+    async def run():
+        progress = (
+            ProgressJournal.resume(data_directory)
+            if resume
+            else ProgressJournal.create(data_directory)
+        )
+        for step_path, outcome in outcomes.items():
+            progress.step_started(step_path)
+            if outcome is not None:
+                await progress.step_completed(step_path, outcome)
+        progress.close()
+
+    asyncio.run(run())
+
+
+def test_resume(tmp_path: Path):
+    """Tests that resuming only skips steps that succeeded."""
+    run_steps(
+        tmp_path,
+        {
+            "1 Hold": journal.SUCCEEDED,
+            "2 Hold": journal.CANCELLED,
+            "3 Hold": journal.FAILED,
+            "4 Hold": None,
+        },
+    )
+    progress = ProgressJournal.resume(tmp_path)
+    progress.close()
+    assert progress.is_completed("1 Hold")
+    for step_path in ("2 Hold", "3 Hold", "4 Hold"):
+        assert not progress.is_completed(step_path)
+
+    # the last outcome of a step counts
+    run_steps(tmp_path, {"2 Hold": journal.SUCCEEDED, "3 Hold": None}, resume=True)
+    assert read_journal(tmp_path.joinpath(JOURNAL_FILENAME)) == (
+        {"1 Hold", "2 Hold"},
+        {"3 Hold", "4 Hold"},
+    )
+
+
+def test_truncated_last_line(tmp_path: Path):
+    """Tests resuming a journal whose last entry was only partially written."""
+    run_steps(tmp_path, {"1 Hold": journal.SUCCEEDED})
+    file = tmp_path.joinpath(JOURNAL_FILENAME)
+    with open(file, "a") as f:
+        f.write('{"Event": "Step Completed", "Step": "2 Ho')
+    assert read_journal(file) == ({"1 Hold"}, set())
+
+    run_steps(tmp_path, {"2 Hold": journal.SUCCEEDED}, resume=True)
+    assert read_journal(file) == ({"1 Hold", "2 Hold"}, set())
+    # the partial entry doesn't corrupt the entries written after it
+    with open(file) as f:
+        lines = f.read().splitlines()
+    assert [json.loads(line)[journal.EVENT] for line in lines[-4:]] == [
+        journal.SEQUENCE_RESUMED,
+        journal.STEP_STARTED,
+        journal.STEP_COMPLETED,
+        journal.SEQUENCE_FINISHED,
+    ]
@@ -0,0 +1,113 @@
+import asyncio
+
+from pytest import MonkeyPatch, approx, fixture, raises
+
+from fabrial.classes import ticker as ticker_module
+from fabrial.classes.ticker import Tick, Ticker
+from fabrial.enums import MissedTickPolicy
+
+INTERVAL = 0.05
+
+
+class FakeClock:
+    """
+    Replaces `time.monotonic()` and `asyncio.sleep()` for the ticker, so time only passes when a
+    test says so (or when the ticker sleeps).
+    """
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        """Pretend to work for **seconds**."""
+        self.now += seconds
+
+    async def sleep(self, seconds: float):
+        self.now += seconds
+        await asyncio.sleep(0)  # still let other tasks run
+
+
+@fixture
+def clock(monkeypatch: MonkeyPatch) -> FakeClock:
+    """Fixture that gives the ticker a fake clock."""
+    clock = FakeClock()
+    monkeypatch.setattr(ticker_module, "time", clock)
+    monkeypatch.setattr(ticker_module, "asyncio", clock)
+    return clock
+
+
+async def next_ticks(ticker: Ticker, count: int) -> list[Tick]:
+    """Get the next **count** ticks."""
+    return [await anext(ticker) for _ in range(count)]
+
+
+def test_deadlines(clock: FakeClock):
+    """Tests that deadlines follow the schedule even when the step works between ticks."""
+
+    async def run():
+        ticker = Ticker(INTERVAL)
+        ticks: list[Tick] = []
+        async for tick in ticker:
+            ticks.append(tick)
+            clock.advance(INTERVAL / 2)  # work that doesn't delay the next tick
+            if len(ticks) == 5:
+                break
+        start_time = ticks[0].deadline
+        for number, tick in enumerate(ticks):
+            assert tick.number == number
+            assert tick.deadline == approx(start_time + number * INTERVAL)
+            assert tick.lateness == approx(0)
+            assert tick.missed == 0
+        assert clock.now == approx(start_time + 4.5 * INTERVAL)
+        assert ticker.as_dict()["Ticks"] == 5
+
+    asyncio.run(run())
+
+
+def test_skip_missed_ticks(clock: FakeClock):
+    """Tests that `MissedTickPolicy.Skip` skips ticks that are a full interval late."""
+
+    async def run():
+        ticker = Ticker(INTERVAL, MissedTickPolicy.Skip)
+        first_tick = await anext(ticker)
+        clock.advance(3.5 * INTERVAL)  # ticks 1 and 2 are more than an interval late
+        tick = await anext(ticker)
+        assert (tick.number, tick.missed) == (3, 2)
+        assert tick.deadline == approx(first_tick.deadline + 3 * INTERVAL)
+        assert tick.lateness == approx(0.5 * INTERVAL)
+        assert ticker.missed_ticks == 2
+        tick = await anext(ticker)
+        assert (tick.number, tick.missed) == (4, 0)  # back on schedule
+        assert tick.lateness == approx(0)
+
+    asyncio.run(run())
+
+
+def test_catch_up_missed_ticks(clock: FakeClock):
+    """Tests that `MissedTickPolicy.CatchUp` delivers late ticks back to back."""
+
+    async def run():
+        ticker = Ticker(INTERVAL, MissedTickPolicy.CatchUp)
+        await anext(ticker)
+        clock.advance(3.5 * INTERVAL)
+        start_time = clock.now
+        ticks = await next_ticks(ticker, 3)
+        assert clock.now == start_time  # no waiting
+        assert [tick.number for tick in ticks] == [1, 2, 3]
+        assert all(tick.missed == 0 for tick in ticks)
+        assert [tick.lateness for tick in ticks] == approx(
+            [2.5 * INTERVAL, 1.5 * INTERVAL, 0.5 * INTERVAL]
+        )
+        assert ticker.missed_ticks == 0
+
+    asyncio.run(run())
+
+
+def test_invalid_interval():
+    """Tests that the interval must be positive."""
+    for interval in (0, -1, float("nan")):
+        with raises(ValueError):
+            Ticker(interval)
@@ -0,0 +1,163 @@
+import asyncio
+
+from pytest import mark
+
+from fabrial.classes.plot_batcher import PlotBatch, PlotCommandBatcher
+from fabrial.enums import PlotOverflowPolicy
+from fabrial.plotting import AddPoint, AddPoints, LineIndex, PlotIndex, SetLogScale
+
+PLOT = PlotIndex(0, 1)
+LINE = LineIndex(PLOT, 0)
+CAPACITY = 100
+POINTS = 2_500
+
+
+class Display:
+    """Collects delivered batches and applies them right away or when asked."""
+
+    def __init__(self, keep_up: bool):
+        self.keep_up = keep_up
+        self.batches: list[PlotBatch] = []
+        self.x_values: list[float] = []
+        self.y_values: list[float] = []
+
+    def deliver(self, batch: PlotBatch):
+        self.batches.append(batch)
+        if self.keep_up:
+            self.apply()
+
+    def apply(self):
+        """Run every delivered batch."""
+        while len(self.batches) > 0:
+            batch = self.batches.pop(0)
+            for command in batch.commands:
+                if isinstance(command, AddPoints) and command.line_index == LINE:
+                    self.x_values.extend(command.x_values)
+                    self.y_values.extend(command.y_values)
+            batch.mark_applied()
+
+
+def create_batcher(
+    display: Display, policy: PlotOverflowPolicy = PlotOverflowPolicy.KeepMinMax
+) -> PlotCommandBatcher:
+    """Create a batcher that delivers every command immediately to **display**."""
+    batcher = PlotCommandBatcher(display.deliver, None)
+    batcher.set_line_policy(LINE, policy, CAPACITY)
+    return batcher
+
+
+def fall_behind(batcher: PlotCommandBatcher):
+    """Deliver batches that the (not keeping up) display doesn't apply until it is behind."""
+    while not batcher.is_behind():
+        batcher.submit(SetLogScale(PLOT, None, None))
+
+
+def submit_points(batcher: PlotCommandBatcher):
+    """Submit `POINTS` points with a spike in the middle, one at a time."""
+    for i in range(POINTS):
+        batcher.submit(AddPoint(LINE, i, 1000 if i == POINTS // 2 else i % 10))
+
+
+@mark.parametrize("policy", list(PlotOverflowPolicy))
+def test_lossless_when_keeping_up(policy: PlotOverflowPolicy):
+    """Tests that every point is delivered while the display keeps up, whatever the policy."""
+
+    async def run():
+        display = Display(keep_up=True)
+        batcher = PlotCommandBatcher(display.deliver, 30)  # batched, so points pile up
+        batcher.set_line_policy(LINE, policy, CAPACITY)
+        values: list[float] = list(range(POINTS))
+        batcher.submit(AddPoints(LINE, values, values))
+        submit_points(batcher)
+        batcher.flush()
+        assert display.x_values == values + values
+        assert batcher.statistics.dropped_points == 0
+        assert batcher.statistics.held_back == 0
+
+    asyncio.run(run())
+
+
+def test_hold_back_and_resume():
+    """Tests that batches are held back while the display is behind and sent once it catches up."""
+
+    async def run():
+        display = Display(keep_up=False)
+        batcher = create_batcher(display)
+        fall_behind(batcher)
+        delivered_batches = len(display.batches)
+        batcher.submit(AddPoint(LINE, 1, 2))
+        batcher.submit(AddPoint(LINE, 3, 4))
+        assert len(display.batches) == delivered_batches  # held back
+        assert batcher.statistics.held_back == 1
+
+        display.apply()  # catching up schedules the held batch
+        await asyncio.sleep(0)
+        assert len(display.batches) == 1
+        display.apply()
+        assert (display.x_values, display.y_values) == ([1, 3], [2, 4])
+        assert not batcher.holding
+
+    asyncio.run(run())
+
+
+async def overflow(policy: PlotOverflowPolicy) -> tuple[Display, PlotCommandBatcher]:
+    """Submit `POINTS` points for a line with **policy** while the display is behind."""
+    display = Display(keep_up=False)
+    batcher = create_batcher(display, policy)
+    fall_behind(batcher)
+    submit_points(batcher)
+    display.apply()
+    await asyncio.sleep(0)  # deliver the held batch
+    display.apply()
+    assert len(display.x_values) + batcher.statistics.dropped_points == POINTS
+    return (display, batcher)
+
+
+def test_block():
+    """Tests that `Block` keeps every point and makes the producer wait until delivery."""
+
+    async def run():
+        display = Display(keep_up=False)
+        batcher = create_batcher(display, PlotOverflowPolicy.Block)
+        fall_behind(batcher)
+
+        async def produce():
+            submit_points(batcher)
+            await batcher.wait_for_room()
+
+        producer = asyncio.create_task(produce())
+        await asyncio.sleep(0)
+        assert not producer.done()  # waiting for the held batch to be delivered
+
+        display.apply()
+        await asyncio.sleep(0)  # deliver the held batch
+        await asyncio.wait_for(producer, 1)
+        display.apply()
+        assert display.x_values == list(range(POINTS))
+        assert batcher.statistics.dropped_points == 0
+
+    asyncio.run(run())
+
+
+def test_drop_oldest():
+    """Tests that `DropOldest` keeps the newest points."""
+    display, _ = asyncio.run(overflow(PlotOverflowPolicy.DropOldest))
+    assert display.x_values == list(range(POINTS - CAPACITY, POINTS))
+
+
+def test_keep_every_nth():
+    """Tests that `KeepEveryNth` keeps evenly spaced points, starting with the first one."""
+    display, _ = asyncio.run(overflow(PlotOverflowPolicy.KeepEveryNth))
+    assert 0 < len(display.x_values) < CAPACITY
+    assert display.x_values[0] == 0
+    spacings = {b - a for a, b in zip(display.x_values, display.x_values[1:])}
+    assert len(spacings) == 1
+
+
+def test_keep_min_max():
+    """Tests that `KeepMinMax` keeps the extremes (i.e. a spike) in order."""
+    display, _ = asyncio.run(overflow(PlotOverflowPolicy.KeepMinMax))
+    assert 0 < len(display.x_values) < CAPACITY
+    assert max(display.y_values) == 1000
+    assert min(display.y_values) == 0
+    assert display.x_values == sorted(display.x_values)
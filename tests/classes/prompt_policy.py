@@ -0,0 +1,150 @@
+import asyncio
+import json
+from pathlib import Path
+from typing import Any
+
+from fabrial.classes import Reply, SequenceStep, StepRunner
+from fabrial.classes.prompt_policy import PROMPT_DECISIONS, PromptDecision, PromptPolicy, PromptRule
+from fabrial.constants.sequence import METADATA_FILENAME
+
+OPTIONS = {0: "Retry", 1: "Cancel Step"}
+ERROR_TITLE = "Sequence: Unexpected error in Hold"
+
+
+class PromptingStep(SequenceStep):
+    """A step that asks to retry once while running and fails to provide metadata once."""
+
+    def __init__(self):
+        self.metadata_failed = False
+
+    async def run(self, runner: StepRunner, data_directory: Path):
+        await runner.prompt_retry_cancel(self, "Failed to run.")
+
+    def reset(self):
+        pass
+
+    def name(self) -> str:
+        return "Prompting"
+
+    def metadata(self) -> dict[str, Any]:
+        if not self.metadata_failed:
+            self.metadata_failed = True
+            raise OSError("Failed to read the metadata.")
+        return {}
+
+
+def test_matching():
+    """Tests that the first matching rule that names a valid option answers."""
+    policy = PromptPolicy(
+        [
+            PromptRule("Sequence: Unexpected error in *", "*", "Continue"),  # not an option
+            PromptRule("Sequence: Unexpected error in *", "*timed out*", "retry"),
+            PromptRule("*", "*", 1),
+        ]
+    )
+    assert policy.match(ERROR_TITLE, "The device timed out.", OPTIONS, {}) == (
+        1,
+        policy.rules[1],
+        0,
+    )
+    assert policy.match(ERROR_TITLE, "Something else.", OPTIONS, {}) == (2, policy.rules[2], 1)
+    assert policy.match("Other", "The device timed out.", OPTIONS, {}) == (2, policy.rules[2], 1)
+    assert PromptPolicy([]).match(ERROR_TITLE, "", OPTIONS, {}) is None
+
+
+def test_limits():
+    """Tests that rules stop answering once they reach their limit."""
+    policy = PromptPolicy([PromptRule("*", "*", "Retry", limit=2), PromptRule("*", "*", "1")])
+    assert policy.match("", "", OPTIONS, {0: 1}) == (0, policy.rules[0], 0)
+    assert policy.match("", "", OPTIONS, {0: 2}) == (1, policy.rules[1], 1)
+    assert PromptPolicy([PromptRule("*", "*", 0, limit=0)]).match("", "", OPTIONS, {}) is None
+
+
+def test_json(tmp_path: Path):
+    """Tests saving and loading a policy, including the default answer."""
+    file = tmp_path.joinpath("policy.json")
+    rules = [PromptRule("A*", "*", "Retry", 10.5, 3), PromptRule("*", "*b", 1)]
+    PromptPolicy(rules).to_json(file)
+    assert PromptPolicy.from_json(file).rules == rules
+
+    file.write_text('{"rules": [{"answer": "Retry", "limit": 1}], "default": "Cancel Step"}')
+    assert PromptPolicy.from_json(file).rules == [
+        PromptRule("*", "*", "Retry", limit=1),
+        PromptRule("*", "*", "Cancel Step"),
+    ]
+
+
+async def prompt(runner: StepRunner) -> int:
+    """Send an error prompt."""
+    return await runner.send_prompt_and_wait(ERROR_TITLE, "Failed.", OPTIONS)
+
+
+def test_timeouts():
+    """Tests that rules with a timeout let the user answer first."""
+
+    async def run():
+        runner = StepRunner(
+            prompt_policy=PromptPolicy([PromptRule("*", "*", "Cancel Step", timeout=0.05)])
+        )
+        decisions: list[PromptDecision] = []
+        PROMPT_DECISIONS.set(decisions)
+        receivers: list[Reply[int]] = []
+        runner.promptRequested.connect(lambda _, __, ___, receiver: receivers.append(receiver))
+
+        # nobody answers, so the rule does
+        assert await prompt(runner) == 1
+        assert receivers[-1].is_withdrawn()  # the prompt is closed
+        (decision,) = decisions
+        assert decision.timed_out
+        assert decision.answer == "Cancel Step"
+
+        # the user answers first
+        task = asyncio.create_task(prompt(runner))
+        await asyncio.sleep(0)
+        receivers[-1].set(0)
+        assert await task == 0
+        assert len(decisions) == 1  # only policy answers are recorded
+
+    asyncio.run(run())
+
+
+def test_immediate_answers():
+    """Tests that rules without a timeout answer without showing a prompt."""
+
+    async def run():
+        runner = StepRunner(prompt_policy=PromptPolicy([PromptRule("*", "*", "Retry", limit=1)]))
+        PROMPT_DECISIONS.set([])
+        receivers: list[Reply[int]] = []
+        runner.promptRequested.connect(lambda _, __, ___, receiver: receivers.append(receiver))
+
+        assert await prompt(runner) == 0
+        assert len(receivers) == 0
+        # the rule reached its limit, so the user is asked
+        task = asyncio.create_task(prompt(runner))
+        await asyncio.sleep(0)
+        receivers[-1].set(1)
+        assert await task == 1
+
+    asyncio.run(run())
+
+
+def test_recorded_decisions(tmp_path: Path):
+    """
+    Tests that the policy's answers for a step, including answers about writing its metadata, are
+    recorded in its metadata.
+    """
+
+    async def run():
+        runner = StepRunner(prompt_policy=PromptPolicy([PromptRule("*", "*", "Retry")]))
+        for _ in range(2):  # running the step again starts with no answers
+            await runner.run_single_step(PromptingStep(), tmp_path, 1)
+            (directory,) = tmp_path.iterdir()
+            with open(directory.joinpath(METADATA_FILENAME)) as f:
+                decisions = json.load(f)["Automatic Prompt Answers"]
+            assert [decision["Message"] for decision in decisions] == [
+                "Failed to run.\n\nRetry, or cancel the step?",
+                "Failed to record metadata.\n\nRetry, or cancel the step?",
+            ]
+            assert PROMPT_DECISIONS.get() is None
+
+    asyncio.run(run())
@@ -0,0 +1,154 @@
+import asyncio
+
+from pytest import raises
+
+from fabrial.classes import StepRunner
+from fabrial.classes.exceptions import ResourceDeadlockError
+from fabrial.classes.resources import HELD_RESOURCES, ResourcePool
+
+
+async def use(pool: ResourcePool, name: str, order: list[str], label: str, capacity: int = 1):
+    """Hold the resource called **name** for a moment, recording **label** in **order**."""
+    resource = pool.get(name, capacity)
+    acquisition = await resource.acquire()
+    order.append(label)
+    await asyncio.sleep(0.01)
+    resource.release(acquisition)
+
+
+def test_fifo():
+    """Tests that waiting tasks get a resource in the order they asked for it."""
+
+    async def run():
+        pool = ResourcePool()
+        order: list[str] = []
+        async with asyncio.TaskGroup() as task_group:
+            for label in "abcde":
+                task_group.create_task(use(pool, "oven", order, label))
+                await asyncio.sleep(0)  # make sure they ask in order
+        assert order == list("abcde")
+
+    asyncio.run(run())
+
+
+def test_capacity():
+    """Tests that at most `capacity` tasks hold a resource at once."""
+
+    async def run():
+        pool = ResourcePool()
+        resource = pool.get("channels", 2)
+        first = await resource.acquire()
+        await resource.acquire()
+        assert resource.available == 0
+        waiter = asyncio.create_task(resource.acquire())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        resource.release(first)
+        await asyncio.wait_for(waiter, 1)
+        resource.release(first)  # releasing twice does nothing
+        assert resource.available == 0
+        assert len(resource.holders) == 2
+
+        with raises(ValueError):
+            pool.get("channels", 1)
+        with raises(ValueError):
+            pool.get("nothing", 0)
+
+    asyncio.run(run())
+
+
+def test_deadlock():
+    """Tests that waiting for a resource that can never be released raises an error."""
+
+    async def run():
+        pool = ResourcePool()
+        oven = pool.get("oven")
+        # the current task waits for itself
+        await oven.acquire()
+        with raises(ResourceDeadlockError):
+            await oven.acquire()
+
+        # a substep waits for a resource its step holds
+        furnace = pool.get("furnace")
+        token = HELD_RESOURCES.set((await furnace.acquire(),))
+        with raises(ResourceDeadlockError):
+            await asyncio.create_task(furnace.acquire())
+        HELD_RESOURCES.reset(token)
+
+    asyncio.run(run())
+
+
+def test_deadlock_cycle():
+    """Tests that two tasks waiting for each other's resources are detected."""
+
+    async def run():
+        pool = ResourcePool()
+        first = pool.get("first")
+        second = pool.get("second")
+        holding = asyncio.Event()
+
+        async def hold_second_then_wait():
+            await second.acquire()
+            holding.set()
+            await first.acquire()
+
+        await first.acquire()
+        other = asyncio.create_task(hold_second_then_wait())
+        await holding.wait()
+        await asyncio.sleep(0)  # `other` is now waiting for `first`
+        with raises(ResourceDeadlockError):
+            await second.acquire()
+        other.cancel()
+
+    asyncio.run(run())
+
+
+def test_cancellation():
+    """Tests that cancelled waiters give up their place without losing the resource."""
+
+    async def run():
+        pool = ResourcePool()
+        resource = pool.get("oven")
+        acquisition = await resource.acquire()
+        cancelled = asyncio.create_task(resource.acquire())
+        waiter = asyncio.create_task(resource.acquire())
+        await asyncio.sleep(0)
+
+        # the release skips the cancelled waiter before it handles its cancellation
+        cancelled.cancel()
+        resource.release(acquisition)
+        await asyncio.sleep(0)
+        assert cancelled.cancelled()
+        resource.release(await asyncio.wait_for(waiter, 1))
+        assert resource.available == 1
+        assert len(resource.waiters) == 0
+
+        # the resource is handed to a waiter as it is cancelled, so it passes it on
+        acquisition = await resource.acquire()
+        cancelled = asyncio.create_task(resource.acquire())
+        waiter = asyncio.create_task(resource.acquire())
+        await asyncio.sleep(0)
+        resource.release(acquisition)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        assert cancelled.cancelled()
+        resource.release(await asyncio.wait_for(waiter, 1))
+        assert resource.available == 1
+
+    asyncio.run(run())
+
+
+def test_blocking_call_in_resource():
+    """Tests that `run_blocking_on()` can use a device the caller already holds as a resource."""
+
+    async def run():
+        runner = StepRunner()
+        try:
+            async with runner.resource("port"):
+                assert await asyncio.wait_for(runner.run_blocking_on("port", sum, (1, 2)), 5) == 3
+            assert await runner.run_blocking_on("port", sum, (3, 4)) == 7
+        finally:
+            runner.shutdown_pools()
+
+    asyncio.run(run())
@@ -0,0 +1,62 @@
+import asyncio
+import json
+from pathlib import Path
+
+from pytest import approx
+
+from fabrial.classes import SequenceStep, StepRunner
+from fabrial.classes.retry import RetryPolicy
+from fabrial.constants.sequence import METADATA_FILENAME
+
+
+class FlakyStep(SequenceStep):
+    """A step that fails a number of times before it succeeds."""
+
+    def __init__(self, failures: int, policy: RetryPolicy):
+        self.failures = failures
+        self.policy = policy
+        self.runs = 0
+        self.resets = 0
+
+    async def run(self, runner: StepRunner, data_directory: Path):
+        self.runs += 1
+        if self.runs <= self.failures:
+            raise TimeoutError("The device didn't respond")
+
+    def reset(self):
+        self.resets += 1
+
+    def name(self) -> str:
+        return "Flaky"
+
+    def retry_policy(self) -> RetryPolicy | None:
+        return self.policy
+
+
+def test_backoff():
+    """Tests that the delay grows exponentially up to the maximum."""
+    policy = RetryPolicy(max_attempts=10, initial_delay=0.5, backoff=3, max_delay=10)
+    assert [policy.delay(attempt) for attempt in range(1, 6)] == approx([0.5, 1.5, 4.5, 10, 10])
+    assert RetryPolicy(initial_delay=2, backoff=1).delay(5) == 2
+
+
+def test_should_retry():
+    """Tests the attempt limit and the retried exception types."""
+    policy = RetryPolicy(max_attempts=3, exceptions=(OSError,))
+    assert policy.should_retry(TimeoutError(), 1)  # a subclass of `OSError`
+    assert policy.should_retry(OSError(), 2)
+    assert not policy.should_retry(OSError(), 3)
+    assert not policy.should_retry(ValueError(), 1)
+
+
+def test_retries(tmp_path: Path):
+    """Tests that a failing step is reset and retried, and the failures are recorded."""
+    step = FlakyStep(2, RetryPolicy(max_attempts=3, initial_delay=0.01, backoff=2))
+    asyncio.run(StepRunner().run_sequence([step], tmp_path))
+    assert (step.runs, step.resets) == (3, 2)
+
+    with open(tmp_path.joinpath("1 Flaky", METADATA_FILENAME)) as f:
+        metadata = json.load(f)
+    assert not metadata["Error"]
+    assert [attempt["Attempt"] for attempt in metadata["Retries"]] == [1, 2]
+    assert [attempt["Retry Delay (s)"] for attempt in metadata["Retries"]] == approx([0.01, 0.02])
@@ -0,0 +1,62 @@
+import numpy as np
+from pytest import raises
+
+from fabrial.classes.sample_ring import SampleRing
+
+WINDOW = 4
+
+
+def check_latest(ring: SampleRing, expected: list[float], write_count: int | None = None):
+    """Make sure the ring's newest samples (as of **write_count**) are **expected**."""
+    x_values, y_values = ring.latest(write_count)
+    assert x_values.tolist() == expected
+    assert y_values.tolist() == [-value for value in expected]
+
+
+def write(ring: SampleRing, values: range):
+    """Write **values** (and their negatives as y values)."""
+    ring.write(values, [-value for value in values])
+
+
+def test_latest():
+    """Tests `latest()` before and after the ring holds a full window."""
+    ring = SampleRing(WINDOW)
+    check_latest(ring, [])
+    write(ring, range(3))
+    check_latest(ring, [0, 1, 2])
+    ring.append(3, -3)
+    check_latest(ring, [0, 1, 2, 3])
+    ring.append(4, -4)
+    check_latest(ring, [1, 2, 3, 4])
+    check_latest(ring, [0, 1, 2], write_count=3)  # an earlier write count
+    x_values, _ = ring.latest()
+    with raises(ValueError):  # the views are read-only
+        x_values[0] = 10
+
+
+def test_wraparound():
+    """Tests that the newest samples stay contiguous when writes wrap around the buffer."""
+    ring = SampleRing(WINDOW)
+    expected: list[float] = []
+    for start in range(0, 50, 3):
+        write(ring, range(start, start + 3))
+        expected.extend(range(start, start + 3))
+        check_latest(ring, expected[-WINDOW:])
+        assert np.shares_memory(ring.latest()[0], ring.x_values)  # nothing is copied
+
+
+def test_large_writes():
+    """Tests writes with more samples than the buffer holds."""
+    ring = SampleRing(WINDOW)
+    write(ring, range(5))
+    write(ring, range(100, 100 + 3 * ring.capacity))
+    assert ring.write_count == 5 + 3 * ring.capacity
+    check_latest(ring, list(range(100 + 3 * ring.capacity - WINDOW, 100 + 3 * ring.capacity)))
+
+
+def test_invalid():
+    """Tests invalid windows and mismatched writes."""
+    with raises(ValueError):
+        SampleRing(0)
+    with raises(ValueError):
+        SampleRing(WINDOW).write([1, 2], [1])
@@ -0,0 +1,55 @@
+from pytest import approx, raises
+
+from fabrial.classes.sweep import ParameterRange, point_count, sweep_points
+from fabrial.enums import SweepSpacing
+
+TEMPERATURE = ParameterRange("Temperature", SweepSpacing.Linear, 100, 300, 3)
+FIELD = ParameterRange("Field", SweepSpacing.List, values=(0.5, -0.5))
+
+
+def test_expansion():
+    """Tests that every combination is generated, with the first range changing slowest."""
+    assert point_count([TEMPERATURE, FIELD]) == 6
+    assert list(sweep_points([TEMPERATURE, FIELD])) == [
+        {"Temperature": temperature, "Field": field}
+        for temperature in (100, 200, 300)
+        for field in (0.5, -0.5)
+    ]
+
+
+def test_spacing():
+    """Tests linear, logarithmic and single-point ranges."""
+    log_range = ParameterRange("Frequency", SweepSpacing.Log, 10, 1000, 3)
+    assert [point["Frequency"] for point in sweep_points([log_range])] == approx([10, 100, 1000])
+    single_point = ParameterRange("Voltage", SweepSpacing.Linear, 5, 10, 1)
+    assert list(sweep_points([single_point])) == [{"Voltage": 5}]
+
+
+def test_zero_ranges():
+    """Tests that a sweep without ranges has a single point with no parameters."""
+    assert point_count([]) == 1
+    assert list(sweep_points([])) == [{}]
+
+
+def test_duplicate_names():
+    """Tests that ranges with the same name are rejected."""
+    duplicate = ParameterRange("Temperature", SweepSpacing.List, values=(1, 2))
+    assert point_count([TEMPERATURE, duplicate]) == 6
+    with raises(ValueError):
+        next(sweep_points([TEMPERATURE, FIELD, duplicate]))
+
+
+def test_invalid_ranges():
+    """Tests that empty ranges and non-positive logarithmic ranges are rejected."""
+    with raises(ValueError):
+        ParameterRange("Field", SweepSpacing.List)
+    with raises(ValueError):
+        ParameterRange("Temperature", SweepSpacing.Linear, 100, 300, 0)
+    with raises(ValueError):
+        ParameterRange("Frequency", SweepSpacing.Log, 0, 1000, 3)
+
+
+def test_dict_round_trip():
+    """Tests converting ranges to and from dictionaries."""
+    for parameter_range in (TEMPERATURE, FIELD):
+        assert ParameterRange.from_dict(parameter_range.to_dict()) == parameter_range
@@ -0,0 +1,40 @@
+import asyncio
+import time
+
+from fabrial.classes.profiling import StepProfile
+from fabrial.classes.watchdog import CHECK_INTERVAL, StallWatchdog
+
+
+def watch(threshold: float, blocked_time: float) -> tuple[StepProfile, float]:
+    """
+    Block the event loop for **blocked_time** seconds while a watchdog with **threshold** is
+    running, then stop the watchdog. Returns the sequence profile and how long stopping took.
+    """
+
+    async def run() -> tuple[StepProfile, float]:
+        profile = StepProfile(None, "Sequence")
+        watchdog = StallWatchdog(asyncio.get_running_loop(), threshold, profile)
+        watchdog.start()
+        await asyncio.sleep(2 * CHECK_INTERVAL)
+        time.sleep(blocked_time)
+        await asyncio.sleep(0)  # end the stall
+        time.sleep(1.5 * CHECK_INTERVAL)  # a heartbeat is waiting when the watchdog stops
+        start_time = time.perf_counter()
+        watchdog.stop()
+        return (profile, time.perf_counter() - start_time)
+
+    return asyncio.run(run())
+
+
+def test_stall():
+    """Tests that blocking the loop for longer than the threshold is recorded as a stall."""
+    profile, _ = watch(0.2, 0.6)
+    assert profile.stalls is not None
+    assert profile.stalls.duration.count == 1
+
+
+def test_stop_during_heartbeat():
+    """Tests that stopping while a heartbeat is waiting doesn't wait for or report a stall."""
+    profile, stop_time = watch(1, 0)
+    assert stop_time < 0.5
+    assert profile.stalls is None
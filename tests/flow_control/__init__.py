@@ -0,0 +1 @@
+"""Tests the built-in flow control items."""
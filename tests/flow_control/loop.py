@@ -0,0 +1,49 @@
+import asyncio
+import gc
+from pathlib import Path
+
+from fabrial.classes import SequenceStep, StepRunner
+from fabrial.flow_control.items.loop.loop_step import LoopStep
+
+NUMBER_OF_LOOPS = 600
+WARMUP_LOOPS = 100
+
+
+class CountingStep(SequenceStep):
+    """Step that counts its runs and resets, and checks the object count on certain loops."""
+
+    def __init__(self):
+        self.runs = 0
+        self.resets = 0
+        self.object_counts: dict[int, int] = {}
+
+    async def run(self, runner: StepRunner, data_directory: Path):
+        self.runs += 1
+        if self.runs in (WARMUP_LOOPS, NUMBER_OF_LOOPS):
+            gc.collect()
+            self.object_counts[self.runs] = len(gc.get_objects())
+
+    def reset(self):
+        self.resets += 1
+
+    def name(self) -> str:
+        return "Counting"
+
+
+def test_loop_reuses_steps(tmp_path: Path):
+    """Tests that `LoopStep` reuses its substeps and doesn't grow the number of objects."""
+    step = CountingStep()
+    loop = LoopStep(NUMBER_OF_LOOPS, [step])
+    asyncio.run(StepRunner().run_sequence([loop], tmp_path))
+
+    assert loop.steps == [step]
+    assert step.runs == NUMBER_OF_LOOPS
+    assert step.resets == NUMBER_OF_LOOPS - 1
+    assert loop.completed_loops == NUMBER_OF_LOOPS
+    # one directory per loop
+    loop_directory = tmp_path.joinpath("1 Loop")
+    assert loop_directory.joinpath("1", "1 Counting").is_dir()
+    assert loop_directory.joinpath(str(NUMBER_OF_LOOPS), "1 Counting").is_dir()
+    # the object count after the warmup doesn't grow with the number of loops
+    growth = step.object_counts[NUMBER_OF_LOOPS] - step.object_counts[WARMUP_LOOPS]
+    assert growth < 50
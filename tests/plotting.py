@@ -0,0 +1,51 @@
+import numpy as np
+from PyQt6.QtWidgets import QApplication
+from pyqtgraph import PlotDataItem
+from pytest import raises
+
+from fabrial.plotting import LineData
+
+CAPACITY = LineData.INITIAL_CAPACITY
+
+
+def test_growth(qapp: QApplication):
+    """Tests that adding points grows the storage by doubling and keeps every point."""
+    line = LineData(PlotDataItem())
+    for i in range(CAPACITY):
+        line.add_point(i, -i, redraw=False)
+    assert len(line.x_values) == CAPACITY  # full, but not grown yet
+    line.add_point(CAPACITY, -CAPACITY, redraw=False)
+    assert len(line.x_values) == 2 * CAPACITY
+    assert line.x_data.tolist() == list(range(CAPACITY + 1))
+    assert line.y_data.tolist() == [-i for i in range(CAPACITY + 1)]
+
+
+def test_reserve(qapp: QApplication):
+    """Tests that large batches reserve exactly what they need and small ones double."""
+    line = LineData(PlotDataItem(), [0, 1], [0, 1])
+    values = np.arange(5 * CAPACITY)
+    line.add_points(values, values)
+    assert len(line.x_values) == 5 * CAPACITY + 2
+    line.add_points([1], [2])
+    assert len(line.x_values) == 2 * (5 * CAPACITY + 2)
+    assert line.count == 5 * CAPACITY + 3
+    assert line.x_data[:3].tolist() == [0, 1, 0]
+    assert (line.x_data[-1], line.y_data[-1]) == (1, 2)
+
+
+def test_redraw(qapp: QApplication):
+    """Tests that redrawing shows exactly the line's points."""
+    line = LineData(PlotDataItem())
+    line.add_points([1, 2, 3], [4, 5, 6])
+    x_data, y_data = line.line.getData()
+    assert x_data is not None and y_data is not None
+    assert x_data.tolist() == [1, 2, 3]
+    assert y_data.tolist() == [4, 5, 6]
+
+
+def test_mismatched_points(qapp: QApplication):
+    """Tests that x and y values must have the same length."""
+    line = LineData(PlotDataItem())
+    with raises(ValueError):
+        line.add_points([1, 2], [1])
+    assert line.count == 0